@@ -3,8 +3,9 @@ from fastapi import APIRouter, HTTPException, status
 from app.schemas.root import RootResponse
 from app.settings import settings
 from app.utils.logger import logger
+from app.utils.timing import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get("/",
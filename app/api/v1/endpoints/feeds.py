@@ -1,5 +1,5 @@
-from fastapi import (APIRouter, Depends, HTTPException, Path, Query, Response,
-                     status)
+from fastapi import (APIRouter, Depends, HTTPException, Path, Query, Request,
+                     Response, status)
 
 from app.dependencies import get_feed_service
 from app.exceptions.feed import (FeedEndpointNotFoundError, FeedFetchError,
@@ -9,19 +9,25 @@ from app.schemas.feed import (AlertEntity, Entity, EntityType, Feed,
 from app.schemas.pagination import ListResponse, PaginatedResponse
 from app.services.feed import FeedService
 from app.utils.logger import logger
+from app.utils.ndjson import VARY_ACCEPT, accepts_ndjson, ndjson_response
+from app.utils.timing import TimedRoute
 
-router = APIRouter(prefix="/feeds", tags=["feeds"])
+router = APIRouter(prefix="/feeds", tags=["feeds"], route_class=TimedRoute)
 
 
 @router.get("/{feed}",
             response_model=PaginatedResponse[Entity],
             status_code=status.HTTP_200_OK,
             summary="Get all real-time subway feed",
-            description="Retrieve real-time data for a given subway feed",
+            description=("Retrieve real-time data for a given subway feed. "
+                         "Send Accept: application/x-ndjson to stream the "
+                         "page of entities one JSON object per line, "
+                         "without a total"),
             responses={500: {"description": "Error processing GTFS-RT feed"},
                        502: {"description": "Error fetching GTFS-RT feed"},
                        504: {"description": "Timeout fetching GTFS-RT feed"}})
 async def get_all_feed(
+        request: Request,
         response: Response,
         feed: Feed = Path(description="The subway feed to request"),
         entity_type: EntityType | None = Query(
@@ -46,8 +52,23 @@ async def get_all_feed(
             le=1000,
             description="Maximum number of entities to return"),
         service: FeedService = Depends(get_feed_service)
-) -> PaginatedResponse[Entity]:
+) -> PaginatedResponse[Entity] | Response:
     try:
+        if accepts_ndjson(request):
+            header, entities = service.stream_all_feed(
+                feed=feed.value,
+                entity_type=entity_type,
+                route_id=route_id,
+                stop_id=stop_id,
+                trip_id=trip_id,
+                offset=offset,
+                limit=limit)
+            return ndjson_response(
+                Entity,
+                entities,
+                headers={"X-GTFS-RT-Version": header.gtfs_realtime_version,
+                         "X-GTFS-RT-Timestamp": header.timestamp})
+
         res, total = service.get_all_feed(feed=feed.value,
                                           entity_type=entity_type,
                                           route_id=route_id,
@@ -59,6 +80,7 @@ async def get_all_feed(
         response.headers["X-GTFS-RT-Version"] = \
             res.header.gtfs_realtime_version
         response.headers["X-GTFS-RT-Timestamp"] = res.header.timestamp
+        response.headers.update(VARY_ACCEPT)
 
         return PaginatedResponse[Entity](total=total,
                                          offset=offset,
@@ -0,0 +1,117 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.dependencies import get_journey_service
+from app.exceptions.base import QueryInvalidError, ResourceNotFoundError
+from app.schemas.journey import JourneysResponse, ReachabilityResponse
+from app.services.journey import JourneyService
+from app.utils.logger import logger
+from app.utils.timing import TimedRoute
+
+router = APIRouter(prefix="/journeys", tags=["journeys"],
+                   route_class=TimedRoute)
+
+
+@router.get("/",
+            response_model=JourneysResponse,
+            status_code=status.HTTP_200_OK,
+            summary="Plan subway journeys between two stations",
+            description=("Plan journeys between two stops or stations "
+                         "departing at or after depart_at. Every returned "
+                         "journey is Pareto-optimal: no other journey "
+                         "arrives earlier with as few transfers"),
+            responses={
+                400: {"description": ("Origin and destination must be "
+                                      "different stations")},
+                404: {"description": "Stop not found"},
+                500: {"description": "Error planning journeys"}})
+async def get_journeys(
+        from_stop_id: str = Query(
+            alias="from",
+            description="The stop or station ID to depart from"),
+        to_stop_id: str = Query(
+            alias="to",
+            description="The stop or station ID to arrive at"),
+        depart_at: datetime | None = Query(
+            default=None,
+            description=("The date and time to depart at or after. Defaults "
+                         "to now. Times without a UTC offset are in the "
+                         "transit agency timezone")),
+        max_transfers: int = Query(
+            default=3,
+            ge=0,
+            le=8,
+            description="Maximum number of changes between trips"),
+        service: JourneyService = Depends(get_journey_service)
+) -> JourneysResponse:
+    try:
+        return await service.plan(from_stop_id,
+                                  to_stop_id,
+                                  depart_at,
+                                  max_transfers)
+
+    except QueryInvalidError as e:
+        logger.error(f"Invalid journey query: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Origin and destination must be different stations")
+
+    except ResourceNotFoundError as e:
+        logger.error(f"Journey stop not found: {e}")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Stop not found")
+
+    except Exception as e:
+        logger.exception(f"Unexpected error: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="An unexpected error occurred")
+
+
+@router.get("/reachable",
+            response_model=ReachabilityResponse,
+            status_code=status.HTTP_200_OK,
+            summary="Get every station reachable from a station",
+            description=("Retrieve the earliest arrival at every station "
+                         "reachable from a stop or station when departing "
+                         "at depart_at, optionally within max_minutes. "
+                         "Departure times are rounded down to the start of "
+                         "their time bucket"),
+            responses={404: {"description": "Stop not found"},
+                       500: {"description": "Error searching stations"}})
+async def get_reachable_stations(
+        from_stop_id: str = Query(
+            alias="from",
+            description="The stop or station ID to depart from"),
+        depart_at: datetime | None = Query(
+            default=None,
+            description=("The date and time to depart at or after. Defaults "
+                         "to now. Times without a UTC offset are in the "
+                         "transit agency timezone")),
+        max_minutes: int | None = Query(
+            default=None,
+            ge=1,
+            le=1440,
+            description="Maximum travel time in minutes"),
+        max_transfers: int = Query(
+            default=3,
+            ge=0,
+            le=8,
+            description="Maximum number of changes between trips"),
+        service: JourneyService = Depends(get_journey_service)
+) -> ReachabilityResponse:
+    try:
+        return await service.get_reachable(from_stop_id,
+                                           depart_at,
+                                           max_minutes,
+                                           max_transfers)
+
+    except ResourceNotFoundError as e:
+        logger.error(f"Stop with ID '{from_stop_id}' not found: {e}")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Stop not found")
+
+    except Exception as e:
+        logger.exception(f"Unexpected error: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="An unexpected error occurred")
@@ -0,0 +1,109 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.db.database import async_engine, engine
+from app.db.replicas import read_replicas
+from app.dependencies import get_response_cache
+from app.schemas.metrics import (CacheStatsResponse, PhaseTimingResponse,
+                                 PoolStatsResponse)
+from app.services.response_cache import ResponseCache
+from app.settings import settings
+from app.utils.logger import logger
+from app.utils.timing import BUCKET_BOUNDS_MS, TimedRoute, timing_stats
+
+router = APIRouter(prefix="/metrics", tags=["metrics"], route_class=TimedRoute)
+
+
+@router.get("/cache",
+            response_model=CacheStatsResponse,
+            status_code=status.HTTP_200_OK,
+            summary="Get response cache statistics",
+            description=("Retrieve hit, miss and eviction counts of the "
+                         "static GTFS response cache"),
+            responses={500: {"description": "Error retrieving cache stats"}})
+def get_cache_stats(
+        cache: ResponseCache = Depends(get_response_cache)
+) -> CacheStatsResponse:
+    try:
+        stats = cache.stats()
+        return CacheStatsResponse(dataset_version=cache.version,
+                                  size=stats.size,
+                                  maxsize=stats.maxsize,
+                                  hits=stats.hits,
+                                  misses=stats.misses,
+                                  evictions=stats.evictions,
+                                  expirations=stats.expirations,
+                                  hit_ratio=stats.hit_ratio)
+
+    except Exception as e:
+        logger.exception(f"Unexpected error: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="An unexpected error occurred")
+
+
+@router.get("/pool",
+            response_model=List[PoolStatsResponse],
+            status_code=status.HTTP_200_OK,
+            summary="Get database connection pool statistics",
+            description=("Retrieve connection usage and checkout wait times "
+                         "of the database connection pools"),
+            responses={500: {"description": "Error retrieving pool stats"}})
+def get_pool_stats() -> List[PoolStatsResponse]:
+    try:
+        pools = [("sync", engine.pool),
+                 ("async", async_engine.sync_engine.pool)]
+        for replica in read_replicas.replicas:
+            pools.append((f"sync {replica.name}", replica.engine.pool))
+            pools.append((f"async {replica.name}",
+                          replica.async_engine.sync_engine.pool))
+
+        results = []
+        for name, pool in pools:
+            wait_stats = pool.wait_stats
+            results.append(PoolStatsResponse(
+                engine=name,
+                size=pool.size(),
+                max_overflow=settings.db_max_overflow,
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=max(pool.overflow(), 0),
+                checkouts=wait_stats.checkouts,
+                timeouts=wait_stats.timeouts,
+                wait_time_ms=wait_stats.wait_seconds * 1000,
+                max_wait_time_ms=wait_stats.max_wait_seconds * 1000))
+        return results
+
+    except Exception as e:
+        logger.exception(f"Unexpected error: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="An unexpected error occurred")
+
+
+@router.get("/timings",
+            response_model=List[PhaseTimingResponse],
+            status_code=status.HTTP_200_OK,
+            summary="Get request phase timing histograms",
+            description=("Retrieve per route histograms of the time sampled "
+                         "requests spent in each phase, such as fetching, "
+                         "parsing, filtering, repository calls and encoding. "
+                         "Requests are sampled at server_timing_sample_rate"),
+            responses={500: {"description": "Error retrieving timings"}})
+def get_timing_stats() -> List[PhaseTimingResponse]:
+    try:
+        bounds = [f"{bound:g}" for bound in BUCKET_BOUNDS_MS] + ["+Inf"]
+        return [PhaseTimingResponse(route=stats.route,
+                                    phase=stats.phase,
+                                    count=stats.count,
+                                    mean_ms=stats.mean_ms,
+                                    p50_ms=stats.quantile_ms(0.5),
+                                    p95_ms=stats.quantile_ms(0.95),
+                                    p99_ms=stats.quantile_ms(0.99),
+                                    max_ms=stats.max_ms,
+                                    buckets=dict(zip(bounds, stats.buckets)))
+                for stats in timing_stats.stats()]
+
+    except Exception as e:
+        logger.exception(f"Unexpected error: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="An unexpected error occurred")
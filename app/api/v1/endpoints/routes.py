@@ -1,27 +1,68 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Path, status
+from fastapi import (APIRouter, Depends, HTTPException, Path, Query, Request,
+                     Response, status)
 
-from app.dependencies import get_route_service
+from app.dependencies import (get_response_cache, get_route_service,
+                              get_shape_service, stream_static)
 from app.exceptions.base import ResourceNotFoundError
-from app.schemas.route import RouteResponse
+from app.schemas.batch import MAX_BATCH_IDS, BatchRequest, BatchResponse
+from app.schemas.route import RouteResponse, RouteStopsResponse
+from app.schemas.shape import ShapeResponse
+from app.services.response_cache import ResponseCache
 from app.services.route import RouteService
+from app.services.shape import ShapeService
 from app.utils.logger import logger
+from app.utils.ndjson import VARY_ACCEPT, accepts_ndjson, ndjson_response
+from app.utils.timing import TimedRoute
 
-router = APIRouter(prefix="/routes", tags=["routes"])
+router = APIRouter(prefix="/routes", tags=["routes"], route_class=TimedRoute)
 
 
 @router.get("/",
             response_model=List[RouteResponse],
             status_code=status.HTTP_200_OK,
             summary="Get all subway routes",
-            description="Retrieve all subway routes",
+            description=("Retrieve all subway routes. Send Accept: "
+                         "application/x-ndjson to stream them one JSON "
+                         "object per line"),
             responses={500: {"description": "Error retrieving routes"}})
-def get_routes(
+async def get_routes(
+        request: Request,
+        service: RouteService = Depends(get_route_service),
+        cache: ResponseCache = Depends(get_response_cache)) -> Response:
+    try:
+        if accepts_ndjson(request):
+            return ndjson_response(
+                RouteResponse,
+                stream_static(get_route_service,
+                              lambda routes: routes.stream_all()))
+
+        return await cache.respond(request,
+                                   List[RouteResponse],
+                                   service.get_all,
+                                   headers=VARY_ACCEPT)
+
+    except Exception as e:
+        logger.exception(f"Unexpected error: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="An unexpected error occurred")
+
+
+@router.post("/batch",
+             response_model=BatchResponse[RouteResponse],
+             status_code=status.HTTP_200_OK,
+             summary="Get subway routes by ID list",
+             description=("Retrieve the subway routes of up to "
+                          f"{MAX_BATCH_IDS} IDs with a single lookup, "
+                          "keyed by ID"),
+             responses={500: {"description": "Error retrieving routes"}})
+async def get_routes_batch(
+        batch: BatchRequest,
         service: RouteService = Depends(get_route_service)
-) -> List[RouteResponse]:
+) -> BatchResponse[RouteResponse]:
     try:
-        return service.get_all()
+        return await service.get_many(batch.ids)
 
     except Exception as e:
         logger.exception(f"Unexpected error: {e}")
@@ -36,11 +77,82 @@ def get_routes(
             description="Retrieve the subway route by given ID",
             responses={404: {"description": "Route not found"},
                        500: {"description": "Error retrieving route"}})
-def get_route_by_id(
+async def get_route_by_id(
+        request: Request,
+        route_id: str = Path(description="The route ID to search"),
+        service: RouteService = Depends(get_route_service),
+        cache: ResponseCache = Depends(get_response_cache)) -> Response:
+    try:
+        return await cache.respond(request,
+                                   RouteResponse,
+                                   lambda: service.get_by_id(route_id))
+
+    except ResourceNotFoundError as e:
+        logger.error(f"Route with ID '{route_id}' not found: {e}")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Route not found")
+
+    except Exception as e:
+        logger.exception(f"Unexpected error: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="An unexpected error occurred")
+
+
+@router.get("/{route_id}/shapes",
+            response_model=List[ShapeResponse],
+            status_code=status.HTTP_200_OK,
+            summary="Get the shapes of a subway route",
+            description=("Retrieve every shape the route's trips follow as "
+                         "encoded polylines, simplified for the given map "
+                         "zoom level"),
+            responses={404: {"description": "Route not found"},
+                       500: {"description": "Error retrieving shapes"}})
+async def get_route_shapes(
+        request: Request,
+        route_id: str = Path(description="The route ID to search"),
+        zoom: int | None = Query(
+            default=None,
+            ge=0,
+            le=22,
+            description=("The map zoom level to simplify the shapes for. "
+                         "Defaults to full resolution")),
+        service: ShapeService = Depends(get_shape_service),
+        cache: ResponseCache = Depends(get_response_cache)) -> Response:
+    try:
+        return await cache.respond(
+            request,
+            List[ShapeResponse],
+            lambda: service.get_by_route_id(route_id, zoom))
+
+    except ResourceNotFoundError as e:
+        logger.error(f"Route with ID '{route_id}' not found: {e}")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Route not found")
+
+    except Exception as e:
+        logger.exception(f"Unexpected error: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="An unexpected error occurred")
+
+
+@router.get("/{route_id}/stops",
+            response_model=RouteStopsResponse,
+            status_code=status.HTTP_200_OK,
+            summary="Get the ordered stops of a subway route",
+            description=("Retrieve every stop of the route per direction in "
+                         "travel order, with the distinct stop patterns of "
+                         "its trips"),
+            responses={404: {"description": "Route not found"},
+                       500: {"description": "Error retrieving stops"}})
+async def get_route_stops(
+        request: Request,
         route_id: str = Path(description="The route ID to search"),
-        service: RouteService = Depends(get_route_service)) -> RouteResponse:
+        service: RouteService = Depends(get_route_service),
+        cache: ResponseCache = Depends(get_response_cache)) -> Response:
     try:
-        return service.get_by_id(route_id)
+        return await cache.respond(request,
+                                   RouteStopsResponse,
+                                   lambda: service.get_stops(route_id))
 
     except ResourceNotFoundError as e:
         logger.error(f"Route with ID '{route_id}' not found: {e}")
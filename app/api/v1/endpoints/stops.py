@@ -1,32 +1,120 @@
+from datetime import date, datetime
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi import (APIRouter, Depends, HTTPException, Path, Query, Request,
+                     Response, status)
 
-from app.dependencies import get_stop_service
+from app.dependencies import (get_calendar_service, get_response_cache,
+                              get_stop_service, stream_static)
 from app.exceptions.base import QueryInvalidError, ResourceNotFoundError
-from app.schemas.stop import StopDetailedResponse, StopResponse
-from app.schemas.trip import DirectionID, ServiceID
+from app.schemas.batch import MAX_BATCH_IDS, BatchRequest, BatchResponse
+from app.schemas.stop import (NearbyStopResponse, StopDeparturesResponse,
+                              StopDetailedResponse, StopResponse)
+from app.schemas.trip import DirectionID
+from app.services.calendar import CalendarService
+from app.services.response_cache import ResponseCache
 from app.services.stop import StopService
 from app.utils.logger import logger
+from app.utils.ndjson import VARY_ACCEPT, accepts_ndjson, ndjson_response
+from app.utils.timing import TimedRoute
 
-router = APIRouter(prefix="/stops", tags=["stops"])
+router = APIRouter(prefix="/stops", tags=["stops"], route_class=TimedRoute)
 
 
 @router.get("/",
             response_model=List[StopResponse],
             status_code=status.HTTP_200_OK,
             summary="Get all subway stops",
-            description="Retrieve all subway stops",
+            description=("Retrieve all subway stops. Send Accept: "
+                         "application/x-ndjson to stream them one JSON "
+                         "object per line"),
             responses={500: {"description": "Error retrieving stops"}})
-def get_stops(
+async def get_stops(
+        request: Request,
         direction_id: DirectionID | None = Query(
             default=None,
             description=("The direction ID to filter stops by. 1 is inbound "
                          "trains or North bound. 0 is outbound trains or "
                          "South bound.")),
-        service: StopService = Depends(get_stop_service)) -> List[StopResponse]:
+        service: StopService = Depends(get_stop_service),
+        calendar: CalendarService = Depends(get_calendar_service),
+        cache: ResponseCache = Depends(get_response_cache)) -> Response:
+    direction = direction_id.value if direction_id is not None else None
     try:
-        return service.get_all(direction_id.value if direction_id else None)
+        if accepts_ndjson(request):
+            return ndjson_response(
+                StopResponse,
+                stream_static(
+                    lambda session: get_stop_service(session, calendar),
+                    lambda stops: stops.stream_all(direction)))
+
+        return await cache.respond(request,
+                                   List[StopResponse],
+                                   lambda: service.get_all(direction),
+                                   headers=VARY_ACCEPT)
+
+    except Exception as e:
+        logger.exception(f"Unexpected error: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="An unexpected error occurred")
+
+
+@router.post("/batch",
+             response_model=BatchResponse[StopResponse],
+             status_code=status.HTTP_200_OK,
+             summary="Get subway stops by ID list",
+             description=("Retrieve the subway stops of up to "
+                          f"{MAX_BATCH_IDS} IDs with a single lookup, "
+                          "keyed by ID"),
+             responses={500: {"description": "Error retrieving stops"}})
+async def get_stops_batch(
+        batch: BatchRequest,
+        service: StopService = Depends(get_stop_service)
+) -> BatchResponse[StopResponse]:
+    try:
+        return await service.get_many(batch.ids)
+
+    except Exception as e:
+        logger.exception(f"Unexpected error: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="An unexpected error occurred")
+
+
+# declared before /{stop_id} so "nearby" isn't matched as a stop ID
+@router.get("/nearby",
+            response_model=List[NearbyStopResponse],
+            status_code=status.HTTP_200_OK,
+            summary="Get subway stops near a location",
+            description=("Retrieve the subway stops within radius meters of "
+                         "a location, closest first"),
+            responses={500: {"description": "Error retrieving stops"}})
+async def get_nearby_stops(
+        lat: float = Query(
+            ge=-90,
+            le=90,
+            description="Latitude of the location"),
+        lon: float = Query(
+            ge=-180,
+            le=180,
+            description="Longitude of the location"),
+        radius: float = Query(
+            default=500,
+            gt=0,
+            le=5000,
+            description="Search radius in meters"),
+        limit: int = Query(
+            default=20,
+            ge=1,
+            le=100,
+            description="Maximum number of stops to return"),
+        stations: bool = Query(
+            default=False,
+            description=("Whether to only return stations instead of every "
+                         "stop of a station")),
+        service: StopService = Depends(get_stop_service)
+) -> List[NearbyStopResponse]:
+    try:
+        return await service.get_nearby(lat, lon, radius, limit, stations)
 
     except Exception as e:
         logger.exception(f"Unexpected error: {e}")
@@ -45,27 +133,39 @@ def get_stops(
                                       "(e.g., 13:22:15)")},
                 404: {"description": "Stop not found"},
                 500: {"description": "Error retrieving stop"}})
-def get_stop_by_id(
+async def get_stop_by_id(
+        request: Request,
         stop_id: str = Path(description="The stop ID to search"),
         route_id: str | None = Query(
             default=None,
             description="The route ID to filter this stop's trips by"),
-        service_id: ServiceID | None = Query(
+        service_date: date | None = Query(
             default=None,
-            description="The service ID to filter this stop's trips by"),
+            alias="date",
+            description=("The service date (YYYY-MM-DD) to filter this "
+                         "stop's trips by. Only trips of services running "
+                         "on that date are returned")),
         arrival_time: str | None = Query(
             default=None,
-            description="The arrival time to filter this stop's trips by"),
+            description=("The earliest arrival time to filter this stop's "
+                         "trips by. Hours past 23 match trips after "
+                         "midnight (e.g., 25:10:00)")),
         departure_time: str | None = Query(
             default=None,
-            description="The departure time to filter this stop's trips by"),
-        service: StopService = Depends(get_stop_service)) -> StopDetailedResponse:
+            description=("The latest departure time to filter this stop's "
+                         "trips by. Hours past 23 match trips after "
+                         "midnight (e.g., 25:10:00)")),
+        service: StopService = Depends(get_stop_service),
+        cache: ResponseCache = Depends(get_response_cache)) -> Response:
     try:
-        return service.get_by_id(stop_id,
-                                 route_id,
-                                 service_id.value if service_id else None,
-                                 arrival_time,
-                                 departure_time)
+        return await cache.respond(
+            request,
+            StopDetailedResponse,
+            lambda: service.get_by_id(stop_id,
+                                      route_id,
+                                      service_date,
+                                      arrival_time,
+                                      departure_time))
 
     except QueryInvalidError as e:
         logger.error(
@@ -83,3 +183,44 @@ def get_stop_by_id(
         logger.exception(f"Unexpected error: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail="An unexpected error occurred")
+
+
+@router.get("/{stop_id}/departures",
+            response_model=StopDeparturesResponse,
+            status_code=status.HTTP_200_OK,
+            summary="Get the next departures from a subway stop",
+            description=("Retrieve the next scheduled departures from a stop "
+                         "or from every stop of a station, including trips "
+                         "of the previous service day running after "
+                         "midnight"),
+            responses={404: {"description": "Stop not found"},
+                       500: {"description": "Error retrieving departures"}})
+async def get_stop_departures(
+        stop_id: str = Path(description="The stop or station ID to search"),
+        route_id: str | None = Query(
+            default=None,
+            description="The route ID to filter departures by"),
+        at: datetime | None = Query(
+            default=None,
+            description=("The date and time to get departures after. "
+                         "Defaults to now. Times without a UTC offset are in "
+                         "the transit agency timezone")),
+        limit: int = Query(
+            default=5,
+            ge=1,
+            le=100,
+            description="Maximum number of departures to return"),
+        service: StopService = Depends(get_stop_service)
+) -> StopDeparturesResponse:
+    try:
+        return await service.get_departures(stop_id, route_id, at, limit)
+
+    except ResourceNotFoundError as e:
+        logger.error(f"Stop with ID '{stop_id}' not found: {e}")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Stop not found")
+
+    except Exception as e:
+        logger.exception(f"Unexpected error: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="An unexpected error occurred")
@@ -1,36 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from datetime import date
 
-from app.dependencies import get_trip_service
+from fastapi import (APIRouter, Depends, HTTPException, Path, Query, Request,
+                     Response, status)
+
+from app.dependencies import (get_calendar_service, get_shape_service,
+                              get_trip_service, stream_static)
 from app.exceptions.base import QueryInvalidError, ResourceNotFoundError
-from app.schemas.pagination import PaginatedResponse
-from app.schemas.trip import (DirectionID, ServiceID, TripDetailedResponse,
-                              TripResponse)
+from app.schemas.batch import MAX_BATCH_IDS, BatchRequest, BatchResponse
+from app.schemas.pagination import CursorPaginatedResponse
+from app.schemas.shape import ShapeResponse
+from app.schemas.trip import DirectionID, TripDetailedResponse, TripResponse
+from app.services.calendar import CalendarService
+from app.services.shape import ShapeService
 from app.services.trip import TripService
 from app.utils.logger import logger
+from app.utils.ndjson import VARY_ACCEPT, accepts_ndjson, ndjson_response
+from app.utils.timing import TimedRoute
 
-router = APIRouter(prefix="/trips", tags=["trips"])
+router = APIRouter(prefix="/trips", tags=["trips"], route_class=TimedRoute)
 
 
 @router.get("/",
-            response_model=PaginatedResponse[TripResponse],
+            response_model=CursorPaginatedResponse[TripResponse],
             status_code=status.HTTP_200_OK,
-            summary="Get all PaginatedResponse subway trips",
-            description=("Retrieve all PaginatedResponse subway trips. Can be "
-                         "further filtered down by their route_id, "
-                         "service_id, and/or direction_id"),
-            responses={500: {"description": "Error retrieving trips"}})
-def get_trips(
+            summary="Get all paginated subway trips",
+            description=("Retrieve all paginated subway trips in trip ID "
+                         "order. Can be further filtered down by their "
+                         "route_id, service date, and/or direction_id. Pass "
+                         "the returned next_cursor to get the next page. "
+                         "Send Accept: application/x-ndjson to stream every "
+                         "matching trip one JSON object per line instead; "
+                         "the paging parameters are then ignored"),
+            responses={400: {"description": "Invalid cursor"},
+                       500: {"description": "Error retrieving trips"}})
+async def get_trips(
+        request: Request,
+        response: Response,
         route_id: str | None = Query(
             default=None,
             description="The route ID to filter by"),
-        service_id: ServiceID | None = Query(
+        service_date: date | None = Query(
             default=None,
-            description="The service ID to filter by"),
+            alias="date",
+            description=("The service date (YYYY-MM-DD) to filter by. Only "
+                         "trips of services running on that date are "
+                         "returned")),
         direction_id: DirectionID | None = Query(
             default=None,
             description=("The direction ID to filter stops by. 1 is inbound "
                          "trains or North bound. 0 is outbound trains or "
                          "South bound.")),
+        cursor: str | None = Query(
+            default=None,
+            description=("The next_cursor of the previous page to continue "
+                         "after. Unlike offset, pages after a cursor are as "
+                         "fast as the first page")),
         offset: int = Query(
             default=0,
             ge=0,
@@ -40,14 +64,59 @@ def get_trips(
             ge=1,
             le=1000,
             description="Maximum number of trips to return"),
+        include_total: bool = Query(
+            default=True,
+            description=("Whether to count the total number of matching "
+                         "trips")),
+        service: TripService = Depends(get_trip_service),
+        calendar: CalendarService = Depends(get_calendar_service)
+) -> CursorPaginatedResponse[TripResponse] | Response:
+    direction = direction_id.value if direction_id is not None else None
+    try:
+        if accepts_ndjson(request):
+            return ndjson_response(
+                TripResponse,
+                stream_static(
+                    lambda session: get_trip_service(session, calendar),
+                    lambda trips: trips.stream_all(route_id,
+                                                   service_date,
+                                                   direction)))
+
+        response.headers.update(VARY_ACCEPT)
+        return await service.get_all(
+            route_id,
+            service_date,
+            direction,
+            cursor,
+            offset,
+            limit,
+            include_total)
+
+    except QueryInvalidError as e:
+        logger.error(f"Invalid cursor: {e}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Invalid cursor")
+
+    except Exception as e:
+        logger.exception(f"Unexpected error: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="An unexpected error occurred")
+
+
+@router.post("/batch",
+             response_model=BatchResponse[TripResponse],
+             status_code=status.HTTP_200_OK,
+             summary="Get subway trips by ID list",
+             description=("Retrieve the subway trips of up to "
+                          f"{MAX_BATCH_IDS} IDs with a single lookup, "
+                          "keyed by ID"),
+             responses={500: {"description": "Error retrieving trips"}})
+async def get_trips_batch(
+        batch: BatchRequest,
         service: TripService = Depends(get_trip_service)
-) -> PaginatedResponse[TripResponse]:
+) -> BatchResponse[TripResponse]:
     try:
-        return service.get_all(route_id,
-                               service_id.value if service_id else None,
-                               direction_id.value if direction_id else None,
-                               offset,
-                               limit)
+        return await service.get_many(batch.ids)
 
     except Exception as e:
         logger.exception(f"Unexpected error: {e}")
@@ -66,18 +135,22 @@ def get_trips(
                                       "(e.g., 13:22:15)")},
                 404: {"description": "Trip not found"},
                 500: {"description": "Error retrieving trip"}})
-def get_trip_by_id(
+async def get_trip_by_id(
         trip_id: str = Path(description="The trip ID to search"),
         arrival_time: str | None = Query(
             default=None,
-            description="The arrival time to filter this trip's stops by"),
+            description=("The earliest arrival time to filter this trip's "
+                         "stops by. Hours past 23 match stops after "
+                         "midnight (e.g., 25:10:00)")),
         departure_time: str | None = Query(
             default=None,
-            description="The departure time to filter this trip's stops by"),
+            description=("The latest departure time to filter this trip's "
+                         "stops by. Hours past 23 match stops after "
+                         "midnight (e.g., 25:10:00)")),
         service: TripService = Depends(get_trip_service)
 ) -> TripDetailedResponse:
     try:
-        return service.get_by_id(trip_id, arrival_time, departure_time)
+        return await service.get_by_id(trip_id, arrival_time, departure_time)
 
     except QueryInvalidError as e:
         logger.error(
@@ -95,3 +168,35 @@ def get_trip_by_id(
         logger.exception(f"Unexpected error: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail="An unexpected error occurred")
+
+
+@router.get("/{trip_id}/shape",
+            response_model=ShapeResponse,
+            status_code=status.HTTP_200_OK,
+            summary="Get the shape of a subway trip",
+            description=("Retrieve the shape the trip follows as an encoded "
+                         "polyline, simplified for the given map zoom level"),
+            responses={404: {"description": "Trip or its shape not found"},
+                       500: {"description": "Error retrieving shape"}})
+async def get_trip_shape(
+        trip_id: str = Path(description="The trip ID to search"),
+        zoom: int | None = Query(
+            default=None,
+            ge=0,
+            le=22,
+            description=("The map zoom level to simplify the shape for. "
+                         "Defaults to full resolution")),
+        service: ShapeService = Depends(get_shape_service)
+) -> ShapeResponse:
+    try:
+        return await service.get_by_trip_id(trip_id, zoom)
+
+    except ResourceNotFoundError as e:
+        logger.error(f"Shape of trip with ID '{trip_id}' not found: {e}")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Shape not found")
+
+    except Exception as e:
+        logger.exception(f"Unexpected error: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="An unexpected error occurred")
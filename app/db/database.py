@@ -4,24 +4,133 @@
 #
 # https://sqlmodel.tiangolo.com/tutorial/create-db-and-table/#sqlmodel-metadata-order-matters
 
+from typing import Any, Dict
+
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import SQLModel, create_engine  # noqa: F401
 
+import app.db.models.dataset_version  # noqa: F401
 import app.db.models.gtfs  # noqa: F401
+from app.db.metrics import timed_pool_class, track_queries
 from app.settings import settings as s
 from app.utils.logger import logger
 
-DATABASE_URL = f"postgresql://{s.db_user}:{s.db_password}@{s.db_host}:{
-    s.db_port}/{s.db_name}"
+if s.db_backend == "sqlite":
+    # read-only files are immutable; SQLite skips locking and journals
+    DATABASE_URL = (f"sqlite:///file:{s.db_sqlite_path}"
+                    "?mode=ro&immutable=1&uri=true"
+                    if s.db_sqlite_read_only
+                    else f"sqlite:///{s.db_sqlite_path}")
+else:
+    DATABASE_URL = f"postgresql://{s.db_user}:{s.db_password}@{s.db_host}:{
+        s.db_port}/{s.db_name}"
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    Tune every new SQLite connection for the API's read heavy workload.
+    """
+    cursor = dbapi_connection.cursor()
+    if s.db_sqlite_read_only:
+        cursor.execute("PRAGMA query_only = ON")
+    else:
+        # readers don't block the seeding writer and commits skip the fsync
+        # of every transaction
+        cursor.execute("PRAGMA journal_mode = WAL")
+        cursor.execute("PRAGMA synchronous = NORMAL")
+    # negative cache sizes are in KiB instead of pages
+    cursor.execute(f"PRAGMA cache_size = -{s.db_sqlite_cache_kib}")
+    cursor.execute(f"PRAGMA mmap_size = {s.db_sqlite_mmap_bytes}")
+    cursor.execute("PRAGMA temp_store = MEMORY")
+    cursor.close()
+
+
+def _engine_options(url: str) -> Dict[str, Any]:
+    """
+    Engine options specific to the backend of a database URL.
+    """
+    if url.startswith("sqlite"):
+        # SQLite has no schemas; the GTFS tables live in the file itself
+        return {}
+    return {
+        # unqualified GTFS tables live in the configured schema
+        "execution_options": {"schema_translate_map": {None: s.db_schema}}}
+
+
+def create_db_engine(url: str) -> Engine:
+    """
+    Create a sync engine to a database with the configured connection pool.
+
+    Args:
+        url (str): postgresql:// or sqlite:// URL of the database.
 
+    Returns:
+        Engine: A SQLModel engine reading the GTFS tables from db_schema, or
+        from the SQLite file.
+    """
+    db_engine = create_engine(
+        url,
+        # set to True for SQL query logging (development only)
+        echo=False,
+        # verify connection is still alive before using from pool
+        pool_pre_ping=True,
+        # recycle connections after one hour to avoid stale connections
+        pool_recycle=3600,
+        # pool that records how long checkouts wait for a connection
+        poolclass=timed_pool_class(),
+        pool_size=s.db_pool_size,
+        max_overflow=s.db_max_overflow,
+        pool_timeout=s.db_pool_timeout,
+        **_engine_options(url))
+    if db_engine.dialect.name == "sqlite":
+        event.listen(db_engine, "connect", _set_sqlite_pragmas)
+    track_queries(db_engine)
+    return db_engine
 
-engine = create_engine(
-    DATABASE_URL,
-    # set to True for SQL query logging (development only)
-    echo=False,
-    # verify connection is still alive before using from pool
-    pool_pre_ping=True,
-    # recycle connections after one hour to avoid stale connections
-    pool_recycle=3600,)
+
+def create_async_db_engine(url: str) -> AsyncEngine:
+    """
+    Create an asyncpg or aiosqlite engine to a database with the configured
+    connection pool, serving the API's static GTFS queries without holding a
+    thread per in-flight query.
+
+    Args:
+        url (str): postgresql:// or sqlite:// URL of the database.
+
+    Returns:
+        AsyncEngine: An async engine reading the GTFS tables from db_schema,
+        or from the SQLite file.
+    """
+    options = _engine_options(url)
+    if url.startswith("sqlite"):
+        url = url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    else:
+        url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
+        # only request queries are capped; the sync engine also runs the
+        # bulk loads and index builds of the db scripts
+        options["connect_args"] = {"server_settings": {
+            "statement_timeout": str(s.db_statement_timeout)}}
+
+    db_engine = create_async_engine(
+        url,
+        echo=False,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        poolclass=timed_pool_class(async_pool=True),
+        pool_size=s.db_pool_size,
+        max_overflow=s.db_max_overflow,
+        pool_timeout=s.db_pool_timeout,
+        **options)
+    if db_engine.dialect.name == "sqlite":
+        event.listen(db_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    track_queries(db_engine.sync_engine)
+    return db_engine
+
+
+# the primary database; the db scripts seed and refresh the data through it
+engine = create_db_engine(DATABASE_URL)
+async_engine = create_async_db_engine(DATABASE_URL)
 
 
 def get_db_engine():
@@ -32,6 +141,20 @@ def get_db_engine():
         Engine: A SQLModel engine that handles the connection and
         communication with the database.
     """
-    database_name = DATABASE_URL.split("/")[-1]
+    database_name = engine.url.database
     logger.info(f"Using database: '{database_name}'")
     return engine
+
+
+def get_schema_engine(schema: str) -> Engine:
+    """
+    Return an engine sharing the connection pool of the database engine whose
+    GTFS tables are read from and written to the given schema instead.
+
+    Args:
+        schema (str): Schema the unqualified GTFS tables map to.
+
+    Returns:
+        Engine: A SQLModel engine bound to the given schema.
+    """
+    return engine.execution_options(schema_translate_map={None: schema})
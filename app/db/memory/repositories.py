@@ -0,0 +1,209 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from heapq import merge
+from itertools import islice
+from typing import AsyncIterator, Collection, List, Tuple
+
+from app.db.memory.store import NO_TIME, StaticDataset
+from app.db.models.gtfs import Route, Stop, StopSchedule, StopTime, Trip
+from app.utils.timing import timed_methods
+
+# The in-memory repositories mirror the method signatures and results of the
+# async database repositories in app.db.repositories so services can use
+# either.
+
+
+@timed_methods("repo.routes")
+class MemoryRouteRepository:
+    def __init__(self, dataset: StaticDataset):
+        self.dataset = dataset
+
+    async def get_by_id(self, route_id: str) -> Route | None:
+        return self.dataset.routes_by_id.get(route_id)
+
+    async def get_all_by_ids(self,
+                             route_ids: Collection[str]) -> List[Route]:
+        routes_by_id = self.dataset.routes_by_id
+        return [routes_by_id[route_id] for route_id in route_ids
+                if route_id in routes_by_id]
+
+    async def get_all(self) -> List[Route]:
+        return list(self.dataset.routes)
+
+    async def stream_all(self) -> AsyncIterator[Route]:
+        for route in self.dataset.routes:
+            yield route
+
+
+@timed_methods("repo.stops")
+class MemoryStopRepository:
+    def __init__(self, dataset: StaticDataset):
+        self.dataset = dataset
+
+    async def get_by_id(self, stop_id: str) -> Stop | None:
+        return self.dataset.stops_by_id.get(stop_id)
+
+    async def get_all_by_ids(self, stop_ids: Collection[str]) -> List[Stop]:
+        stops_by_id = self.dataset.stops_by_id
+        return [stops_by_id[stop_id] for stop_id in stop_ids
+                if stop_id in stops_by_id]
+
+    async def get_all(self, direction_id: int | None) -> List[Stop]:
+        return [stop for stop in self.dataset.stops
+                if stop.parent_station is not None
+                and (direction_id is None
+                     or stop.direction_id == direction_id)]
+
+    async def stream_all(self,
+                         direction_id: int | None) -> AsyncIterator[Stop]:
+        for stop in self.dataset.stops:
+            if (stop.parent_station is not None
+                    and (direction_id is None
+                         or stop.direction_id == direction_id)):
+                yield stop
+
+    async def get_all_by_parent_station(self,
+                                        parent_station: str) -> List[Stop]:
+        return list(self.dataset.stops_by_parent.get(parent_station, ()))
+
+
+@timed_methods("repo.stop_times")
+class MemoryStopTimeRepository:
+    def __init__(self, dataset: StaticDataset):
+        self.dataset = dataset
+
+    async def get_all_by_trip_id(
+            self,
+            trip_id: str,
+            arrival_seconds: int | None,
+            departure_seconds: int | None) -> List[Tuple[StopTime, Stop]]:
+        dataset = self.dataset
+        results = []
+        # in stop_sequence order; time filters leave out stops without times
+        for row in dataset.trip_rows(trip_id):
+            arrival = dataset.st_arrival[row]
+            departure = dataset.st_departure[row]
+            if arrival_seconds is not None and (
+                    arrival == NO_TIME or arrival < arrival_seconds):
+                continue
+            if departure_seconds is not None and (
+                    departure == NO_TIME or departure > departure_seconds):
+                continue
+            stop = dataset.stops[dataset.st_stop[row]]
+            results.append((dataset.stop_time(row), stop))
+        return results
+
+    async def get_departures(
+            self,
+            stop_id: str,
+            route_id: str | None,
+            service_ids: Collection[str],
+            departure_seconds: int,
+            limit: int) -> List[Tuple[StopTime, Trip]]:
+        dataset = self.dataset
+        results = []
+        for row in dataset.stop_rows_departing_from(stop_id,
+                                                    departure_seconds):
+            trip = dataset.trips[dataset.st_trip[row]]
+            if route_id is not None and trip.route_id != route_id:
+                continue
+            if trip.service_id not in service_ids:
+                continue
+            results.append((dataset.stop_time(row), trip))
+            if len(results) == limit:
+                break
+        return results
+
+
+@timed_methods("repo.stop_schedules")
+class MemoryStopScheduleRepository:
+    def __init__(self, dataset: StaticDataset):
+        self.dataset = dataset
+
+    async def get_all_by_stop_id(
+            self,
+            stop_id: str,
+            route_id: str | None,
+            service_ids: Collection[str] | None,
+            arrival_seconds: int | None,
+            departure_seconds: int | None) -> List[StopSchedule]:
+        dataset = self.dataset
+        results = []
+        for row in dataset.stop_rows_from(stop_id, arrival_seconds):
+            # departures never precede arrivals; nothing later can match
+            if (departure_seconds is not None
+                    and dataset.st_arrival[row] > departure_seconds):
+                break
+            if (departure_seconds is not None
+                    and dataset.st_departure[row] > departure_seconds):
+                continue
+
+            trip = dataset.trips[dataset.st_trip[row]]
+            if route_id is not None and trip.route_id != route_id:
+                continue
+            if service_ids is not None and trip.service_id not in service_ids:
+                continue
+            results.append(dataset.stop_schedule(row))
+        return results
+
+
+@timed_methods("repo.trips")
+class MemoryTripRepository:
+    def __init__(self, dataset: StaticDataset):
+        self.dataset = dataset
+
+    async def get_by_id(self, trip_id: str) -> Trip | None:
+        trip = self.dataset.trip_index.get(trip_id)
+        return self.dataset.trips[trip] if trip is not None else None
+
+    async def get_all_by_ids(self, trip_ids: Collection[str]) -> List[Trip]:
+        trip_index = self.dataset.trip_index
+        return [self.dataset.trips[trip_index[trip_id]]
+                for trip_id in trip_ids if trip_id in trip_index]
+
+    async def get_all(self,
+                      route_id: str | None,
+                      service_ids: Collection[str] | None,
+                      direction_id: int | None,
+                      after_trip_id: str | None = None,
+                      offset: int = 0,
+                      limit: int = 100) -> List[Trip]:
+        # first trip index past the cursor; trip indexes follow trip_id order
+        start = 0
+        if after_trip_id is not None:
+            start = bisect_right(self.dataset.trips, after_trip_id,
+                                 key=lambda trip: trip.trip_id)
+
+        groups = [trips[bisect_left(trips, start):]
+                  for trips in self._groups(route_id,
+                                            service_ids,
+                                            direction_id)]
+        page = islice(merge(*groups), offset, offset + limit)
+        return [self.dataset.trips[trip] for trip in page]
+
+    async def count(self,
+                    route_id: str | None,
+                    service_ids: Collection[str] | None,
+                    direction_id: int | None) -> int:
+        return sum(len(trips) for trips in self._groups(route_id,
+                                                        service_ids,
+                                                        direction_id))
+
+    async def stream_all(self,
+                         route_id: str | None,
+                         service_ids: Collection[str] | None,
+                         direction_id: int | None) -> AsyncIterator[Trip]:
+        for trip in merge(*self._groups(route_id, service_ids, direction_id)):
+            yield self.dataset.trips[trip]
+
+    def _groups(self,
+                route_id: str | None,
+                service_ids: Collection[str] | None,
+                direction_id: int | None) -> List[array]:
+        # every group is sorted by trip index, i.e. by trip_id
+        return [
+            trips for (group_route_id, service_id, group_direction_id), trips
+            in self.dataset.trip_groups.items()
+            if (route_id is None or group_route_id == route_id)
+            and (service_ids is None or service_id in service_ids)
+            and (direction_id is None or group_direction_id == direction_id)]
@@ -0,0 +1,111 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+from app.db.memory.source import StaticSource
+from app.db.memory.timetable import Timetable
+from app.utils.logger import logger
+
+
+@dataclass(frozen=True)
+class StopPattern:
+    stop_ids: Tuple[str, ...]
+    trips: int
+
+
+@dataclass(frozen=True)
+class DirectionStops:
+    direction_id: int
+    # every stop served in this direction, in travel order
+    stop_ids: Tuple[str, ...]
+    # distinct stop sequences, most trips first
+    patterns: Tuple[StopPattern, ...]
+
+
+def merge_stop_sequences(sequences: List[Tuple[str, ...]]) -> List[str]:
+    """
+    Merge stop sequences into a single list keeping the travel order of
+    each. Stops missing from the list so far are inserted right after the
+    stop preceding them in their sequence, so the first sequences decide
+    the order of stops that sequences visit in a different order.
+    """
+    merged: List[str] = []
+    for sequence in sequences:
+        index = -1
+        for stop_id in sequence:
+            if stop_id in merged:
+                index = merged.index(stop_id)
+            else:
+                index += 1
+                merged.insert(index, stop_id)
+    return merged
+
+
+class RouteStopLists:
+    """
+    Immutable ordered stop lists and distinct stop patterns of every route
+    and direction, aggregated from the trip patterns of the timetable.
+    """
+
+    def __init__(self, route_ids: Iterable[str], timetable: Timetable):
+        # (route_id, direction_id) -> stop sequence -> trips
+        counts: Dict[Tuple[str, int], Dict[Tuple[str, ...], int]] = {}
+        for pattern in timetable.patterns:
+            direction_id = timetable.trips_by_id[
+                pattern.trip_ids[0]].direction_id
+            sequences = counts.setdefault((pattern.route_id, direction_id),
+                                          {})
+            stop_ids = tuple(pattern.stop_ids)
+            sequences[stop_ids] = (sequences.get(stop_ids, 0)
+                                   + len(pattern.trip_ids))
+
+        self.routes: Dict[str, List[DirectionStops]] = {
+            route_id: [] for route_id in route_ids}
+        for (route_id, direction_id), sequences in sorted(counts.items()):
+            patterns = tuple(
+                StopPattern(stop_ids=stop_ids, trips=trips)
+                for stop_ids, trips in sorted(
+                    sequences.items(),
+                    key=lambda item: (-item[1], item[0])))
+            stop_ids = merge_stop_sequences(
+                [pattern.stop_ids for pattern in patterns])
+            self.routes.setdefault(route_id, []).append(
+                DirectionStops(direction_id=direction_id,
+                               stop_ids=tuple(stop_ids),
+                               patterns=patterns))
+
+
+class RouteStopStore:
+    """
+    Holder of the current route stop lists. Reloading builds the complete
+    lists first and then replaces the reference in a single assignment.
+    """
+
+    def __init__(self):
+        self._stop_lists: RouteStopLists | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._stop_lists is not None
+
+    @property
+    def stop_lists(self) -> RouteStopLists:
+        if self._stop_lists is None:
+            raise RuntimeError("Route stop lists have not been loaded")
+        return self._stop_lists
+
+    def load(self, source: StaticSource, timetable: Timetable) -> None:
+        """
+        (Re)build the route stop lists from the timetable's trip patterns.
+
+        Args:
+            source (StaticSource): Database or snapshot to read the routes
+                                   from
+            timetable (Timetable): Timetable of the same dataset
+        """
+        route_ids = [route.route_id for route in source.routes()]
+        stop_lists = RouteStopLists(route_ids, timetable)
+        self._stop_lists = stop_lists
+        logger.info(f"Built stop lists of {len(stop_lists.routes)} routes")
+
+
+route_stop_store = RouteStopStore()
@@ -0,0 +1,142 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+from app.db.memory.source import StaticSource
+from app.settings import settings
+from app.utils.geometry import encode_polyline, simplify
+from app.utils.logger import logger
+
+
+@dataclass(frozen=True)
+class EncodedShape:
+    shape_id: str
+    # zoom level the shape was simplified for, None at full resolution
+    zoom: int | None
+    points: int
+    polyline: str
+
+
+def zoom_tolerance(zoom: int) -> float:
+    """
+    Degrees covered by a pixel of a 256 pixel web map tile at a zoom level.
+    Deviations smaller than that are invisible at that zoom.
+    """
+    return 360 / (256 * 2 ** zoom)
+
+
+class ShapeSet:
+    """
+    Immutable set of encoded polylines of every shape, precomputed at full
+    resolution and simplified for each of the configured zoom levels, with
+    the shapes used by each route and trip.
+    """
+
+    def __init__(self,
+                 route_ids: Iterable[str],
+                 trip_shapes: Iterable[Tuple[str, str, str | None]],
+                 shape_rows: Iterable[Tuple[str, float, float]],
+                 zoom_levels: List[int]):
+        self.zoom_levels = sorted(zoom_levels)
+
+        # shape rows are (shape_id, lat, lon) sorted by shape and sequence
+        points: Dict[str, List[Tuple[float, float]]] = {}
+        for shape_id, lat, lon in shape_rows:
+            points.setdefault(shape_id, []).append((lat, lon))
+
+        # shape ID -> encoded shape per zoom level, None at full resolution
+        self.shapes: Dict[str, Dict[int | None, EncodedShape]] = {}
+        for shape_id, line in points.items():
+            encoded = {None: EncodedShape(shape_id=shape_id,
+                                          zoom=None,
+                                          points=len(line),
+                                          polyline=encode_polyline(line))}
+            for zoom in self.zoom_levels:
+                simplified = simplify(line, zoom_tolerance(zoom))
+                encoded[zoom] = EncodedShape(
+                    shape_id=shape_id,
+                    zoom=zoom,
+                    points=len(simplified),
+                    polyline=encode_polyline(simplified))
+            self.shapes[shape_id] = encoded
+
+        route_shapes: Dict[str, set] = {route_id: set()
+                                        for route_id in route_ids}
+        self.trip_shapes: Dict[str, str | None] = {}
+        for trip_id, route_id, shape_id in trip_shapes:
+            self.trip_shapes[trip_id] = shape_id
+            if shape_id in self.shapes:
+                route_shapes.setdefault(route_id, set()).add(shape_id)
+        self.route_shapes: Dict[str, List[str]] = {
+            route_id: sorted(shape_ids)
+            for route_id, shape_ids in route_shapes.items()}
+
+    def get(self, shape_id: str, zoom: int | None) -> EncodedShape | None:
+        """
+        Get a shape with enough detail for a zoom level: simplified for the
+        lowest configured level at or above it, or at full resolution if the
+        zoom is above every level or None.
+        """
+        encoded = self.shapes.get(shape_id)
+        if encoded is None:
+            return None
+        if zoom is not None:
+            for level in self.zoom_levels:
+                if level >= zoom:
+                    return encoded[level]
+        return encoded[None]
+
+    @classmethod
+    def load(cls, source: StaticSource) -> "ShapeSet":
+        """
+        Load and encode the shapes from a source.
+
+        Args:
+            source (StaticSource): Database or snapshot to read the tables
+                                   from
+
+        Returns:
+            ShapeSet: The encoded shapes
+        """
+        return cls([route.route_id for route in source.routes()],
+                   [(trip.trip_id, trip.route_id, trip.shape_id)
+                    for trip in source.trips()],
+                   source.shape_rows(),
+                   settings.shape_zoom_levels)
+
+
+class ShapeStore:
+    """
+    Holder of the current encoded shapes. Reloading encodes every shape
+    first and then replaces the reference in a single assignment, so readers
+    always see a complete set.
+    """
+
+    def __init__(self):
+        self._shapes: ShapeSet | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._shapes is not None
+
+    @property
+    def shapes(self) -> ShapeSet:
+        if self._shapes is None:
+            raise RuntimeError("Shapes have not been loaded")
+        return self._shapes
+
+    def load(self, source: StaticSource) -> None:
+        """
+        (Re)load and encode the shapes.
+
+        Args:
+            source (StaticSource): Database or snapshot to read the tables
+                                   from
+        """
+        logger.info("Encoding shape polylines")
+        shapes = ShapeSet.load(source)
+        self._shapes = shapes
+        logger.info(f"Encoded {len(shapes.shapes)} shapes at "
+                    f"{len(shapes.zoom_levels) + 1} levels of detail")
+
+
+shape_store = ShapeStore()
@@ -0,0 +1,224 @@
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+import pyarrow as pa
+from sqlalchemy.orm import configure_mappers
+from sqlmodel import Session, SQLModel, select
+
+from app.db.models.gtfs import (Calendar, CalendarDate, Route, Shape, Stop,
+                                StopTime, Transfer, Trip)
+from app.db.snapshot import Snapshot
+
+# number of stop time and shape point rows fetched per round trip while
+# loading
+LOAD_BATCH_SIZE = 50000
+
+# (trip_id, stop_sequence, stop_id, arrival_seconds, departure_seconds)
+StopTimeRow = Tuple[str, int, str, int, int]
+
+# (shape_id, shape_pt_lat, shape_pt_lon)
+ShapeRow = Tuple[str, float, float]
+
+
+# The sources read the static GTFS tables the in-memory structures are built
+# from, either from the database or from a columnar snapshot. Both expose the
+# same methods and row orders. Model instances are read once per source and
+# shared by every structure built from it, so they must not be modified.
+
+
+class DatabaseSource:
+    """
+    Static GTFS tables read from the database.
+
+    Args:
+        session (Session): Database session to read the tables with
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+        self._models: Dict[type[SQLModel], List[Any]] = {}
+
+    def _all(self, model: type[SQLModel]) -> List[Any]:
+        if model not in self._models:
+            # primary key order, like the tables of a snapshot
+            query = select(model).order_by(
+                *model.__table__.primary_key.columns)
+            self._models[model] = list(self.session.exec(query).all())
+            # detached so the instances outlive the session
+            self.session.expunge_all()
+        return self._models[model]
+
+    def routes(self) -> List[Route]:
+        return self._all(Route)
+
+    def stops(self) -> List[Stop]:
+        return self._all(Stop)
+
+    def trips(self) -> List[Trip]:
+        return self._all(Trip)
+
+    def transfers(self) -> List[Transfer]:
+        return self._all(Transfer)
+
+    def calendars(self) -> List[Calendar]:
+        return self._all(Calendar)
+
+    def calendar_dates(self) -> List[CalendarDate]:
+        return self._all(CalendarDate)
+
+    def stop_time_rows(self) -> Iterable[StopTimeRow]:
+        """
+        Stop time rows ordered by trip_id and stop_sequence, streamed in
+        batches.
+        """
+        query = (select(StopTime.trip_id,
+                        StopTime.stop_sequence,
+                        StopTime.stop_id,
+                        StopTime.arrival_seconds,
+                        StopTime.departure_seconds)
+                 .order_by(StopTime.trip_id, StopTime.stop_sequence)
+                 .execution_options(yield_per=LOAD_BATCH_SIZE))
+        return self.session.execute(query)
+
+    def shape_rows(self) -> Iterable[ShapeRow]:
+        """
+        Shape point rows ordered by shape_id and shape_pt_sequence, streamed
+        in batches.
+        """
+        query = (select(Shape.shape_id, Shape.shape_pt_lat, Shape.shape_pt_lon)
+                 .order_by(Shape.shape_id, Shape.shape_pt_sequence)
+                 .execution_options(yield_per=LOAD_BATCH_SIZE))
+        return self.session.execute(query)
+
+
+# memoryview formats of the fixed-width column types read straight from the
+# mapped Arrow buffers
+_BUFFER_FORMATS = {pa.int32(): "i", pa.float64(): "d"}
+
+
+def _buffer_view(chunk: pa.Array) -> memoryview:
+    # the values of a chunk without nulls, viewed in its mapped buffer
+    view = memoryview(chunk.buffers()[1]).cast(_BUFFER_FORMATS[chunk.type])
+    return view[chunk.offset:chunk.offset + len(chunk)]
+
+
+class _MappedColumn:
+    """
+    Values of a snapshot column iterated straight from the memoryviews of its
+    mapped chunks, without copying them into Python lists. Dictionary encoded
+    columns keep their mapped indices, each converted to the Python object of
+    its dictionary value on iteration.
+    """
+
+    def __init__(self,
+                 views: List[memoryview],
+                 dictionary: List[Any] | None = None):
+        self.views = views
+        self.dictionary = dictionary
+
+    def __iter__(self) -> Iterator[Any]:
+        values = chain.from_iterable(self.views)
+        if self.dictionary is None:
+            return values
+        return map(self.dictionary.__getitem__, values)
+
+
+def _column(table: pa.Table, name: str) -> Iterable[Any]:
+    """
+    Values of a snapshot column. Integer and float columns and dictionary
+    encoded columns without nulls are read from the mapped buffers, every
+    distinct dictionary value being converted to a Python object only once.
+    Other columns, all in small tables, are converted to Python lists.
+    """
+    column = table.column(name)
+    if column.num_chunks == 0:
+        return []
+    if pa.types.is_dictionary(column.type):
+        # the batches of a snapshot file share one dictionary
+        dictionary = column.chunk(0).dictionary.to_pylist()
+        if column.null_count:
+            return [dictionary[i] if i is not None else None
+                    for chunk in column.chunks
+                    for i in chunk.indices.to_pylist()]
+        return _MappedColumn([_buffer_view(chunk.indices)
+                              for chunk in column.chunks],
+                             dictionary)
+    if column.type in _BUFFER_FORMATS and not column.null_count:
+        return _MappedColumn([_buffer_view(chunk)
+                              for chunk in column.chunks])
+    return column.to_pylist()
+
+
+class SnapshotSource:
+    """
+    Static GTFS tables read from a memory-mapped columnar snapshot. The
+    tables are stored in primary key order, which gives the row orders of
+    DatabaseSource.
+
+    Args:
+        snapshot (Snapshot): Snapshot of the loaded dataset version
+    """
+
+    def __init__(self, snapshot: Snapshot):
+        self.snapshot = snapshot
+        self._models: Dict[str, List[Any]] = {}
+        self._columns: Dict[Tuple[str, str], Iterable[Any]] = {}
+
+    def _columns_of(self, name: str, *columns: str) -> List[Iterable[Any]]:
+        # mapped once per source since several structures read the same
+        # stop_times columns
+        missing = [column for column in columns
+                   if (name, column) not in self._columns]
+        if missing:
+            table = self.snapshot.table(name)
+            for column in missing:
+                self._columns[(name, column)] = _column(table, column)
+        return [self._columns[(name, column)] for column in columns]
+
+    def _all(self, name: str, model: type[SQLModel]) -> List[Any]:
+        if name not in self._models:
+            names = [column.name for column in model.__table__.columns]
+            # rows were validated when they were written to the database,
+            # so instances are built without validating them again, which
+            # skips the mapper configuration the constructor would trigger
+            configure_mappers()
+            self._models[name] = [
+                model.model_construct(**dict(zip(names, values)))
+                for values in zip(*self._columns_of(name, *names))]
+        return self._models[name]
+
+    def routes(self) -> List[Route]:
+        return self._all("routes", Route)
+
+    def stops(self) -> List[Stop]:
+        return self._all("stops", Stop)
+
+    def trips(self) -> List[Trip]:
+        return self._all("trips", Trip)
+
+    def transfers(self) -> List[Transfer]:
+        return self._all("transfers", Transfer)
+
+    def calendars(self) -> List[Calendar]:
+        return self._all("calendar", Calendar)
+
+    def calendar_dates(self) -> List[CalendarDate]:
+        return self._all("calendar_dates", CalendarDate)
+
+    def stop_time_rows(self) -> Iterable[StopTimeRow]:
+        """
+        Stop time rows ordered by trip_id and stop_sequence.
+        """
+        return zip(*self._columns_of("stop_times", "trip_id",
+                                     "stop_sequence", "stop_id",
+                                     "arrival_seconds", "departure_seconds"))
+
+    def shape_rows(self) -> Iterable[ShapeRow]:
+        """
+        Shape point rows ordered by shape_id and shape_pt_sequence.
+        """
+        return zip(*self._columns_of("shapes", "shape_id", "shape_pt_lat",
+                                     "shape_pt_lon"))
+
+
+StaticSource = DatabaseSource | SnapshotSource
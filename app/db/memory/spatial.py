@@ -0,0 +1,143 @@
+import heapq
+import math
+from statistics import fmean
+from typing import Dict, List, Tuple
+
+from app.db.memory.source import StaticSource
+from app.db.models.gtfs import Stop
+from app.settings import settings
+from app.utils.helpers import EARTH_RADIUS, haversine
+from app.utils.logger import logger
+
+# meters per degree of latitude
+METERS_PER_DEGREE = EARTH_RADIUS * math.pi / 180
+
+
+class StopGrid:
+    """
+    Immutable uniform grid of stops bucketed by coordinates. A radius search
+    only measures the distance to the stops of the cells overlapping the
+    bounding box of the search circle, so its cost grows with the number of
+    stops nearby instead of the number of stops.
+
+    Args:
+        stops (List[Stop]): Stops to index
+        cell_meters (float): Approximate width and height of a cell
+    """
+
+    def __init__(self, stops: List[Stop], cell_meters: float):
+        self.cell_lat = cell_meters / METERS_PER_DEGREE
+        # longitude degrees shrink with latitude; size the cells for the
+        # stops' mean latitude so they stay roughly square
+        mean_lat = fmean(stop.stop_lat for stop in stops) if stops else 0.0
+        self.cell_lon = self.cell_lat / max(math.cos(math.radians(mean_lat)),
+                                            0.01)
+        self.cells: Dict[Tuple[int, int], List[Stop]] = {}
+        for stop in stops:
+            self.cells.setdefault(self._cell(stop.stop_lat, stop.stop_lon),
+                                  []).append(stop)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (math.floor(lat / self.cell_lat),
+                math.floor(lon / self.cell_lon))
+
+    def nearby(self,
+               lat: float,
+               lon: float,
+               radius: float,
+               limit: int) -> List[Tuple[Stop, float]]:
+        """
+        Find the stops closest to a coordinate within a radius.
+
+        Args:
+            lat (float): Latitude to search around
+            lon (float): Longitude to search around
+            radius (float): Search radius in meters
+            limit (int): Maximum number of stops to return
+
+        Returns:
+            List[Tuple[Stop, float]]: Stops and their distance in meters,
+            closest first
+        """
+        lat_span = radius / METERS_PER_DEGREE
+        lon_span = lat_span / max(math.cos(math.radians(lat)), 0.01)
+        south, west = self._cell(lat - lat_span, lon - lon_span)
+        north, east = self._cell(lat + lat_span, lon + lon_span)
+
+        if (north - south + 1) * (east - west + 1) > len(self.cells):
+            cells = self.cells.values()
+        else:
+            cells = (self.cells.get((i, j), ())
+                     for i in range(south, north + 1)
+                     for j in range(west, east + 1))
+
+        candidates = []
+        for cell in cells:
+            for stop in cell:
+                distance = haversine(lat, lon, stop.stop_lat, stop.stop_lon)
+                if distance <= radius:
+                    candidates.append((distance, stop.stop_id, stop))
+
+        return [(stop, distance) for distance, _, stop
+                in heapq.nsmallest(limit, candidates)]
+
+
+class StopSpatialIndex:
+    """
+    Holder of the spatial grids of every stop and of stations only.
+    Reloading builds new grids first and then replaces the reference in a
+    single assignment, so readers always see a consistent pair.
+    """
+
+    def __init__(self):
+        self._grids: Tuple[StopGrid, StopGrid] | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._grids is not None
+
+    def nearby(self,
+               lat: float,
+               lon: float,
+               radius: float,
+               limit: int,
+               stations: bool = False) -> List[Tuple[Stop, float]]:
+        """
+        Find the stops, or the stations, closest to a coordinate within a
+        radius.
+
+        Args:
+            lat (float): Latitude to search around
+            lon (float): Longitude to search around
+            radius (float): Search radius in meters
+            limit (int): Maximum number of stops to return
+            stations (bool): Only return parent stations and stops without
+                one
+
+        Returns:
+            List[Tuple[Stop, float]]: Stops and their distance in meters,
+            closest first
+        """
+        if self._grids is None:
+            raise RuntimeError("Stop spatial index has not been loaded")
+        grid = self._grids[1] if stations else self._grids[0]
+        return grid.nearby(lat, lon, radius, limit)
+
+    def load(self, source: StaticSource) -> None:
+        """
+        (Re)build the spatial grids.
+
+        Args:
+            source (StaticSource): Database or snapshot to read the stops
+                                   from
+        """
+        stops = source.stops()
+        cell_meters = settings.spatial_cell_meters
+        self._grids = (
+            StopGrid(stops, cell_meters),
+            StopGrid([stop for stop in stops if stop.parent_station is None],
+                     cell_meters))
+        logger.info(f"Built spatial index of {len(stops)} stops")
+
+
+stop_spatial_index = StopSpatialIndex()
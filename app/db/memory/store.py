@@ -0,0 +1,221 @@
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Tuple
+
+from app.db.memory.source import StaticSource
+from app.db.models.gtfs import Route, Stop, StopSchedule, StopTime, Trip
+from app.utils.helpers import seconds_to_time
+from app.utils.logger import logger
+
+# arrival or departure of a stop time without times in the typed arrays
+NO_TIME = -1
+
+
+class StaticDataset:
+    """
+    Immutable in-memory copy of the routes, stops, trips and stop_times
+    tables with precomputed lookup indexes.
+
+    Routes, stops and trips are kept as detached model instances. The much
+    larger stop_times table is stored column-wise in typed arrays, sorted by
+    (trip, stop_sequence) so every trip owns a contiguous row range, and is
+    only materialized into StopTime instances for returned rows. Stop times
+    without times are stored as NO_TIME and left out of the per-stop
+    indexes, like they are left out of the stop schedule.
+    """
+
+    def __init__(self,
+                 routes: List[Route],
+                 stops: List[Stop],
+                 trips: List[Trip],
+                 stop_time_rows: Iterable[Tuple[str, int, str, int, int]]):
+        self.routes = routes
+        self.routes_by_id: Dict[str, Route] = {
+            route.route_id: route for route in routes}
+
+        self.stops = stops
+        self.stops_by_id: Dict[str, Stop] = {
+            stop.stop_id: stop for stop in stops}
+        stop_index = {stop.stop_id: i for i, stop in enumerate(stops)}
+        self.stops_by_parent: Dict[str, List[Stop]] = {}
+        for stop in stops:
+            if stop.parent_station is not None:
+                self.stops_by_parent.setdefault(
+                    stop.parent_station, []).append(stop)
+
+        # trips sorted by trip_id so listings page in a stable order
+        self.trips = sorted(trips, key=lambda trip: trip.trip_id)
+        self.trip_index: Dict[str, int] = {
+            trip.trip_id: i for i, trip in enumerate(self.trips)}
+
+        # (route_id, service_id, direction_id) -> sorted trip indexes
+        self.trip_groups: Dict[Tuple[str, str, int], array] = {}
+        for i, trip in enumerate(self.trips):
+            key = (trip.route_id, trip.service_id, trip.direction_id)
+            self.trip_groups.setdefault(key, array("i")).append(i)
+
+        # stop_times columns sorted by (trip, stop_sequence)
+        rows = sorted((self.trip_index[trip_id], sequence, stop_index[stop_id],
+                       NO_TIME if arrival is None else arrival,
+                       NO_TIME if departure is None else departure)
+                      for trip_id, sequence, stop_id, arrival, departure
+                      in stop_time_rows)
+        self.st_trip = array("i", (row[0] for row in rows))
+        self.st_sequence = array("i", (row[1] for row in rows))
+        self.st_stop = array("i", (row[2] for row in rows))
+        self.st_arrival = array("i", (row[3] for row in rows))
+        self.st_departure = array("i", (row[4] for row in rows))
+        del rows
+
+        # trip index -> [start, end) stop time row range
+        self.trip_offsets = array("i", [0] * (len(self.trips) + 1))
+        for trip in self.st_trip:
+            self.trip_offsets[trip + 1] += 1
+        for i in range(len(self.trips)):
+            self.trip_offsets[i + 1] += self.trip_offsets[i]
+
+        # stop ID -> stop time rows and their arrivals sorted by arrival,
+        # and the same rows and their departures sorted by departure
+        rows_by_stop: Dict[int, List[int]] = {}
+        for row, stop in enumerate(self.st_stop):
+            if (self.st_arrival[row] != NO_TIME
+                    and self.st_departure[row] != NO_TIME):
+                rows_by_stop.setdefault(stop, []).append(row)
+        self.stop_rows: Dict[str, array] = {}
+        self.stop_arrivals: Dict[str, array] = {}
+        self.stop_departure_rows: Dict[str, array] = {}
+        self.stop_departures: Dict[str, array] = {}
+        for stop, rows in rows_by_stop.items():
+            stop_id = stops[stop].stop_id
+            rows.sort(key=lambda row: self.st_arrival[row])
+            self.stop_rows[stop_id] = array("i", rows)
+            self.stop_arrivals[stop_id] = array(
+                "i", (self.st_arrival[row] for row in rows))
+            rows.sort(key=lambda row: self.st_departure[row])
+            self.stop_departure_rows[stop_id] = array("i", rows)
+            self.stop_departures[stop_id] = array(
+                "i", (self.st_departure[row] for row in rows))
+
+    def trip_rows(self, trip_id: str) -> range:
+        """
+        Stop time rows of a trip in stop_sequence order.
+        """
+        trip = self.trip_index.get(trip_id)
+        if trip is None:
+            return range(0)
+        return range(self.trip_offsets[trip], self.trip_offsets[trip + 1])
+
+    def stop_rows_from(self, stop_id: str, arrival_seconds: int | None):
+        """
+        Stop time rows of a stop in arrival order, starting at the first
+        arrival at or after arrival_seconds.
+        """
+        rows = self.stop_rows.get(stop_id)
+        if rows is None:
+            return iter(())
+
+        start = 0
+        if arrival_seconds is not None:
+            start = bisect_left(self.stop_arrivals[stop_id], arrival_seconds)
+        return (rows[i] for i in range(start, len(rows)))
+
+    def stop_rows_departing_from(self, stop_id: str, departure_seconds: int):
+        """
+        Stop time rows of a stop in departure order, starting at the first
+        departure at or after departure_seconds.
+        """
+        rows = self.stop_departure_rows.get(stop_id)
+        if rows is None:
+            return iter(())
+
+        start = bisect_left(self.stop_departures[stop_id], departure_seconds)
+        return (rows[i] for i in range(start, len(rows)))
+
+    def stop_time(self, row: int) -> StopTime:
+        """
+        Materialize a stop time row.
+        """
+        arrival = self.st_arrival[row]
+        departure = self.st_departure[row]
+        arrival = None if arrival == NO_TIME else arrival
+        departure = None if departure == NO_TIME else departure
+        # a missing time is null, like the seeded column
+        return StopTime(trip_id=self.trips[self.st_trip[row]].trip_id,
+                        stop_sequence=self.st_sequence[row],
+                        stop_id=self.stops[self.st_stop[row]].stop_id,
+                        arrival_time=(seconds_to_time(arrival)
+                                      if arrival is not None else None),
+                        departure_time=(seconds_to_time(departure)
+                                        if departure is not None else None),
+                        arrival_seconds=arrival,
+                        departure_seconds=departure)
+
+    def stop_schedule(self, row: int) -> StopSchedule:
+        """
+        Materialize a stop time row as a stop schedule row of its stop.
+        """
+        trip = self.trips[self.st_trip[row]]
+        return StopSchedule(stop_id=self.stops[self.st_stop[row]].stop_id,
+                            arrival_seconds=self.st_arrival[row],
+                            trip_id=trip.trip_id,
+                            departure_seconds=self.st_departure[row],
+                            service_id=trip.service_id,
+                            route_id=trip.route_id,
+                            trip_headsign=trip.trip_headsign,
+                            direction_id=trip.direction_id)
+
+    @classmethod
+    def load(cls, source: StaticSource) -> "StaticDataset":
+        """
+        Load the static GTFS tables from a source.
+
+        Args:
+            source (StaticSource): Database or snapshot to read the tables
+                                   from
+
+        Returns:
+            StaticDataset: The loaded dataset
+        """
+        return cls(source.routes(),
+                   source.stops(),
+                   source.trips(),
+                   source.stop_time_rows())
+
+
+class StaticStore:
+    """
+    Holder of the current in-memory static GTFS dataset. Reloading builds a
+    complete new dataset first and then replaces the reference in a single
+    assignment, so readers always see either the old or the new dataset.
+    """
+
+    def __init__(self):
+        self._dataset: StaticDataset | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._dataset is not None
+
+    @property
+    def dataset(self) -> StaticDataset:
+        if self._dataset is None:
+            raise RuntimeError("Static GTFS dataset has not been loaded")
+        return self._dataset
+
+    def load(self, source: StaticSource) -> None:
+        """
+        (Re)load the static GTFS dataset.
+
+        Args:
+            source (StaticSource): Database or snapshot to read the tables
+                                   from
+        """
+        logger.info("Loading static GTFS dataset into memory")
+        dataset = StaticDataset.load(source)
+        self._dataset = dataset
+        logger.info(f"Loaded {len(dataset.routes)} routes, "
+                    f"{len(dataset.stops)} stops, {len(dataset.trips)} trips "
+                    f"and {len(dataset.st_trip)} stop times into memory")
+
+
+static_store = StaticStore()
@@ -0,0 +1,223 @@
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
+
+from app.db.memory.source import StaticSource
+from app.db.models.gtfs import Stop, Transfer, Trip
+from app.utils.logger import logger
+
+# transfers.txt transfer_type of transfers that can't be made
+TRANSFER_NOT_POSSIBLE = 3
+
+
+@dataclass
+class Pattern:
+    """
+    Trips of a route and service visiting the same stops in the same order,
+    sorted by departure. No trip of a pattern overtakes another one, so the
+    departures at every stop are sorted too and the first catchable trip can
+    be found with a binary search.
+    """
+    route_id: str
+    service_id: str
+    # stop IDs in visiting order and the station index of each stop
+    stop_ids: List[str]
+    stations: array
+    trip_ids: List[str] = field(default_factory=list)
+    # per stop position, the arrival and departure of each trip in seconds
+    # relative to the service day
+    arrivals: List[array] = field(default_factory=list)
+    departures: List[array] = field(default_factory=list)
+
+
+class Timetable:
+    """
+    Immutable trip-based timetable of the static GTFS data used for journey
+    planning. Stops are grouped into stations: every stop of a station is
+    reachable from the others within the station's minimum transfer time,
+    and transfers between stations are walked in their min_transfer_time.
+    """
+
+    def __init__(self,
+                 stops: List[Stop],
+                 trips: List[Trip],
+                 transfers: List[Transfer],
+                 stop_time_rows: Iterable[Tuple[str, str, int, int]]):
+        self.stops_by_id: Dict[str, Stop] = {
+            stop.stop_id: stop for stop in stops}
+        self.trips_by_id: Dict[str, Trip] = {
+            trip.trip_id: trip for trip in trips}
+
+        # stations are parent stations and stops without one
+        self.stations: List[Stop] = sorted(
+            (stop for stop in stops if stop.parent_station is None),
+            key=lambda stop: stop.stop_id)
+        self.station_index: Dict[str, int] = {
+            station.stop_id: i for i, station in enumerate(self.stations)}
+        self.stop_station: Dict[str, int] = {
+            stop.stop_id: self.station_index[
+                stop.parent_station or stop.stop_id]
+            for stop in stops}
+
+        # seconds needed to change trains within a station, and walking
+        # transfers to other stations
+        self.change_seconds = array("i", [0] * len(self.stations))
+        self.footpaths: List[List[Tuple[int, int]]] = [
+            [] for _ in self.stations]
+        for transfer in transfers:
+            if transfer.transfer_type == TRANSFER_NOT_POSSIBLE:
+                continue
+            origin = self.stop_station[transfer.from_stop_id]
+            destination = self.stop_station[transfer.to_stop_id]
+            seconds = transfer.min_transfer_time or 0
+            if origin == destination:
+                self.change_seconds[origin] = max(
+                    self.change_seconds[origin], seconds)
+            else:
+                self.footpaths[origin].append((destination, seconds))
+
+        self.patterns = self._build_patterns(stop_time_rows)
+
+        # station index -> (pattern index, stop position) visiting it
+        self.station_patterns: List[List[Tuple[int, int]]] = [
+            [] for _ in self.stations]
+        for p, pattern in enumerate(self.patterns):
+            for position, station in enumerate(pattern.stations):
+                self.station_patterns[station].append((p, position))
+
+    def _build_patterns(
+            self,
+            stop_time_rows: Iterable[Tuple[str, str, int, int]]
+    ) -> List[Pattern]:
+        # rows are (trip_id, stop_id, arrival, departure) sorted by trip and
+        # stop_sequence
+        # (route_id, service_id, stop IDs) -> trips as (trip_id, arrivals,
+        # departures)
+        groups: Dict[Tuple[str, str, Tuple[str, ...]], List[tuple]] = {}
+
+        def add_trip(trip_id, stop_ids, arrivals, departures):
+            trip = self.trips_by_id[trip_id]
+            key = (trip.route_id, trip.service_id, tuple(stop_ids))
+            groups.setdefault(key, []).append((trip_id, arrivals, departures))
+
+        trip_id = None
+        stop_ids, arrivals, departures = [], [], []
+        for row_trip_id, stop_id, arrival, departure in stop_time_rows:
+            if row_trip_id != trip_id:
+                if trip_id is not None:
+                    add_trip(trip_id, stop_ids, arrivals, departures)
+                trip_id = row_trip_id
+                stop_ids, arrivals, departures = [], [], []
+            stop_ids.append(stop_id)
+            arrivals.append(arrival)
+            departures.append(departure)
+        if trip_id is not None:
+            add_trip(trip_id, stop_ids, arrivals, departures)
+
+        patterns = []
+        for (route_id, service_id, stop_ids), trips in groups.items():
+            if len(stop_ids) < 2:
+                continue
+            trips.sort(key=lambda trip: (trip[2][0], trip[0]))
+
+            # split off trips overtaking or overtaken by the previous trip of
+            # the pattern so every stop's departures stay sorted
+            sub_patterns: List[List[tuple]] = []
+            for trip in trips:
+                for sub_pattern in sub_patterns:
+                    last = sub_pattern[-1]
+                    if (all(a <= b for a, b in zip(last[1], trip[1]))
+                            and all(a <= b for a, b in zip(last[2], trip[2]))):
+                        sub_pattern.append(trip)
+                        break
+                else:
+                    sub_patterns.append([trip])
+
+            stations = array("i", (self.stop_station[stop_id]
+                                   for stop_id in stop_ids))
+            for sub_pattern in sub_patterns:
+                pattern = Pattern(route_id=route_id,
+                                  service_id=service_id,
+                                  stop_ids=list(stop_ids),
+                                  stations=stations)
+                pattern.trip_ids = [trip[0] for trip in sub_pattern]
+                for position in range(len(stop_ids)):
+                    pattern.arrivals.append(array(
+                        "i", (trip[1][position] for trip in sub_pattern)))
+                    pattern.departures.append(array(
+                        "i", (trip[2][position] for trip in sub_pattern)))
+                patterns.append(pattern)
+
+        # stable order so rebuilt timetables plan identically
+        patterns.sort(key=lambda pattern: (pattern.route_id,
+                                           pattern.service_id,
+                                           pattern.stop_ids,
+                                           pattern.trip_ids[0]))
+        return patterns
+
+    def station_of(self, stop_id: str) -> int | None:
+        """
+        Station index of a stop or station, None if the stop doesn't exist.
+        """
+        return self.stop_station.get(stop_id)
+
+    @classmethod
+    def load(cls, source: StaticSource) -> "Timetable":
+        """
+        Load the timetable from a source.
+
+        Args:
+            source (StaticSource): Database or snapshot to read the tables
+                                   from
+
+        Returns:
+            Timetable: The loaded timetable
+        """
+        # stops without times can't be boarded or alighted at a known time
+        stop_time_rows = ((trip_id, stop_id, arrival, departure)
+                          for trip_id, _, stop_id, arrival, departure
+                          in source.stop_time_rows()
+                          if arrival is not None and departure is not None)
+        return cls(source.stops(),
+                   source.trips(),
+                   source.transfers(),
+                   stop_time_rows)
+
+
+class TimetableStore:
+    """
+    Holder of the current journey planning timetable. Reloading builds a
+    complete new timetable first and then replaces the reference in a single
+    assignment, so running searches keep the timetable they started with.
+    """
+
+    def __init__(self):
+        self._timetable: Timetable | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._timetable is not None
+
+    @property
+    def timetable(self) -> Timetable:
+        if self._timetable is None:
+            raise RuntimeError(
+                "Journey planning timetable has not been loaded")
+        return self._timetable
+
+    def load(self, source: StaticSource) -> None:
+        """
+        (Re)build the timetable.
+
+        Args:
+            source (StaticSource): Database or snapshot to read the tables
+                                   from
+        """
+        logger.info("Building journey planning timetable")
+        timetable = Timetable.load(source)
+        self._timetable = timetable
+        logger.info(f"Built timetable of {len(timetable.stations)} stations "
+                    f"and {len(timetable.patterns)} trip patterns")
+
+
+timetable_store = TimetableStore()
@@ -0,0 +1,106 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from threading import Lock
+from time import perf_counter
+
+from sqlalchemy import Engine, event
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+
+
+# query stats of the request being served; set per request by the
+# QueryStatsMiddleware and left unset for scripts and background work
+query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats",
+                                                        default=None)
+
+
+class PoolWaitStats:
+    """
+    Time spent waiting for a pooled connection, accumulated across the
+    recreated pools of an engine.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, seconds: float, timed_out: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+
+class _TimedPoolMixin:
+    # shared by every pool the engine recreates on dispose(); assigned per
+    # engine in timed_pool_class
+    wait_stats: PoolWaitStats
+
+    def _do_get(self):
+        start = perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.wait_stats.record(perf_counter() - start, timed_out)
+
+
+def timed_pool_class(async_pool: bool = False) -> type[QueuePool]:
+    """
+    Create a queue pool class that records how long checkouts wait for a
+    connection. Each engine needs its own class so its stats stay separate.
+
+    Args:
+        async_pool (bool): Create a pool for an asyncio engine
+
+    Returns:
+        type[QueuePool]: Pool class to pass as the engine's poolclass
+    """
+    base = AsyncAdaptedQueuePool if async_pool else QueuePool
+    return type(f"Timed{base.__name__}",
+                (_TimedPoolMixin, base),
+                {"wait_stats": PoolWaitStats()})
+
+
+def track_queries(engine: Engine) -> None:
+    """
+    Count the queries and database time of the current request on every
+    cursor execution of the engine.
+
+    Args:
+        engine (Engine): Sync engine, or the sync_engine of an async engine
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context,
+                               executemany):
+        conn.info.setdefault("query_start", []).append(perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context,
+                              executemany):
+        elapsed = perf_counter() - conn.info["query_start"].pop()
+        stats = query_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        # failed executions never reach after_cursor_execute
+        if context.connection is not None:
+            starts = context.connection.info.get("query_start")
+            if starts:
+                starts.pop()
@@ -0,0 +1,14 @@
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+
+class DatasetVersion(SQLModel, table=True):
+    id: int = Field(
+        default=1,
+        primary_key=True,
+        description="Single row ID of the dataset version stamp")
+    version: str = Field(
+        description="Stamp identifying the loaded GTFS static dataset")
+    created_at: datetime = Field(
+        description="Time the GTFS static dataset was loaded")
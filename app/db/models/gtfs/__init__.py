@@ -3,6 +3,7 @@ from app.db.models.gtfs.calendar_date import CalendarDate  # noqa: F401
 from app.db.models.gtfs.route import Route  # noqa: F401
 from app.db.models.gtfs.shape import Shape  # noqa: F401
 from app.db.models.gtfs.stop import Stop  # noqa: F401
+from app.db.models.gtfs.stop_schedule import StopSchedule  # noqa: F401
 from app.db.models.gtfs.stop_time import StopTime  # noqa: F401
 from app.db.models.gtfs.transfer import Transfer  # noqa: F401
 from app.db.models.gtfs.trip import Trip  # noqa: F401
@@ -11,5 +11,11 @@ class Stop(SQLModel, table=True):
     parent_station: str | None = Field(
         default=None,
         foreign_key="stop.stop_id",
+        index=True,
         description=("Stop ID of the parent station. Parent stations contain "
                      "stops for both trip directions"))
+    direction_id: int | None = Field(
+        default=None,
+        index=True,
+        description=("Direction of the stop's trips derived from the stop ID "
+                     "suffix (1=N, 0=S). Parent stations have no direction"))
@@ -0,0 +1,26 @@
+from sqlmodel import Field, SQLModel
+
+
+class StopSchedule(SQLModel, table=True):
+    # stop_times denormalized with the columns of their trip, built from both
+    # tables at seed time. The primary key leads with (stop_id,
+    # arrival_seconds) and the table is clustered on it, so a stop's schedule
+    # is read with a single index range scan over contiguous pages and no
+    # join. SQLite gets the same layout by storing the rows in the primary
+    # key's B-tree.
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    stop_id: str = Field(primary_key=True, description="Stop ID")
+    arrival_seconds: int = Field(
+        primary_key=True,
+        description=("Arrival time at the stop in seconds since the start of "
+                     "the service day"))
+    trip_id: str = Field(primary_key=True, description="Trip ID")
+    departure_seconds: int = Field(
+        description=("Departure time from the stop in seconds since the start "
+                     "of the service day"))
+    service_id: str = Field(description="Service ID of the trip")
+    route_id: str = Field(description="Route ID of the trip")
+    trip_headsign: str = Field(description="Headsign of the trip")
+    direction_id: int = Field(
+        description="Direction of travel of the trip (1=inbound, 0=outbound)")
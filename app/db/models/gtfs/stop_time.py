@@ -1,7 +1,19 @@
-from sqlmodel import Field, SQLModel
+from sqlmodel import Field, Index, SQLModel
 
 
 class StopTime(SQLModel, table=True):
+    __table_args__ = (
+        # stop schedules filter on stop_id and range scan arrival_seconds
+        Index("ix_stoptime_stop_id_arrival_seconds",
+              "stop_id", "arrival_seconds"),
+        # next departures range scan departure_seconds from a point in time
+        Index("ix_stoptime_stop_id_departure_seconds",
+              "stop_id", "departure_seconds"),
+        # SQLite stores the rows in the primary key's B-tree, so a trip's
+        # stop times are contiguous and its secondary indexes carry trip_id
+        {"sqlite_with_rowid": False},
+    )
+
     trip_id: str = Field(
         primary_key=True,
         foreign_key="trip.trip_id",
@@ -10,5 +22,19 @@ class StopTime(SQLModel, table=True):
         primary_key=True,
         description="Order of stops in the trip")
     stop_id: str = Field(foreign_key="stop.stop_id", description="Stop ID")
-    arrival_time: str = Field(description="Arrival time at the stop")
-    departure_time: str = Field(description="Departure time from the stop")
+    # GTFS leaves the times of stops that aren't timepoints empty
+    arrival_time: str | None = Field(
+        default=None,
+        description="Arrival time at the stop, null if the stop has no time")
+    departure_time: str | None = Field(
+        default=None,
+        description=("Departure time from the stop, null if the stop has no "
+                     "time"))
+    arrival_seconds: int | None = Field(
+        default=None,
+        description=("Arrival time at the stop in seconds since the start of "
+                     "the service day, null if the stop has no time"))
+    departure_seconds: int | None = Field(
+        default=None,
+        description=("Departure time from the stop in seconds since the start "
+                     "of the service day, null if the stop has no time"))
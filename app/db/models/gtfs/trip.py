@@ -1,7 +1,17 @@
-from sqlmodel import Field, SQLModel
+from sqlmodel import Field, Index, SQLModel
 
 
 class Trip(SQLModel, table=True):
+    __table_args__ = (
+        # trip listings filter on any combination of these columns and page
+        # through the matches in trip_id order
+        Index("ix_trip_route_id_service_id_direction_id_trip_id",
+              "route_id", "service_id", "direction_id", "trip_id"),
+        Index("ix_trip_service_id_direction_id_trip_id",
+              "service_id", "direction_id", "trip_id"),
+        Index("ix_trip_route_id_trip_id", "route_id", "trip_id"),
+    )
+
     trip_id: str = Field(
         primary_key=True,
         description="Unique identifier for the trip")
@@ -0,0 +1,151 @@
+import asyncio
+from dataclasses import dataclass, field
+from itertools import count
+from typing import List
+
+from sqlalchemy import Engine, event, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
+
+from app.db.database import (async_engine, create_async_db_engine,
+                             create_db_engine, engine)
+from app.db.models.dataset_version import DatasetVersion
+from app.settings import settings
+from app.utils.logger import logger
+
+
+@dataclass
+class Replica:
+    """
+    Sync and async engines of a read replica, its last known health and the
+    dataset version it had replicated at its last check.
+    """
+    name: str
+    engine: Engine
+    async_engine: AsyncEngine
+    healthy: bool = field(default=True)
+    version: str | None = field(default=None)
+
+    @classmethod
+    def connect(cls, url: str) -> "Replica":
+        """
+        Create the engines of a replica. Connections are only opened on
+        first use.
+
+        Args:
+            url (str): postgresql:// URL of the replica
+
+        Returns:
+            Replica: The replica, assumed healthy until checked
+        """
+        parsed = make_url(url)
+        replica = cls(name=f"{parsed.host}:{parsed.port or 5432}",
+                      engine=create_db_engine(url),
+                      async_engine=create_async_db_engine(url))
+
+        # a dropped connection takes the replica out of rotation right away
+        # instead of at the next health check
+        def on_error(context) -> None:
+            if context.is_disconnect and replica.healthy:
+                logger.warning(f"Replica '{replica.name}' disconnected")
+                replica.healthy = False
+
+        event.listen(replica.engine, "handle_error", on_error)
+        event.listen(replica.async_engine.sync_engine, "handle_error",
+                     on_error)
+        return replica
+
+
+class ReplicaSet:
+    """
+    Routes the read-only static GTFS work to the read replicas round robin,
+    skipping replicas that failed their last health check or haven't
+    replicated the dataset version the API has loaded, so lagging replicas
+    never serve rows of another version. Falls back to the primary when no
+    replica is configured or eligible, so the API keeps serving through
+    replica outages and lag.
+
+    Args:
+        primary (Engine): Sync engine of the primary
+        async_primary (AsyncEngine): Async engine of the primary
+        replicas (List[Replica]): Read replicas of the primary
+    """
+
+    def __init__(self,
+                 primary: Engine,
+                 async_primary: AsyncEngine,
+                 replicas: List[Replica]):
+        self.primary = primary
+        self.async_primary = async_primary
+        self.replicas = replicas
+        # dataset version the replicas must have replicated to serve reads
+        self.version: str | None = None
+        self._turn = count()
+
+    def _next(self) -> Replica | None:
+        eligible = [replica for replica in self.replicas
+                    if replica.healthy and replica.version == self.version]
+        if not eligible:
+            return None
+        return eligible[next(self._turn) % len(eligible)]
+
+    def engine(self) -> Engine:
+        """
+        Sync engine of the next eligible replica, or of the primary.
+        """
+        replica = self._next()
+        return replica.engine if replica is not None else self.primary
+
+    def async_engine(self) -> AsyncEngine:
+        """
+        Async engine of the next eligible replica, or of the primary.
+        """
+        replica = self._next()
+        return (replica.async_engine if replica is not None
+                else self.async_primary)
+
+    async def check(self) -> None:
+        """
+        Read the dataset version stamp of every replica and update its health
+        and replicated version. Checks run concurrently and time out after
+        db_replica_check_timeout.
+        """
+        query = select(DatasetVersion.version).where(DatasetVersion.id == 1)
+
+        async def ping(replica: Replica) -> None:
+            try:
+                async with replica.async_engine.connect() as conn:
+                    result = await asyncio.wait_for(
+                        conn.execute(query),
+                        settings.db_replica_check_timeout)
+                replica.version = result.scalar_one_or_none()
+                healthy = True
+            except Exception as e:
+                logger.warning(
+                    f"Replica '{replica.name}' failed health check: {e}")
+                healthy = False
+
+            if healthy != replica.healthy:
+                logger.info(f"Replica '{replica.name}' is now "
+                            f"{'healthy' if healthy else 'unhealthy'}")
+            replica.healthy = healthy
+            if (healthy and self.version is not None
+                    and replica.version != self.version):
+                logger.info(f"Replica '{replica.name}' lags behind dataset "
+                            f"version '{self.version}'")
+
+        await asyncio.gather(*(ping(replica) for replica in self.replicas))
+
+    async def dispose(self) -> None:
+        """
+        Close the connections of every replica engine.
+        """
+        for replica in self.replicas:
+            replica.engine.dispose()
+            await replica.async_engine.dispose()
+
+
+read_replicas = ReplicaSet(engine,
+                           async_engine,
+                           [Replica.connect(url)
+                            for url in settings.db_replica_urls])
@@ -0,0 +1,22 @@
+from typing import List
+
+from sqlmodel import Session, select
+
+from app.db.models.gtfs import Calendar
+from app.utils.timing import timed_methods
+
+
+@timed_methods("repo.calendar")
+class CalendarRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_all(self) -> List[Calendar]:
+        """
+        Get all service calendars.
+
+        Returns:
+            List[Calendar]: List of all weekly service calendars.
+        """
+        query = select(Calendar)
+        return self.session.exec(query).all()
@@ -0,0 +1,22 @@
+from typing import List
+
+from sqlmodel import Session, select
+
+from app.db.models.gtfs import CalendarDate
+from app.utils.timing import timed_methods
+
+
+@timed_methods("repo.calendar_dates")
+class CalendarDateRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_all(self) -> List[CalendarDate]:
+        """
+        Get all service calendar exceptions.
+
+        Returns:
+            List[CalendarDate]: List of all dates service is added or removed.
+        """
+        query = select(CalendarDate)
+        return self.session.exec(query).all()
@@ -0,0 +1,37 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from sqlmodel import Session
+
+from app.db.models.dataset_version import DatasetVersion
+
+
+class DatasetVersionRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get(self) -> DatasetVersion | None:
+        """
+        Get the version stamp of the loaded GTFS static dataset.
+
+        Returns:
+            DatasetVersion | None: The version stamp, None if no dataset has
+            been stamped yet.
+        """
+        return self.session.get(DatasetVersion, 1)
+
+    def bump(self) -> DatasetVersion:
+        """
+        Stamp the loaded GTFS static dataset with a new version. The stamp is
+        written within the current transaction; committing is left to the
+        caller so it lands together with the data changes.
+
+        Returns:
+            DatasetVersion: The new version stamp.
+        """
+        stamp = self.session.merge(
+            DatasetVersion(id=1,
+                           version=uuid4().hex,
+                           created_at=datetime.now(timezone.utc)))
+        self.session.flush()
+        return stamp
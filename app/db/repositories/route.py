@@ -1,10 +1,14 @@
-from typing import List
+from typing import AsyncIterator, Collection, List
 
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.db.models.gtfs import Route
+from app.settings import settings
+from app.utils.timing import timed_methods
 
 
+@timed_methods("repo.routes")
 class RouteRepository:
     def __init__(self, session: Session):
         self.session = session
@@ -21,6 +25,19 @@ class RouteRepository:
         """
         return self.session.get(Route, route_id)
 
+    def get_all_by_ids(self, route_ids: Collection[str]) -> List[Route]:
+        """
+        Get the routes of several IDs with a single query.
+
+        Args:
+            route_ids (Collection[str]): Route IDs to match
+
+        Returns:
+            List[Route]: Found routes, in no particular order
+        """
+        query = select(Route).where(Route.route_id.in_(route_ids))
+        return self.session.exec(query).all()
+
     def get_all(self) -> List[Route]:
         """
         Get all routes.
@@ -30,3 +47,61 @@ class RouteRepository:
         """
         query = select(Route)
         return self.session.exec(query).all()
+
+
+@timed_methods("repo.routes")
+class AsyncRouteRepository:
+    """
+    RouteRepository counterpart running its queries on an AsyncSession.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_by_id(self, route_id: str) -> Route | None:
+        """
+        Get single route by ID.
+
+        Args:
+            route_id (str): Route ID to match.
+
+        Returns:
+            Route | None: Found route, None otherwise.
+        """
+        return await self.session.get(Route, route_id)
+
+    async def get_all_by_ids(self,
+                             route_ids: Collection[str]) -> List[Route]:
+        """
+        Get the routes of several IDs with a single query.
+
+        Args:
+            route_ids (Collection[str]): Route IDs to match
+
+        Returns:
+            List[Route]: Found routes, in no particular order
+        """
+        query = select(Route).where(Route.route_id.in_(route_ids))
+        return (await self.session.exec(query)).all()
+
+    async def get_all(self) -> List[Route]:
+        """
+        Get all routes.
+
+        Returns:
+            List[Route]: List of all available routes.
+        """
+        query = select(Route)
+        return (await self.session.exec(query)).all()
+
+    async def stream_all(self) -> AsyncIterator[Route]:
+        """
+        Stream all routes from a server-side cursor.
+
+        Yields:
+            Route: Routes, fetched stream_batch_size at a time
+        """
+        query = select(Route).execution_options(
+            yield_per=settings.stream_batch_size)
+        async for route in await self.session.stream_scalars(query):
+            yield route
@@ -1,10 +1,23 @@
-from typing import List
+from typing import AsyncIterator, Collection, List
 
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.db.models.gtfs import Stop
+from app.settings import settings
+from app.utils.timing import timed_methods
 
 
+def _stops_query(direction_id: int | None):
+    query = select(Stop).where(Stop.parent_station.is_not(None))
+
+    if direction_id is not None:
+        query = query.where(Stop.direction_id == direction_id)
+
+    return query
+
+
+@timed_methods("repo.stops")
 class StopRepository:
     def __init__(self, session: Session):
         self.session = session
@@ -21,6 +34,19 @@ class StopRepository:
         """
         return self.session.get(Stop, stop_id)
 
+    def get_all_by_ids(self, stop_ids: Collection[str]) -> List[Stop]:
+        """
+        Get the stops of several IDs with a single query.
+
+        Args:
+            stop_ids (Collection[str]): Stop IDs to match
+
+        Returns:
+            List[Stop]: Found stops, in no particular order
+        """
+        query = select(Stop).where(Stop.stop_id.in_(stop_ids))
+        return self.session.exec(query).all()
+
     def get_all(self, direction_id: int | None) -> List[Stop]:
         """
         Get all subway stops. This method will only return stops and will omit
@@ -37,12 +63,99 @@ class StopRepository:
         Returns:
             List[Stop]: List of subway stops
         """
-        query = select(Stop).where(Stop.parent_station is not None)
+        return self.session.exec(_stops_query(direction_id)).all()
+
+    def get_all_by_parent_station(self, parent_station: str) -> List[Stop]:
+        """
+        Get the stops of a station.
+
+        E.g. stop_id: 101 has child stops: 101S and 101N
 
-        if direction_id is not None:
-            if direction_id == 1:
-                query = query.where(Stop.stop_id.like("%N"))
-            else:
-                query = query.where(Stop.stop_id.like("%S"))
+        Args:
+            parent_station (str): Station stop ID to match
 
+        Returns:
+            List[Stop]: List of the station's stops
+        """
+        query = select(Stop).where(Stop.parent_station == parent_station)
         return self.session.exec(query).all()
+
+
+@timed_methods("repo.stops")
+class AsyncStopRepository:
+    """
+    StopRepository counterpart running its queries on an AsyncSession.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_by_id(self, stop_id: str) -> Stop | None:
+        """
+        Get single stop by ID.
+
+        Args:
+            stop_id (str): Stop ID to match.
+
+        Returns:
+            Stop | None: Found stop, None otherwise.
+        """
+        return await self.session.get(Stop, stop_id)
+
+    async def get_all_by_ids(self, stop_ids: Collection[str]) -> List[Stop]:
+        """
+        Get the stops of several IDs with a single query.
+
+        Args:
+            stop_ids (Collection[str]): Stop IDs to match
+
+        Returns:
+            List[Stop]: Found stops, in no particular order
+        """
+        query = select(Stop).where(Stop.stop_id.in_(stop_ids))
+        return (await self.session.exec(query)).all()
+
+    async def get_all(self, direction_id: int | None) -> List[Stop]:
+        """
+        Get all subway stops, omitting stations.
+
+        Args:
+            direction_id (int | None): Direction to filter by. 1 maps to N,
+                                       0 maps to S
+
+        Returns:
+            List[Stop]: List of subway stops
+        """
+        return (await self.session.exec(_stops_query(direction_id))).all()
+
+    async def stream_all(self,
+                         direction_id: int | None) -> AsyncIterator[Stop]:
+        """
+        Stream all subway stops, omitting stations, from a server-side
+        cursor.
+
+        Args:
+            direction_id (int | None): Direction to filter by. 1 maps to N,
+                                       0 maps to S
+
+        Yields:
+            Stop: Subway stops, fetched stream_batch_size at a time
+        """
+        query = _stops_query(direction_id).execution_options(
+            yield_per=settings.stream_batch_size)
+        async for stop in await self.session.stream_scalars(query):
+            yield stop
+
+    async def get_all_by_parent_station(self,
+                                        parent_station: str) -> List[Stop]:
+        """
+        Get the stops of a station.
+
+        Args:
+            parent_station (str): Station stop ID to match
+
+        Returns:
+            List[Stop]: List of the station's stops
+        """
+        query = select(Stop).where(Stop.parent_station == parent_station)
+        return (await self.session.exec(query)).all()
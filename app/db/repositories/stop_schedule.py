@@ -0,0 +1,100 @@
+from typing import Collection, List
+
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.models.gtfs import StopSchedule
+from app.utils.timing import timed_methods
+
+
+def _by_stop_id_query(stop_id: str,
+                      route_id: str | None,
+                      service_ids: Collection[str] | None,
+                      arrival_seconds: int | None,
+                      departure_seconds: int | None):
+    query = select(StopSchedule).where(StopSchedule.stop_id == stop_id)
+    if route_id is not None:
+        query = query.where(StopSchedule.route_id == route_id)
+
+    if service_ids is not None:
+        query = query.where(StopSchedule.service_id.in_(service_ids))
+
+    if arrival_seconds is not None:
+        query = query.where(StopSchedule.arrival_seconds >= arrival_seconds)
+
+    if departure_seconds is not None:
+        query = query.where(
+            StopSchedule.departure_seconds <= departure_seconds)
+
+    return query.order_by(StopSchedule.arrival_seconds,
+                          StopSchedule.trip_id)
+
+
+@timed_methods("repo.stop_schedules")
+class StopScheduleRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_all_by_stop_id(
+            self,
+            stop_id: str,
+            route_id: str | None,
+            service_ids: Collection[str] | None,
+            arrival_seconds: int | None,
+            departure_seconds: int | None) -> List[StopSchedule]:
+        """
+        Get the schedule of a stop in arrival order. The rows are range
+        scanned from arrival_seconds on the primary key of the denormalized
+        stop schedule table without joining the trips.
+
+        Args:
+            stop_id (str): Stop ID to match
+            route_id (str | None): Route ID to filter trips by
+            service_ids (Collection[str] | None): Service IDs to filter trips
+                                                  by
+            arrival_seconds (int | None): Earliest arrival in seconds since
+                                          the start of the service day
+            departure_seconds (int | None): Latest departure in seconds since
+                                            the start of the service day
+
+        Returns:
+            List[StopSchedule]: Found stop schedule rows
+        """
+        query = _by_stop_id_query(stop_id,
+                                  route_id,
+                                  service_ids,
+                                  arrival_seconds,
+                                  departure_seconds)
+        return self.session.exec(query).all()
+
+
+@timed_methods("repo.stop_schedules")
+class AsyncStopScheduleRepository:
+    """
+    StopScheduleRepository counterpart running its queries on an
+    AsyncSession.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_all_by_stop_id(
+            self,
+            stop_id: str,
+            route_id: str | None,
+            service_ids: Collection[str] | None,
+            arrival_seconds: int | None,
+            departure_seconds: int | None) -> List[StopSchedule]:
+        """
+        Get the schedule of a stop in arrival order. See
+        StopScheduleRepository.get_all_by_stop_id for the filters.
+
+        Returns:
+            List[StopSchedule]: Found stop schedule rows
+        """
+        query = _by_stop_id_query(stop_id,
+                                  route_id,
+                                  service_ids,
+                                  arrival_seconds,
+                                  departure_seconds)
+        return (await self.session.exec(query)).all()
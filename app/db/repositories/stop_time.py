@@ -1,79 +1,145 @@
-from typing import List, Tuple
+from typing import Collection, List, Tuple
 
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.db.models.gtfs import Stop, StopTime, Trip
+from app.utils.timing import timed_methods
 
 
+def _by_trip_id_query(trip_id: str,
+                      arrival_seconds: int | None,
+                      departure_seconds: int | None):
+    query = (select(StopTime, Stop)
+             .join(Stop, StopTime.stop_id == Stop.stop_id)
+             .where(StopTime.trip_id == trip_id))
+
+    if arrival_seconds is not None:
+        query = query.where(StopTime.arrival_seconds >= arrival_seconds)
+
+    if departure_seconds is not None:
+        query = query.where(StopTime.departure_seconds <= departure_seconds)
+
+    # TODO: add sort_by filter
+    # stop_sequence rather than arrival order, stops without times included
+    return query.order_by(StopTime.stop_sequence)
+
+
+def _departures_query(stop_id: str,
+                      route_id: str | None,
+                      service_ids: Collection[str],
+                      departure_seconds: int,
+                      limit: int):
+    query = (select(StopTime, Trip)
+             .join(Trip, StopTime.trip_id == Trip.trip_id)
+             .where(StopTime.stop_id == stop_id,
+                    StopTime.departure_seconds >= departure_seconds,
+                    Trip.service_id.in_(service_ids)))
+    if route_id is not None:
+        query = query.where(Trip.route_id == route_id)
+
+    return query.order_by(StopTime.departure_seconds).limit(limit)
+
+
+@timed_methods("repo.stop_times")
 class StopTimeRepository:
     def __init__(self, session: Session):
         self.session = session
 
-    def get_all_by_stop_id(
+    def get_all_by_trip_id(
+            self,
+            trip_id: str,
+            arrival_seconds: int | None,
+            departure_seconds: int | None) -> List[Tuple[StopTime, Stop]]:
+        """
+        Get stop times with stop info associated with a trip ID
+
+        Args:
+            trip_id (str): Trip ID to match
+            arrival_seconds (int | None): Earliest arrival in seconds since
+                                          the start of the service day
+            departure_seconds (int | None): Latest departure in seconds since
+                                            the start of the service day
+
+        Returns:
+            List[Tuple[StopTime, Stop]]: Found stop times with associated stop
+        """
+        query = _by_trip_id_query(trip_id, arrival_seconds, departure_seconds)
+        return self.session.exec(query).all()
+
+    def get_departures(
             self,
             stop_id: str,
             route_id: str | None,
-            service_id: str | None,
-            arrival_time: str | None,
-            departure_time: str | None) -> List[Tuple[StopTime, Trip]]:
+            service_ids: Collection[str],
+            departure_seconds: int,
+            limit: int) -> List[Tuple[StopTime, Trip]]:
         """
-        Get stop times with trip info associated with a stop ID
+        Get the next departures from a stop in departure order. The stop
+        times are range scanned from departure_seconds on the stop's
+        departure index and the scan stops after limit matches.
 
         Args:
             stop_id (str): Stop ID to match
             route_id (str | None): Route ID to filter trips by
-            service_id (str | None): Service ID to filter trips by
-            arrival_time (str | None): Arrival time to filter stop times by
-            departure_time (str | None): Departure time to filter stop times by
+            service_ids (Collection[str]): Service IDs running on the service
+                                           day
+            departure_seconds (int): Earliest departure in seconds since the
+                                     start of the service day
+            limit (int): Maximum number of departures to return
 
         Returns:
             List[Tuple[StopTime, Trip]]: Found stop times with associated trip
         """
-        query = (select(StopTime, Trip)
-                 .join(Trip, StopTime.trip_id == Trip.trip_id)
-                 .where(StopTime.stop_id == stop_id))
-        if route_id is not None:
-            query = query.where(Trip.route_id == route_id)
-
-        if service_id is not None:
-            query = query.where(Trip.service_id == service_id)
+        query = _departures_query(stop_id,
+                                  route_id,
+                                  service_ids,
+                                  departure_seconds,
+                                  limit)
+        return self.session.exec(query).all()
 
-        if arrival_time is not None:
-            query = query.where(StopTime.arrival_time >= arrival_time)
 
-        if departure_time is not None:
-            query = query.where(StopTime.departure_time <= departure_time)
+@timed_methods("repo.stop_times")
+class AsyncStopTimeRepository:
+    """
+    StopTimeRepository counterpart running its queries on an AsyncSession.
+    """
 
-        # TODO: add sort_by filter
-        query = query.order_by(StopTime.arrival_time)
-        return self.session.exec(query).all()
+    def __init__(self, session: AsyncSession):
+        self.session = session
 
-    def get_all_by_trip_id(
+    async def get_all_by_trip_id(
             self,
             trip_id: str,
-            arrival_time: str | None,
-            departure_time: str | None) -> List[Tuple[StopTime, Stop]]:
+            arrival_seconds: int | None,
+            departure_seconds: int | None) -> List[Tuple[StopTime, Stop]]:
         """
-        Get stop times with stop info associated with a trip ID
-
-        Args:
-            trip_id (str): Trip ID to match
-            arrival_time (str | None): Arrival time to filter stop times by
-            departure_time (str | None): Departure time to filter stop times by
+        Get stop times with stop info associated with a trip ID. See
+        StopTimeRepository.get_all_by_trip_id for the filters.
 
         Returns:
             List[Tuple[StopTime, Stop]]: Found stop times with associated stop
         """
-        query = (select(StopTime, Stop)
-                 .join(Stop, StopTime.stop_id == Stop.stop_id)
-                 .where(StopTime.trip_id == trip_id))
-
-        if arrival_time is not None:
-            query = query.where(StopTime.arrival_time >= arrival_time)
+        query = _by_trip_id_query(trip_id, arrival_seconds, departure_seconds)
+        return (await self.session.exec(query)).all()
 
-        if departure_time is not None:
-            query = query.where(StopTime.departure_time <= departure_time)
+    async def get_departures(
+            self,
+            stop_id: str,
+            route_id: str | None,
+            service_ids: Collection[str],
+            departure_seconds: int,
+            limit: int) -> List[Tuple[StopTime, Trip]]:
+        """
+        Get the next departures from a stop in departure order. See
+        StopTimeRepository.get_departures for the filters.
 
-        # TODO: add sort_by filter
-        query = query.order_by(StopTime.arrival_time)
-        return self.session.exec(query).all()
+        Returns:
+            List[Tuple[StopTime, Trip]]: Found stop times with associated trip
+        """
+        query = _departures_query(stop_id,
+                                  route_id,
+                                  service_ids,
+                                  departure_seconds,
+                                  limit)
+        return (await self.session.exec(query)).all()
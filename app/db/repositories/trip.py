@@ -1,10 +1,46 @@
-from typing import List, Tuple
+from typing import AsyncIterator, Collection, List
 
 from sqlmodel import Session, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.db.models.gtfs import Trip
+from app.settings import settings
+from app.utils.timing import timed_methods
 
 
+def _trips_query(route_id: str | None,
+                 service_ids: Collection[str] | None,
+                 direction_id: int | None):
+    query = select(Trip)
+    if route_id is not None:
+        query = query.where(Trip.route_id == route_id)
+    if service_ids is not None:
+        query = query.where(Trip.service_id.in_(service_ids))
+    if direction_id is not None:
+        query = query.where(Trip.direction_id == direction_id)
+    return query
+
+
+def _page_query(route_id: str | None,
+                service_ids: Collection[str] | None,
+                direction_id: int | None,
+                after_trip_id: str | None,
+                offset: int,
+                limit: int):
+    query = _trips_query(route_id, service_ids, direction_id)
+    if after_trip_id is not None:
+        query = query.where(Trip.trip_id > after_trip_id)
+    return query.order_by(Trip.trip_id).offset(offset).limit(limit)
+
+
+def _count_query(route_id: str | None,
+                 service_ids: Collection[str] | None,
+                 direction_id: int | None):
+    query = _trips_query(route_id, service_ids, direction_id)
+    return select(func.count()).select_from(query.subquery())
+
+
+@timed_methods("repo.trips")
 class TripRepository:
     def __init__(self, session: Session):
         self.session = session
@@ -21,39 +57,153 @@ class TripRepository:
         """
         return self.session.get(Trip, trip_id)
 
+    def get_all_by_ids(self, trip_ids: Collection[str]) -> List[Trip]:
+        """
+        Get the trips of several IDs with a single query.
+
+        Args:
+            trip_ids (Collection[str]): Trip IDs to match
+
+        Returns:
+            List[Trip]: Found trips, in no particular order
+        """
+        query = select(Trip).where(Trip.trip_id.in_(trip_ids))
+        return self.session.exec(query).all()
+
     def get_all(self,
                 route_id: str | None,
-                service_id: str | None,
+                service_ids: Collection[str] | None,
                 direction_id: int | None,
+                after_trip_id: str | None = None,
                 offset: int = 0,
-                limit: int = 100) -> Tuple[List[Trip], int]:
+                limit: int = 100) -> List[Trip]:
         """
-        Get all paginated trips
+        Get a page of trips in trip_id order. Pages are read from the index
+        starting after after_trip_id, so deep pages cost the same as the
+        first one.
 
         Args:
             route_id (str | None): Filter by route ID
-            service_id (str | None): Filter by service ID
+            service_ids (Collection[str] | None): Filter by service IDs
             direction_id (int | None): Filter by direction ID
+            after_trip_id (str | None): Trip ID of the previous page's last
+                                        trip
             offset (int): Number of trips to skip
             limit (int): Maximum number of trips to return
 
         Returns:
-            Tuple of (trips: List[Trip], total_items: int)
+            List[Trip]: The page of trips
         """
-        query = select(Trip)
-        if route_id is not None:
-            query = query.where(Trip.route_id == route_id)
-        if service_id is not None:
-            query = query.where(Trip.service_id == service_id)
-        if direction_id is not None:
-            query = query.where(Trip.direction_id == direction_id)
+        query = _page_query(route_id,
+                            service_ids,
+                            direction_id,
+                            after_trip_id,
+                            offset,
+                            limit)
+        return self.session.exec(query).all()
+
+    def count(self,
+              route_id: str | None,
+              service_ids: Collection[str] | None,
+              direction_id: int | None) -> int:
+        """
+        Count the trips matching the filters
+
+        Args:
+            route_id (str | None): Filter by route ID
+            service_ids (Collection[str] | None): Filter by service IDs
+            direction_id (int | None): Filter by direction ID
+
+        Returns:
+            int: Number of matching trips
+        """
+        query = _count_query(route_id, service_ids, direction_id)
+        return self.session.exec(query).one()
 
-        # get total item count on filtered trips
-        count_query = select(func.count()).select_from(query.subquery())
-        total_items = self.session.exec(count_query).one()
 
-        # apply pagination
-        query = query.offset(offset).limit(limit)
+@timed_methods("repo.trips")
+class AsyncTripRepository:
+    """
+    TripRepository counterpart running its queries on an AsyncSession.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_by_id(self, trip_id: str) -> Trip | None:
+        """
+        Get single trip by ID.
 
-        trips = self.session.exec(query).all()
-        return trips, total_items
+        Args:
+            trip_id (str): Trip ID to match.
+
+        Returns:
+            Trip | None: Found trip, None otherwise.
+        """
+        return await self.session.get(Trip, trip_id)
+
+    async def get_all_by_ids(self, trip_ids: Collection[str]) -> List[Trip]:
+        """
+        Get the trips of several IDs with a single query.
+
+        Args:
+            trip_ids (Collection[str]): Trip IDs to match
+
+        Returns:
+            List[Trip]: Found trips, in no particular order
+        """
+        query = select(Trip).where(Trip.trip_id.in_(trip_ids))
+        return (await self.session.exec(query)).all()
+
+    async def get_all(self,
+                      route_id: str | None,
+                      service_ids: Collection[str] | None,
+                      direction_id: int | None,
+                      after_trip_id: str | None = None,
+                      offset: int = 0,
+                      limit: int = 100) -> List[Trip]:
+        """
+        Get a page of trips in trip_id order. See TripRepository.get_all for
+        the filters.
+
+        Returns:
+            List[Trip]: The page of trips
+        """
+        query = _page_query(route_id,
+                            service_ids,
+                            direction_id,
+                            after_trip_id,
+                            offset,
+                            limit)
+        return (await self.session.exec(query)).all()
+
+    async def count(self,
+                    route_id: str | None,
+                    service_ids: Collection[str] | None,
+                    direction_id: int | None) -> int:
+        """
+        Count the trips matching the filters. See TripRepository.count for
+        the filters.
+
+        Returns:
+            int: Number of matching trips
+        """
+        query = _count_query(route_id, service_ids, direction_id)
+        return (await self.session.exec(query)).one()
+
+    async def stream_all(self,
+                         route_id: str | None,
+                         service_ids: Collection[str] | None,
+                         direction_id: int | None) -> AsyncIterator[Trip]:
+        """
+        Stream every trip matching the filters in trip_id order from a
+        server-side cursor. See TripRepository.get_all for the filters.
+
+        Yields:
+            Trip: Matching trips, fetched stream_batch_size at a time
+        """
+        query = (_trips_query(route_id, service_ids, direction_id)
+                 .order_by(Trip.trip_id)
+                 .execution_options(yield_per=settings.stream_batch_size))
+        async for trip in await self.session.stream_scalars(query):
+            yield trip
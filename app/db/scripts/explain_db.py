@@ -0,0 +1,155 @@
+# SQLModel is imported from app.db.database because Python executes all the
+# code creating the classes inheriting from SQLModel and registering them in
+# the SQLModel.metadata.
+#
+# https://sqlmodel.tiangolo.com/tutorial/create-db-and-table/#sqlmodel-metadata-order-matters
+
+import json
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlalchemy import event, text
+from sqlmodel import Session, select
+
+from app.db.database import get_db_engine
+from app.db.models.gtfs import Route, StopTime, Trip
+from app.db.repositories.route import RouteRepository
+from app.db.repositories.stop import StopRepository
+from app.db.repositories.stop_schedule import StopScheduleRepository
+from app.db.repositories.stop_time import StopTimeRepository
+from app.db.repositories.trip import TripRepository
+from app.settings import settings
+from app.utils.logger import logger
+
+
+def _query_cases(session: Session) -> List[Tuple[str, Callable[[], Any]]]:
+    """
+    Repository calls to check, parameterized with IDs from the seeded data.
+    """
+    route_id = session.exec(select(Route.route_id)).first()
+    trip = session.exec(select(Trip).where(Trip.route_id == route_id)).first()
+    stop_id = session.exec(
+        select(StopTime.stop_id).where(StopTime.trip_id == trip.trip_id)
+    ).first()
+
+    route_repo = RouteRepository(session)
+    stop_repo = StopRepository(session)
+    stop_schedule_repo = StopScheduleRepository(session)
+    stop_time_repo = StopTimeRepository(session)
+    trip_repo = TripRepository(session)
+    return [
+        ("RouteRepository.get_by_id",
+         lambda: route_repo.get_by_id(route_id)),
+        ("StopRepository.get_by_id",
+         lambda: stop_repo.get_by_id(stop_id)),
+        ("StopRepository.get_all",
+         lambda: stop_repo.get_all(direction_id=None)),
+        ("StopRepository.get_all(direction_id)",
+         lambda: stop_repo.get_all(direction_id=1)),
+        ("StopScheduleRepository.get_all_by_stop_id",
+         lambda: stop_schedule_repo.get_all_by_stop_id(
+             stop_id, None, None, None, None)),
+        ("StopScheduleRepository.get_all_by_stop_id(filters)",
+         lambda: stop_schedule_repo.get_all_by_stop_id(
+             stop_id, route_id, [trip.service_id], 8 * 3600, 10 * 3600)),
+        ("StopTimeRepository.get_departures",
+         lambda: stop_time_repo.get_departures(
+             stop_id, None, [trip.service_id], 8 * 3600, 5)),
+        ("StopRepository.get_all_by_parent_station",
+         lambda: stop_repo.get_all_by_parent_station(stop_id[:-1])),
+        ("StopTimeRepository.get_all_by_trip_id",
+         lambda: stop_time_repo.get_all_by_trip_id(
+             trip.trip_id, None, None)),
+        ("TripRepository.get_by_id",
+         lambda: trip_repo.get_by_id(trip.trip_id)),
+        ("TripRepository.get_all(route_id)",
+         lambda: trip_repo.get_all(route_id, None, None)),
+        ("TripRepository.get_all(route_id, service_ids, direction_id)",
+         lambda: trip_repo.get_all(
+             route_id, [trip.service_id], trip.direction_id)),
+        ("TripRepository.get_all(service_ids)",
+         lambda: trip_repo.get_all(None, [trip.service_id], None)),
+        ("TripRepository.get_all(after_trip_id)",
+         lambda: trip_repo.get_all(route_id, None, None, trip.trip_id)),
+        ("TripRepository.count(route_id, service_ids, direction_id)",
+         lambda: trip_repo.count(
+             route_id, [trip.service_id], trip.direction_id)),
+    ]
+
+
+def _seq_scans(plan: Dict[str, Any]) -> List[str]:
+    """
+    Collect the relations read with a sequential scan in a JSON query plan.
+    """
+    relations = []
+    if plan.get("Node Type") == "Seq Scan":
+        relations.append(plan.get("Relation Name", "?"))
+    for child in plan.get("Plans", []):
+        relations.extend(_seq_scans(child))
+    return relations
+
+
+def explain_queries() -> Dict[str, List[str]]:
+    """
+    Run every repository query against the seeded database and EXPLAIN the
+    SQL it issues with sequential scans disabled. Any remaining sequential
+    scan means no index can serve the query.
+
+    Returns:
+        Dict[str, List[str]]: Relations scanned sequentially per query case.
+    """
+    if settings.db_backend != "postgresql":
+        raise RuntimeError("Query plans are checked on the postgresql "
+                           "backend")
+
+    engine = get_db_engine()
+    statements: List[Tuple[str, Any]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    failures = {}
+    try:
+        with Session(engine) as session:
+            cases = _query_cases(session)
+            connection = session.connection()
+            connection.execute(text("SET LOCAL enable_seqscan = off"))
+
+            for name, run in cases:
+                # queries served from the identity map never reach the
+                # database and would pass unchecked
+                session.expunge_all()
+                statements.clear()
+                event.listen(engine, "before_cursor_execute", capture)
+                try:
+                    run()
+                finally:
+                    event.remove(engine, "before_cursor_execute", capture)
+
+                scans = []
+                for statement, parameters in list(statements):
+                    result = connection.exec_driver_sql(
+                        f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+                    plan = result.scalar()
+                    if isinstance(plan, str):
+                        plan = json.loads(plan)
+                    scans.extend(_seq_scans(plan[0]["Plan"]))
+
+                if scans:
+                    failures[name] = scans
+                    logger.error(f"{name}: sequential scan on {scans}")
+                else:
+                    logger.info(f"{name}: OK")
+
+            session.rollback()
+    finally:
+        logger.info("Disposing database engine")
+        engine.dispose()
+        logger.info("Database connections closed")
+
+    return failures
+
+
+if __name__ == "__main__":
+    import sys
+    if explain_queries():
+        sys.exit(1)
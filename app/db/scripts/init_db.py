@@ -4,15 +4,32 @@
 #
 # https://sqlmodel.tiangolo.com/tutorial/create-db-and-table/#sqlmodel-metadata-order-matters
 
+from sqlalchemy.schema import CreateSchema
+
 from app.db.database import SQLModel, get_db_engine
 from app.utils.logger import logger
 
 
+def create_db_schema(engine):
+    """
+    Create the schema the engine maps the GTFS tables to if it doesn't exist.
+    SQLite has no schemas and keeps the tables in the database file.
+    """
+    if engine.dialect.name == "sqlite":
+        return
+
+    schema = engine.get_execution_options()["schema_translate_map"][None]
+    logger.info(f"Creating database schema '{schema}' if it doesn't exist")
+    with engine.begin() as conn:
+        conn.execute(CreateSchema(schema, if_not_exists=True))
+
+
 def create_db_tables(engine):
     """
     Create all database tables defined in SQLModel metadata if they don't
     exist.
     """
+    create_db_schema(engine)
     logger.info("Creating database tables if they don't exist")
     SQLModel.metadata.create_all(engine)
 
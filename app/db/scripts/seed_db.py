@@ -7,15 +7,19 @@
 import csv
 import os
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, get_args
 
+from sqlalchemy import delete, insert, text
 from sqlmodel import Session, select
 
 from app.db.database import SQLModel, get_db_engine
 from app.db.models.gtfs import (Calendar, CalendarDate, Route, Shape, Stop,
-                                StopTime, Transfer, Trip)
+                                StopSchedule, StopTime, Transfer, Trip)
+from app.db.repositories.dataset_version import DatasetVersionRepository
 from app.db.scripts.init_db import create_db_tables
+from app.db.scripts.snapshot_db import write_dataset_snapshot
 from app.settings import settings
+from app.utils.helpers import stop_direction_id, time_to_seconds
 from app.utils.logger import logger
 
 
@@ -48,6 +52,11 @@ def convert_field_types(data: List[Dict[str, Any]],
             model_field = model_class.model_fields.get(field)
             if model_field is not None:
                 field_type = model_field.annotation
+                # unwrap optional fields (e.g. int | None) to their type
+                field_args = [arg for arg in get_args(field_type)
+                              if arg is not type(None)]
+                if len(field_args) == 1:
+                    field_type = field_args[0]
                 if field_type == bool:
                     # Convert '0'/'1' strings to actual boolean values
                     converted_record[field] = value == '1'
@@ -78,6 +87,30 @@ def convert_field_types(data: List[Dict[str, Any]],
     return converted_data
 
 
+def add_derived_fields(data: List[Dict[str, Any]],
+                       model_class: SQLModel) -> List[Dict[str, Any]]:
+    """
+    Populate the model columns that are not part of the GTFS files but are
+    derived from them at seed time.
+    """
+    if model_class is Stop:
+        for record in data:
+            if record.get("parent_station") is not None:
+                record["direction_id"] = stop_direction_id(record["stop_id"])
+
+    elif model_class is StopTime:
+        # stops that aren't timepoints may leave their times empty
+        for record in data:
+            arrival_time = record.get("arrival_time")
+            departure_time = record.get("departure_time")
+            record["arrival_seconds"] = (time_to_seconds(arrival_time)
+                                         if arrival_time else None)
+            record["departure_seconds"] = (time_to_seconds(departure_time)
+                                           if departure_time else None)
+
+    return data
+
+
 def seed_routes(session: Session):
     try:
         routes_file_path = os.path.join(settings.gtfs_dir_path, "routes.txt")
@@ -111,6 +144,7 @@ def seed_stops(session: Session):
 
         stops_data = read_csv_file(stops_file_path)
         stops_data = convert_field_types(stops_data, Stop)
+        stops_data = add_derived_fields(stops_data, Stop)
 
         # first pass: add all stops without parent_station to avoid foreign
         # key constraints
@@ -255,6 +289,7 @@ def seed_stop_times(session: Session):
         def _process_stop_times_batch(session: Session,
                                       batch_records: List[Dict[str, Any]]):
             stop_times_data = convert_field_types(batch_records, StopTime)
+            stop_times_data = add_derived_fields(stop_times_data, StopTime)
             for stop_time_dict in stop_times_data:
                 stop_time = StopTime(**stop_time_dict)
                 session.add(stop_time)
@@ -316,6 +351,125 @@ def seed_transfers(session: Session):
         raise
 
 
+def insert_stop_schedule(session: Session,
+                         trip_ids: List[str] | None = None):
+    """
+    Insert the denormalized stop schedule rows built from the stop_times and
+    trip tables, of every trip or only the given ones. Stop times without
+    times can't be scheduled and are left out. Rows are inserted in
+    (stop_id, arrival_seconds) order so they are laid out the way stop
+    schedules are read. Doesn't commit.
+    """
+    columns = [StopTime.stop_id,
+               StopTime.arrival_seconds,
+               StopTime.trip_id,
+               StopTime.departure_seconds,
+               Trip.service_id,
+               Trip.route_id,
+               Trip.trip_headsign,
+               Trip.direction_id]
+    query = (select(*columns)
+             .join(Trip, StopTime.trip_id == Trip.trip_id)
+             .where(StopTime.arrival_seconds.is_not(None),
+                    StopTime.departure_seconds.is_not(None))
+             .order_by(StopTime.stop_id,
+                       StopTime.arrival_seconds,
+                       StopTime.trip_id))
+    if trip_ids is not None:
+        query = query.where(StopTime.trip_id.in_(trip_ids))
+
+    session.execute(insert(StopSchedule).from_select(
+        [column.key for column in columns], query))
+
+
+def build_stop_schedule(session: Session):
+    """
+    (Re)build the denormalized stop schedule from the stop_times and trip
+    tables. Doesn't commit.
+    """
+    session.execute(delete(StopSchedule))
+    insert_stop_schedule(session)
+
+
+def cluster_stop_schedule(session: Session):
+    """
+    Physically reorder the stop schedule by its (stop_id, arrival_seconds,
+    trip_id) primary key so a stop's schedule sits in contiguous pages.
+    PostgreSQL only; CLUSTER holds an exclusive lock on the table for the
+    duration, so it is only run on freshly seeded tables.
+    """
+    bind = session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    schema = bind.get_execution_options()["schema_translate_map"][None]
+    quote = bind.dialect.identifier_preparer.quote_identifier
+    table = StopSchedule.__tablename__
+    session.execute(text(f"CLUSTER {quote(schema)}.{quote(table)} "
+                         f"USING {quote(f'{table}_pkey')}"))
+
+
+def seed_stop_schedule(session: Session):
+    try:
+        build_stop_schedule(session)
+        cluster_stop_schedule(session)
+        session.commit()
+        logger.info("Successfully built the stop schedule")
+    except Exception as e:
+        logger.exception(f"Error building stop schedule: {e}")
+        session.rollback()
+        logger.info("Stop schedule changes rolled back")
+        raise
+
+
+def analyze_tables(session: Session):
+    """
+    Refresh the query planner statistics of an SQLite database, which unlike
+    PostgreSQL's autovacuum never collects them by itself.
+    """
+    if session.get_bind().dialect.name != "sqlite":
+        return
+
+    try:
+        logger.info("Analyzing SQLite tables")
+        session.execute(text("ANALYZE"))
+        session.commit()
+    except Exception as e:
+        logger.exception(f"Error analyzing tables: {e}")
+        session.rollback()
+        raise
+
+
+def stamp_dataset_version(session: Session):
+    try:
+        version = DatasetVersionRepository(session).bump().version
+        session.commit()
+        logger.info(f"Stamped GTFS static dataset with version '{version}'")
+    except Exception as e:
+        logger.exception(f"Error stamping dataset version: {e}")
+        session.rollback()
+        logger.info("Dataset version changes rolled back")
+        raise
+
+
+def seed_tables(session: Session):
+    """
+    Seed every GTFS table in order of dependencies, then stamp the new
+    dataset with a version so running API servers drop their caches.
+    """
+    seed_routes(session)
+    seed_stops(session)
+    seed_calendar(session)
+    seed_calendar_dates(session)
+    seed_shapes(session)
+    seed_trips(session)
+    seed_stop_times(session)
+    seed_transfers(session)
+    seed_stop_schedule(session)
+    analyze_tables(session)
+    stamp_dataset_version(session)
+
+
 def seed_database():
     """
     Seed the database with GTFS static data.
@@ -335,15 +489,8 @@ def seed_database():
         create_db_tables(engine)
 
         with Session(engine) as session:
-            # Seed tables in order of dependencies
-            seed_routes(session)
-            seed_stops(session)
-            seed_calendar(session)
-            seed_calendar_dates(session)
-            seed_shapes(session)
-            seed_trips(session)
-            seed_stop_times(session)
-            seed_transfers(session)
+            seed_tables(session)
+            write_dataset_snapshot(engine)
 
             end_time = datetime.now()
             duration = end_time - start_time
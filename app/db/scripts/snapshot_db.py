@@ -0,0 +1,64 @@
+# SQLModel is imported from app.db.database because Python executes all the
+# code creating the classes inheriting from SQLModel and registering them in
+# the SQLModel.metadata.
+#
+# https://sqlmodel.tiangolo.com/tutorial/create-db-and-table/#sqlmodel-metadata-order-matters
+
+from datetime import datetime
+
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from app.db.database import get_db_engine
+from app.db.repositories.dataset_version import DatasetVersionRepository
+from app.db.snapshot import write_snapshot
+from app.settings import settings
+from app.utils.logger import logger
+
+
+def write_dataset_snapshot(engine: Engine):
+    """
+    Write the columnar snapshot of the loaded dataset version to
+    snapshot_path. Does nothing if snapshot_path isn't configured.
+    """
+    if settings.snapshot_path is None:
+        return
+
+    with Session(engine) as session:
+        stamp = DatasetVersionRepository(session).get()
+        if stamp is None:
+            logger.error("The database has no dataset version to snapshot")
+            return
+        logger.info(f"Writing snapshot of dataset version '{stamp.version}'")
+        directory = write_snapshot(session, settings.snapshot_path,
+                                   stamp.version)
+        logger.info(f"Wrote snapshot '{directory}'")
+
+
+def snapshot_database():
+    """
+    Write the columnar snapshot of the loaded GTFS static dataset.
+    """
+    if settings.snapshot_path is None:
+        logger.error("snapshot_path is not configured")
+        return
+
+    start_time = datetime.now()
+    engine = None
+    try:
+        engine = get_db_engine()
+        write_dataset_snapshot(engine)
+        duration = datetime.now() - start_time
+        logger.info(f"Database snapshot completed in {duration}")
+    except Exception as e:
+        logger.exception(f"Database snapshot failed: {e}")
+        raise
+    finally:
+        if engine:
+            logger.info("Disposing database engine")
+            engine.dispose()
+            logger.info("Database connections closed")
+
+
+if __name__ == "__main__":
+    snapshot_database()
@@ -0,0 +1,170 @@
+# SQLModel is imported from app.db.database because Python executes all the
+# code creating the classes inheriting from SQLModel and registering them in
+# the SQLModel.metadata.
+#
+# https://sqlmodel.tiangolo.com/tutorial/create-db-and-table/#sqlmodel-metadata-order-matters
+
+import os
+from datetime import datetime
+
+from sqlalchemy import Engine, text
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlmodel import Session
+
+from app.db.database import SQLModel, get_db_engine, get_schema_engine
+from app.db.scripts.seed_db import seed_tables
+from app.db.scripts.snapshot_db import write_dataset_snapshot
+from app.settings import settings
+from app.utils.logger import logger
+
+
+def shadow_schema_name() -> str:
+    return f"{settings.db_schema}_next"
+
+
+def previous_schema_name() -> str:
+    return f"{settings.db_schema}_prev"
+
+
+def _quote(engine: Engine, name: str) -> str:
+    return engine.dialect.identifier_preparer.quote_identifier(name)
+
+
+def create_shadow_schema(engine: Engine, schema: str):
+    """
+    (Re)create an empty shadow schema with every GTFS table but without
+    secondary indexes, which are cheaper to build once the data is loaded.
+    """
+    logger.info(f"Creating shadow schema '{schema}'")
+    shadow_engine = get_schema_engine(schema)
+    with shadow_engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {_quote(engine, schema)} "
+                          "CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {_quote(engine, schema)}"))
+        for table in SQLModel.metadata.sorted_tables:
+            conn.execute(CreateTable(table))
+
+
+def build_shadow_indexes(engine: Engine, schema: str):
+    """
+    Build the secondary indexes and refresh planner statistics of the loaded
+    shadow schema so it is query ready the moment it is swapped in.
+    """
+    shadow_engine = get_schema_engine(schema)
+    with shadow_engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            for index in table.indexes:
+                logger.info(f"Building index '{index.name}' in '{schema}'")
+                conn.execute(CreateIndex(index))
+
+        for table in SQLModel.metadata.sorted_tables:
+            logger.info(f"Analyzing '{schema}.{table.name}'")
+            conn.execute(text(f"ANALYZE {_quote(engine, schema)}."
+                              f"{_quote(engine, table.name)}"))
+
+
+def swap_schemas(engine: Engine, shadow: str):
+    """
+    Atomically promote the shadow schema to the live schema. The live schema
+    is kept as the previous schema for rollback.
+    """
+    live = settings.db_schema
+    previous = previous_schema_name()
+    logger.info(f"Swapping schema '{shadow}' in as '{live}'")
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {_quote(engine, previous)} "
+                          "CASCADE"))
+        live_exists = conn.execute(
+            text("SELECT 1 FROM pg_namespace WHERE nspname = :schema"),
+            {"schema": live}).first()
+        if live_exists:
+            conn.execute(text(f"ALTER SCHEMA {_quote(engine, live)} "
+                              f"RENAME TO {_quote(engine, previous)}"))
+        conn.execute(text(f"ALTER SCHEMA {_quote(engine, shadow)} "
+                          f"RENAME TO {_quote(engine, live)}"))
+
+
+def refresh_database():
+    """
+    Refresh the GTFS static data without downtime. The new dataset is seeded,
+    indexed and analyzed in a shadow schema while the API keeps reading the
+    live schema, then both schemas are swapped in a single transaction.
+    """
+    if settings.db_backend != "postgresql":
+        logger.error("Schema swaps require the postgresql backend; use "
+                     "seed_db or sync_db instead")
+        return
+
+    start_time = datetime.now()
+    logger.info(f"Starting GTFS data refresh at {start_time}")
+
+    if not os.path.exists(settings.gtfs_dir_path):
+        logger.error(
+            f"GTFS directory not found at: '{settings.gtfs_dir_path}'")
+        return
+
+    engine = None
+    try:
+        engine = get_db_engine()
+        shadow = shadow_schema_name()
+        create_shadow_schema(engine, shadow)
+
+        with Session(get_schema_engine(shadow)) as session:
+            seed_tables(session)
+
+        build_shadow_indexes(engine, shadow)
+        swap_schemas(engine, shadow)
+        write_dataset_snapshot(engine)
+
+        duration = datetime.now() - start_time
+        logger.info(f"Database refresh completed successfully in {duration}")
+    except Exception as e:
+        logger.exception(f"Database refresh failed: {e}")
+        raise
+    finally:
+        if engine:
+            logger.info("Disposing database engine")
+            engine.dispose()
+            logger.info("Database connections closed")
+
+
+def rollback_database():
+    """
+    Swap the previous schema back in as the live schema. Running it again
+    rolls forward to the refreshed dataset.
+    """
+    if settings.db_backend != "postgresql":
+        logger.error("Schema swaps require the postgresql backend")
+        return
+
+    engine = None
+    try:
+        engine = get_db_engine()
+        live = settings.db_schema
+        previous = previous_schema_name()
+        swapping = f"{live}_swap"
+        logger.info(f"Rolling back schema '{live}' to '{previous}'")
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER SCHEMA {_quote(engine, live)} "
+                              f"RENAME TO {_quote(engine, swapping)}"))
+            conn.execute(text(f"ALTER SCHEMA {_quote(engine, previous)} "
+                              f"RENAME TO {_quote(engine, live)}"))
+            conn.execute(text(f"ALTER SCHEMA {_quote(engine, swapping)} "
+                              f"RENAME TO {_quote(engine, previous)}"))
+        logger.info("Database rollback completed")
+    except Exception as e:
+        logger.exception(f"Database rollback failed: {e}")
+        raise
+    finally:
+        if engine:
+            logger.info("Disposing database engine")
+            engine.dispose()
+            logger.info("Database connections closed")
+
+
+if __name__ == "__main__":
+    import sys
+    if "--rollback" in sys.argv[1:]:
+        rollback_database()
+    else:
+        refresh_database()
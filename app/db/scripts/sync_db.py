@@ -0,0 +1,340 @@
+# SQLModel is imported from app.db.database because Python executes all the
+# code creating the classes inheriting from SQLModel and registering them in
+# the SQLModel.metadata.
+#
+# https://sqlmodel.tiangolo.com/tutorial/create-db-and-table/#sqlmodel-metadata-order-matters
+
+import hashlib
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Set, Tuple
+
+from sqlalchemy import delete, insert, tuple_, update
+from sqlmodel import Session, select
+
+from app.db.database import SQLModel, get_db_engine
+from app.db.models.gtfs import (Calendar, CalendarDate, Route, Shape, Stop,
+                                StopSchedule, StopTime, Transfer, Trip)
+from app.db.repositories.dataset_version import DatasetVersionRepository
+from app.db.scripts.init_db import create_db_tables
+from app.db.scripts.seed_db import (add_derived_fields, convert_field_types,
+                                    insert_stop_schedule, read_csv_file)
+from app.db.scripts.snapshot_db import write_dataset_snapshot
+from app.settings import settings
+from app.utils.logger import logger
+
+# (model, GTFS file name, required) in order of dependencies
+GTFS_TABLES: List[Tuple[type[SQLModel], str, bool]] = [
+    (Route, "routes.txt", True),
+    (Stop, "stops.txt", True),
+    (Calendar, "calendar.txt", True),
+    (CalendarDate, "calendar_dates.txt", False),
+    (Shape, "shapes.txt", True),
+    (Trip, "trips.txt", True),
+    (StopTime, "stop_times.txt", True),
+    (Transfer, "transfers.txt", True),
+]
+
+# number of rows sent per INSERT/UPDATE/DELETE statement
+BATCH_SIZE = 5000
+
+
+@dataclass
+class TableChanges:
+    """
+    Row level changes between the loaded table and the incoming GTFS file.
+    """
+    table: str
+    inserts: List[Dict[str, Any]]
+    updates: List[Dict[str, Any]]
+    deletes: List[Tuple[Any, ...]]
+    unchanged: int
+
+    @property
+    def total(self) -> int:
+        return len(self.inserts) + len(self.updates) + len(self.deletes)
+
+
+def _columns(model: type[SQLModel]) -> Tuple[List[str], List[str]]:
+    """
+    Split the model's table columns into primary key and content columns.
+    """
+    table = model.__table__
+    pk_columns = [column.name for column in table.primary_key.columns]
+    columns = [column.name for column in table.columns]
+    return pk_columns, columns
+
+
+def _fingerprint(values: Tuple[Any, ...]) -> bytes:
+    """
+    Content hash of a row's column values.
+    """
+    return hashlib.blake2b(repr(values).encode("utf-8"),
+                           digest_size=16).digest()
+
+
+def read_incoming(model: type[SQLModel],
+                  file_name: str,
+                  required: bool) -> List[Dict[str, Any]] | None:
+    """
+    Read and convert the incoming GTFS file of a table.
+
+    Returns:
+        List[Dict[str, Any]] | None: Converted records, None if an optional
+        file is missing and the table should be left untouched.
+    """
+    file_path = os.path.join(settings.gtfs_dir_path, file_name)
+    if not os.path.exists(file_path):
+        if required:
+            raise FileNotFoundError(f"GTFS file not found: '{file_path}'")
+        logger.info(f"Optional GTFS file not found: '{file_path}'. Skipping.")
+        return None
+
+    records = convert_field_types(read_csv_file(file_path), model)
+    return add_derived_fields(records, model)
+
+
+def loaded_fingerprints(
+        session: Session,
+        model: type[SQLModel]) -> Dict[Tuple[Any, ...], bytes]:
+    """
+    Fingerprint every row currently loaded in the model's table by primary
+    key and content hash.
+    """
+    pk_columns, columns = _columns(model)
+    table = model.__table__
+    query = select(*[table.c[name] for name in columns])
+
+    fingerprints = {}
+    result = session.execute(query.execution_options(yield_per=BATCH_SIZE))
+    for row in result:
+        values = tuple(row)
+        key = tuple(values[columns.index(name)] for name in pk_columns)
+        fingerprints[key] = _fingerprint(values)
+    return fingerprints
+
+
+def diff_table(session: Session,
+               model: type[SQLModel],
+               records: List[Dict[str, Any]]) -> TableChanges:
+    """
+    Compare the incoming records against the loaded rows of a table.
+    """
+    pk_columns, columns = _columns(model)
+    loaded = loaded_fingerprints(session, model)
+
+    inserts, updates = [], []
+    unchanged = 0
+    seen = set()
+    for record in records:
+        values = tuple(record.get(name) for name in columns)
+        key = tuple(record.get(name) for name in pk_columns)
+        if key in seen:
+            # duplicated primary key in the incoming file; first one wins
+            # like it would on a fresh seed
+            continue
+        seen.add(key)
+
+        row = dict(zip(columns, values))
+        fingerprint = loaded.get(key)
+        if fingerprint is None:
+            inserts.append(row)
+        elif fingerprint != _fingerprint(values):
+            updates.append(row)
+        else:
+            unchanged += 1
+
+    deletes = [key for key in loaded if key not in seen]
+    return TableChanges(table=model.__tablename__,
+                        inserts=inserts,
+                        updates=updates,
+                        deletes=deletes,
+                        unchanged=unchanged)
+
+
+def _order_stops(changes: TableChanges) -> None:
+    """
+    Stop references itself through parent_station. Insert parent stations
+    before their children and delete children before their parents.
+    """
+    changes.inserts.sort(key=lambda row: row.get("parent_station") is not None)
+    changes.updates.sort(key=lambda row: row.get("parent_station") is not None)
+
+
+def apply_upserts(session: Session,
+                  model: type[SQLModel],
+                  changes: TableChanges) -> None:
+    for i in range(0, len(changes.inserts), BATCH_SIZE):
+        session.execute(insert(model), changes.inserts[i:i + BATCH_SIZE])
+    for i in range(0, len(changes.updates), BATCH_SIZE):
+        session.execute(update(model), changes.updates[i:i + BATCH_SIZE])
+
+
+def apply_deletes(session: Session,
+                  model: type[SQLModel],
+                  changes: TableChanges) -> None:
+    pk_columns, _ = _columns(model)
+    table = model.__table__
+    pk = tuple_(*[table.c[name] for name in pk_columns])
+
+    keys = changes.deletes
+    if model is Stop:
+        # children first so parent stations are no longer referenced
+        loaded_parents = set(session.exec(
+            select(Stop.stop_id).where(Stop.parent_station.is_(None))).all())
+        keys = sorted(keys, key=lambda key: key[0] in loaded_parents)
+
+    for i in range(0, len(keys), BATCH_SIZE):
+        session.execute(delete(table).where(pk.in_(keys[i:i + BATCH_SIZE])))
+
+
+def changed_trip_ids(changes: Dict[str, TableChanges]) -> Set[str]:
+    """
+    IDs of the trips whose stop schedule rows change: inserted, updated and
+    deleted trips, and trips with inserted, updated or deleted stop times.
+    """
+    trip_ids = set()
+    for model in (Trip, StopTime):
+        table_changes = changes.get(model.__tablename__)
+        if table_changes is None:
+            continue
+        pk_columns, _ = _columns(model)
+        position = pk_columns.index("trip_id")
+        trip_ids.update(row["trip_id"] for row in table_changes.inserts)
+        trip_ids.update(row["trip_id"] for row in table_changes.updates)
+        trip_ids.update(key[position] for key in table_changes.deletes)
+    return trip_ids
+
+
+def delete_trip_schedules(session: Session, trip_ids: List[str]) -> None:
+    """
+    Delete the stop schedule rows of the given trips. The rows are looked up
+    by primary key from the trips' stop times, so this must run before the
+    stop time changes are applied.
+    """
+    schedule_key = tuple_(StopSchedule.stop_id,
+                          StopSchedule.arrival_seconds,
+                          StopSchedule.trip_id)
+    for i in range(0, len(trip_ids), BATCH_SIZE):
+        stop_time_keys = (select(StopTime.stop_id,
+                                 StopTime.arrival_seconds,
+                                 StopTime.trip_id)
+                          .where(StopTime.trip_id.in_(
+                              trip_ids[i:i + BATCH_SIZE])))
+        session.execute(delete(StopSchedule)
+                        .where(schedule_key.in_(stop_time_keys)))
+
+
+def insert_trip_schedules(session: Session, trip_ids: List[str]) -> None:
+    """
+    Insert the stop schedule rows of the given trips from their synced trip
+    and stop times.
+    """
+    for i in range(0, len(trip_ids), BATCH_SIZE):
+        insert_stop_schedule(session, trip_ids[i:i + BATCH_SIZE])
+
+
+def sync_database(dry_run: bool = False) -> Dict[str, TableChanges]:
+    """
+    Apply the difference between the GTFS static files and the loaded data
+    instead of dropping and reseeding every table. Only inserted, updated
+    and deleted rows are written, all within a single transaction.
+
+    Args:
+        dry_run (bool): Compute and report the changes without applying them
+
+    Returns:
+        Dict[str, TableChanges]: Changes per table name
+    """
+    start_time = datetime.now()
+    logger.info(f"Starting GTFS data sync at {start_time}")
+
+    if not os.path.exists(settings.gtfs_dir_path):
+        logger.error(
+            f"GTFS directory not found at: '{settings.gtfs_dir_path}'")
+        return {}
+
+    engine = None
+    try:
+        engine = get_db_engine()
+        create_db_tables(engine)
+
+        changes: Dict[str, TableChanges] = {}
+        with Session(engine) as session:
+            try:
+                for model, file_name, required in GTFS_TABLES:
+                    records = read_incoming(model, file_name, required)
+                    if records is None:
+                        continue
+                    table_changes = diff_table(session, model, records)
+                    if model is Stop:
+                        _order_stops(table_changes)
+                    changes[model.__tablename__] = table_changes
+                    logger.info(
+                        f"'{table_changes.table}': "
+                        f"{len(table_changes.inserts)} inserts, "
+                        f"{len(table_changes.updates)} updates, "
+                        f"{len(table_changes.deletes)} deletes, "
+                        f"{table_changes.unchanged} unchanged")
+
+                if dry_run:
+                    logger.info("Dry run; no changes applied")
+                    return changes
+
+                # the stop schedule is derived from both trips and stop
+                # times; only the rows of changed trips are rebuilt, in place
+                # without CLUSTER so readers aren't locked out
+                trip_ids = sorted(changed_trip_ids(changes))
+                if trip_ids:
+                    logger.info(f"Rebuilding the stop schedule of "
+                                f"{len(trip_ids)} trips")
+                    delete_trip_schedules(session, trip_ids)
+
+                # inserts and updates in order of dependencies so new rows
+                # are referenced only after they exist, then deletes in
+                # reverse order once nothing references the removed rows
+                for model, _, _ in GTFS_TABLES:
+                    table_changes = changes.get(model.__tablename__)
+                    if table_changes and (table_changes.inserts
+                                          or table_changes.updates):
+                        apply_upserts(session, model, table_changes)
+
+                for model, _, _ in reversed(GTFS_TABLES):
+                    table_changes = changes.get(model.__tablename__)
+                    if table_changes and table_changes.deletes:
+                        apply_deletes(session, model, table_changes)
+
+                if trip_ids:
+                    insert_trip_schedules(session, trip_ids)
+
+                # a new version stamp invalidates the API servers' caches
+                if any(table_changes.total
+                       for table_changes in changes.values()):
+                    version = DatasetVersionRepository(session).bump().version
+                    logger.info(f"Stamping dataset version '{version}'")
+
+                session.commit()
+            except Exception as e:
+                logger.exception(f"Error syncing GTFS data: {e}")
+                session.rollback()
+                logger.info("Sync changes rolled back")
+                raise
+
+        total = sum(table_changes.total for table_changes in changes.values())
+        if total:
+            write_dataset_snapshot(engine)
+        duration = datetime.now() - start_time
+        logger.info(f"Database sync completed with {total} row changes in "
+                    f"{duration}")
+        return changes
+    finally:
+        if engine:
+            logger.info("Disposing database engine")
+            engine.dispose()
+            logger.info("Database connections closed")
+
+
+if __name__ == "__main__":
+    import sys
+    sync_database(dry_run="--dry-run" in sys.argv[1:])
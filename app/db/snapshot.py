@@ -0,0 +1,220 @@
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Any, Dict, Sequence, get_args
+
+import pyarrow as pa
+from sqlmodel import Session, SQLModel, select
+
+from app.db.models.gtfs import (Calendar, CalendarDate, Route, Shape, Stop,
+                                StopTime, Transfer, Trip)
+from app.utils.logger import logger
+
+# every GTFS table in the snapshot, keyed by file name
+SNAPSHOT_TABLES: Dict[str, type[SQLModel]] = {
+    "routes": Route,
+    "stops": Stop,
+    "calendar": Calendar,
+    "calendar_dates": CalendarDate,
+    "shapes": Shape,
+    "trips": Trip,
+    "stop_times": StopTime,
+    "transfers": Transfer,
+}
+
+# ID columns repeating a small set of values, stored once in a dictionary
+# and referenced by integer indices
+DICTIONARY_COLUMNS = {"stop_id", "route_id", "service_id", "trip_id",
+                      "shape_id", "parent_station", "from_stop_id",
+                      "to_stop_id", "agency_id"}
+
+# file in the snapshot directory naming the complete snapshot to read
+CURRENT_FILE = "CURRENT"
+
+# number of rows fetched per round trip while writing
+WRITE_BATCH_SIZE = 50000
+
+# snapshots kept next to the current one; workers still mapping an older
+# one keep reading it until they restart
+KEEP_SNAPSHOTS = 1
+
+_ARROW_TYPES = {str: pa.string(),
+                int: pa.int32(),
+                float: pa.float64(),
+                bool: pa.bool_()}
+
+
+def _arrow_schema(model: type[SQLModel]) -> pa.Schema:
+    fields = []
+    for column in model.__table__.columns:
+        field_type = model.model_fields[column.name].annotation
+        # unwrap optional fields (e.g. int | None) to their type
+        field_args = [arg for arg in get_args(field_type)
+                      if arg is not type(None)]
+        if len(field_args) == 1:
+            field_type = field_args[0]
+        arrow_type = _ARROW_TYPES[field_type]
+        if column.name in DICTIONARY_COLUMNS:
+            arrow_type = pa.dictionary(pa.int32(), arrow_type)
+        fields.append(pa.field(column.name, arrow_type,
+                               nullable=column.nullable))
+    return pa.schema(fields)
+
+
+def _dictionary_array(values: Sequence[Any],
+                      codes: Dict[Any, int],
+                      arrow_type: pa.DictionaryType) -> pa.DictionaryArray:
+    # codes maps the values seen in the batches written so far to their
+    # index, in insertion order, so the dictionary only grows
+    indices = pa.array([None if value is None
+                        else codes.setdefault(value, len(codes))
+                        for value in values],
+                       type=arrow_type.index_type)
+    return pa.DictionaryArray.from_arrays(
+        indices, pa.array(list(codes), type=arrow_type.value_type))
+
+
+def write_table(session: Session,
+                model: type[SQLModel],
+                path: str) -> int:
+    """
+    Write a table to an Arrow IPC file in primary key order, one record
+    batch per fetched batch of rows. Dictionary encoded columns share one
+    dictionary across the batches, each batch adding the new values as a
+    dictionary delta.
+
+    Args:
+        session (Session): Database session to read the table with
+        model (type[SQLModel]): Model of the table
+        path (str): Arrow IPC file to write
+
+    Returns:
+        int: Number of rows written
+    """
+    table = model.__table__
+    schema = _arrow_schema(model)
+    query = (select(*table.columns)
+             .order_by(*table.primary_key.columns)
+             .execution_options(yield_per=WRITE_BATCH_SIZE))
+
+    codes: Dict[str, Dict[Any, int]] = {
+        field.name: {} for field in schema
+        if pa.types.is_dictionary(field.type)}
+    options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+    rows = 0
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, schema, options=options) as writer:
+            for partition in session.execute(query).partitions():
+                arrays = [_dictionary_array(values, codes[field.name],
+                                            field.type)
+                          if field.name in codes
+                          else pa.array(values, type=field.type)
+                          for field, values in zip(schema, zip(*partition))]
+                writer.write_batch(pa.record_batch(arrays, schema=schema))
+                rows += len(partition)
+    return rows
+
+
+def write_snapshot(session: Session, root: str, version: str) -> str:
+    """
+    Write every GTFS table of a dataset version to a columnar snapshot.
+
+    Tables are written as uncompressed Arrow IPC files so readers can memory
+    map them without copying. The snapshot goes to its own version directory
+    and is published by replacing the CURRENT file, so readers never see a
+    partially written snapshot.
+
+    Args:
+        session (Session): Database session to read the tables with
+        root (str): Directory holding the snapshots
+        version (str): Dataset version stamp of the tables
+
+    Returns:
+        str: Directory of the written snapshot
+    """
+    directory = os.path.join(root, version)
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+
+    tables = {}
+    for name, model in SNAPSHOT_TABLES.items():
+        rows = write_table(session, model, os.path.join(directory,
+                                                        f"{name}.arrow"))
+        logger.info(f"Wrote {rows} rows of '{name}' to the snapshot")
+        tables[name] = rows
+
+    with open(os.path.join(directory, "manifest.json"), "w") as f:
+        json.dump({"version": version,
+                   "created_at": datetime.now().isoformat(),
+                   "tables": tables}, f)
+
+    current = os.path.join(root, CURRENT_FILE)
+    with open(f"{current}.tmp", "w") as f:
+        f.write(version)
+    os.replace(f"{current}.tmp", current)
+
+    # drop snapshots older than the ones kept
+    snapshots = sorted(
+        (entry for entry in os.scandir(root)
+         if entry.is_dir() and entry.name != version),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True)
+    for entry in snapshots[KEEP_SNAPSHOTS:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+    return directory
+
+
+class Snapshot:
+    """
+    Memory-mapped columnar snapshot of the GTFS tables of a dataset version.
+    Columns are read straight from the mapped files; pages are loaded by the
+    OS as they are touched and shared between the processes mapping them.
+
+    Args:
+        directory (str): Directory of the snapshot
+        version (str): Dataset version stamp of the snapshot
+    """
+
+    def __init__(self, directory: str, version: str):
+        self.directory = directory
+        self.version = version
+
+    def table(self, name: str) -> pa.Table:
+        """
+        Memory map a table of the snapshot.
+
+        Args:
+            name (str): Table name, a key of SNAPSHOT_TABLES
+
+        Returns:
+            pa.Table: The table, backed by the mapped file
+        """
+        source = pa.memory_map(os.path.join(self.directory, f"{name}.arrow"))
+        return pa.ipc.open_file(source).read_all()
+
+    @classmethod
+    def open(cls, root: str, version: str | None) -> "Snapshot | None":
+        """
+        Open the current snapshot if it holds the given dataset version.
+
+        Args:
+            root (str): Directory holding the snapshots
+            version (str | None): Dataset version stamp the snapshot must hold
+
+        Returns:
+            Snapshot | None: The snapshot, None if there is none or it holds
+            another version
+        """
+        try:
+            with open(os.path.join(root, CURRENT_FILE)) as f:
+                current = f.read().strip()
+        except FileNotFoundError:
+            return None
+
+        if version is None or current != version:
+            logger.info(f"Snapshot holds dataset version '{current}', not "
+                        f"'{version}'")
+            return None
+        return cls(os.path.join(root, current), current)
@@ -1,13 +1,41 @@
-from typing import Any, Generator
+from contextlib import asynccontextmanager
+from typing import (Any, AsyncGenerator, AsyncIterator, Callable, Generator,
+                    TypeVar)
 
 from fastapi import Depends
 from sqlmodel import Session
-
-from app.db.database import engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.database import async_engine, engine
+from app.db.memory.repositories import (MemoryRouteRepository,
+                                        MemoryStopRepository,
+                                        MemoryStopScheduleRepository,
+                                        MemoryStopTimeRepository,
+                                        MemoryTripRepository)
+from app.db.memory.route_stops import route_stop_store
+from app.db.memory.shapes import shape_store
+from app.db.memory.spatial import stop_spatial_index
+from app.db.memory.store import static_store
+from app.db.memory.timetable import timetable_store
+from app.db.replicas import read_replicas
+from app.db.repositories.route import AsyncRouteRepository
+from app.db.repositories.stop import AsyncStopRepository
+from app.db.repositories.stop_schedule import AsyncStopScheduleRepository
+from app.db.repositories.stop_time import AsyncStopTimeRepository
+from app.db.repositories.trip import AsyncTripRepository
+from app.services.calendar import CalendarService, calendar_service
 from app.services.feed import FeedService, feed_service
+from app.services.journey import JourneyService, reachability_cache
+from app.services.response_cache import ResponseCache, response_cache
 from app.services.route import RouteService
+from app.services.shape import ShapeService
 from app.services.stop import StopService
-from app.services.trip import TripService
+from app.services.trip import TripService, trip_total_cache
+from app.settings import settings
+
+# a generic type parameter for streamed static services and their items
+S = TypeVar('S')
+T = TypeVar('T')
 
 
 def get_db_session() -> Generator[Session, Any, None]:
@@ -25,6 +53,30 @@ def get_db_session() -> Generator[Session, Any, None]:
             session.close()
 
 
+async def get_async_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Creates a new async database session and closes it after use. Queries run
+    on the event loop instead of holding a threadpool thread while waiting on
+    the database.
+
+    Yields:
+        AsyncSession: A SQLModel async session connected to the database.
+    """
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+def get_calendar_service() -> CalendarService:
+    """
+    A getter function for the CalendarService instance. The CalendarService
+    object resolves the service IDs active on a date for the static services.
+
+    Returns:
+        CalendarService: A resolver of active services per service date.
+    """
+    return calendar_service
+
+
 def get_feed_service() -> FeedService:
     """
     A getter function for the FeedService instance. The FeedService object will
@@ -36,8 +88,88 @@ def get_feed_service() -> FeedService:
     return feed_service
 
 
+def get_journey_service(
+        calendar: CalendarService = Depends(get_calendar_service)
+) -> JourneyService:
+    """
+    A getter function for the JourneyService instance. The JourneyService
+    object will be dependency injected into the journeys API endpoints.
+
+    Returns:
+        JourneyService: A journey planner over the in-memory timetable.
+    """
+    return JourneyService(timetable_store, calendar, reachability_cache)
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    A getter function for the ResponseCache instance. The ResponseCache object
+    serves the static GTFS endpoints' serialized responses from memory.
+
+    Returns:
+        ResponseCache: A cache of responses per dataset version.
+    """
+    return response_cache
+
+
+@asynccontextmanager
+async def open_static_session() -> AsyncIterator[AsyncSession | None]:
+    """
+    Async database session for the static GTFS services, opened on the next
+    healthy read replica or on the primary without one. No session is opened
+    when the in-memory backend serves the static data.
+
+    Yields:
+        AsyncSession | None: A SQLModel async session, None for the in-memory
+        backend.
+    """
+    if settings.static_backend == "memory":
+        yield None
+    else:
+        async with AsyncSession(read_replicas.async_engine(),
+                                expire_on_commit=False) as session:
+            yield session
+
+
+async def get_static_session() -> AsyncGenerator[AsyncSession | None, None]:
+    """
+    A getter function for the static GTFS services' session, closed after
+    the request. See open_static_session.
+
+    Yields:
+        AsyncSession | None: A SQLModel async session, None for the in-memory
+        backend.
+    """
+    async with open_static_session() as session:
+        yield session
+
+
+async def stream_static(
+        build: Callable[[AsyncSession | None], S],
+        stream: Callable[[S], AsyncIterator[T]]) -> AsyncIterator[T]:
+    """
+    Stream items of a static GTFS service built on a session of its own. The
+    sessions of request dependencies are closed before a streamed body is
+    sent, so the stream opens one that stays open until it ends.
+
+    Args:
+        build (Callable[[AsyncSession | None], S]): Builds the service from a
+                                                    session, e.g. one of the
+                                                    service getters
+        stream (Callable[[S], AsyncIterator[T]]): Streams items from the
+                                                  service
+
+    Yields:
+        T: The streamed items
+    """
+    async with open_static_session() as session:
+        async for item in stream(build(session)):
+            yield item
+
+
 def get_route_service(
-        session: Session = Depends(get_db_session)) -> RouteService:
+        session: AsyncSession | None = Depends(get_static_session)
+) -> RouteService:
     """
     A getter function for the RouteService instance. The RouteService object
     will be dependency injected into the routes API endpoints.
@@ -45,11 +177,30 @@ def get_route_service(
     Returns:
         RouteService: A service layer for the Route GTFS Static data.
     """
-    return RouteService(session)
+    if session is None:
+        return RouteService(MemoryRouteRepository(static_store.dataset),
+                            route_stop_store,
+                            timetable_store)
+    return RouteService(AsyncRouteRepository(session),
+                        route_stop_store,
+                        timetable_store)
+
+
+def get_shape_service() -> ShapeService:
+    """
+    A getter function for the ShapeService instance. The ShapeService object
+    will be dependency injected into the route and trip shape endpoints.
+
+    Returns:
+        ShapeService: A service layer for the precomputed shape polylines.
+    """
+    return ShapeService(shape_store)
 
 
 def get_stop_service(
-        session: Session = Depends(get_db_session)) -> StopService:
+        session: AsyncSession | None = Depends(get_static_session),
+        calendar: CalendarService = Depends(get_calendar_service)
+) -> StopService:
     """
     A getter function for the StopService instance. The StopService object will
     be dependency injected into the stops API endpoints.
@@ -57,11 +208,24 @@ def get_stop_service(
     Returns:
         StopService: A service layer for the Stop GTFS Static data.
     """
-    return StopService(session)
+    if session is None:
+        dataset = static_store.dataset
+        return StopService(MemoryStopRepository(dataset),
+                           MemoryStopTimeRepository(dataset),
+                           MemoryStopScheduleRepository(dataset),
+                           calendar,
+                           stop_spatial_index)
+    return StopService(AsyncStopRepository(session),
+                       AsyncStopTimeRepository(session),
+                       AsyncStopScheduleRepository(session),
+                       calendar,
+                       stop_spatial_index)
 
 
 def get_trip_service(
-        session: Session = Depends(get_db_session)) -> RouteService:
+        session: AsyncSession | None = Depends(get_static_session),
+        calendar: CalendarService = Depends(get_calendar_service)
+) -> TripService:
     """
     A getter function for the TripService instance. The TripService object will
     be dependency injected into the trips API endpoints.
@@ -69,4 +233,13 @@ def get_trip_service(
     Returns:
         TripService: A service layer for the Trip GTFS Static data.
     """
-    return TripService(session)
+    if session is None:
+        dataset = static_store.dataset
+        return TripService(MemoryTripRepository(dataset),
+                           MemoryStopTimeRepository(dataset),
+                           calendar,
+                           trip_total_cache)
+    return TripService(AsyncTripRepository(session),
+                       AsyncStopTimeRepository(session),
+                       calendar,
+                       trip_total_cache)
@@ -1,22 +1,79 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from sqlmodel import Session
 
 from app.api.router import router
+from app.db.database import async_engine
+from app.db.replicas import read_replicas
+from app.middleware import QueryStatsMiddleware, ServerTimingMiddleware
+from app.services.dataset import dataset_service
 from app.settings import settings
 from app.utils.logger import logger
 
 
+def refresh_dataset() -> None:
+    # the version stamp is read from the primary: replicas lag each other, so
+    # reading it round robin would flip the loaded version back and forth
+    with Session(read_replicas.primary) as session:
+        dataset_service.refresh(session)
+
+
+async def watch_dataset_version() -> None:
+    while True:
+        await asyncio.sleep(settings.dataset_poll_interval)
+        try:
+            await run_in_threadpool(refresh_dataset)
+        except Exception as e:
+            logger.exception(f"Error refreshing static GTFS data: {e}")
+
+
+async def watch_replica_health() -> None:
+    while True:
+        await asyncio.sleep(settings.db_replica_check_interval)
+        try:
+            await read_replicas.check()
+        except Exception as e:
+            logger.exception(f"Error checking read replicas: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if read_replicas.replicas:
+        await read_replicas.check()
+    try:
+        await run_in_threadpool(refresh_dataset)
+    except Exception as e:
+        # real-time feeds don't depend on the database; keep serving them
+        logger.exception(f"Error loading static GTFS data: {e}")
+
+    watchers = [asyncio.create_task(watch_dataset_version())]
+    if read_replicas.replicas:
+        watchers.append(asyncio.create_task(watch_replica_health()))
+    yield
+    for watcher in watchers:
+        watcher.cancel()
+    await read_replicas.dispose()
+    await async_engine.dispose()
+
+
 def create_server() -> FastAPI:
     app = FastAPI(title=settings.app_name,
                   description=settings.app_description,
                   version=settings.app_version,
-                  debug=settings.debug)
+                  debug=settings.debug,
+                  lifespan=lifespan)
 
     app.add_middleware(CORSMiddleware,
                        allow_origins=settings.allowed_origins,
                        allow_credentials=True,
                        allow_methods=["GET"],
                        allow_headers=["*"])
+    app.add_middleware(ServerTimingMiddleware)
+    app.add_middleware(QueryStatsMiddleware)
 
     app.include_router(router=router)
     logger.info("Starting 🚇 MTA REST API...")
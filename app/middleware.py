@@ -0,0 +1,105 @@
+import random
+from time import perf_counter
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.metrics import QueryStats, query_stats
+from app.settings import settings
+from app.utils.logger import logger
+from app.utils.timing import RequestTimings, request_timings, timing_stats
+
+
+class QueryStatsMiddleware:
+    """
+    Count the database queries a request issues and the time spent in them,
+    reported in the X-DB-Query-Count and X-DB-Time-Ms response headers.
+    Streamed responses, sent without a Content-Length, keep reading the
+    database after their headers are sent and get no such headers. Requests
+    over the db_query_count_warning threshold are logged once their body
+    has been sent, streamed queries included.
+
+    A plain ASGI middleware rather than a BaseHTTPMiddleware so it sees the
+    end of streamed bodies.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive,
+                       send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+
+        async def send_with_stats(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if "content-length" in headers:
+                    headers["X-DB-Query-Count"] = str(stats.count)
+                    headers["X-DB-Time-Ms"] = f"{stats.seconds * 1000:.2f}"
+            await send(message)
+
+        token = query_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            query_stats.reset(token)
+
+        if stats.count > settings.db_query_count_warning:
+            logger.warning(f"{scope['method']} {scope['path']} issued "
+                           f"{stats.count} queries in "
+                           f"{stats.seconds * 1000:.2f}ms")
+
+
+class ServerTimingMiddleware:
+    """
+    Time the phases of a server_timing_sample_rate fraction of requests,
+    reported in the Server-Timing response header and aggregated per route
+    and phase in timing_stats. Phases of a streamed body that run after the
+    headers are sent are not reported. Added inside the
+    QueryStatsMiddleware, the header also carries the request's database
+    time.
+
+    A plain ASGI middleware rather than a BaseHTTPMiddleware so requests
+    that aren't sampled are passed straight through.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive,
+                       send: Send) -> None:
+        rate = settings.server_timing_sample_rate
+        if (scope["type"] != "http"
+                or rate <= 0
+                or random.random() >= rate):
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        start = perf_counter()
+
+        async def send_with_timings(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                stats = query_stats.get()
+                if stats is not None and stats.count:
+                    timings.add("db", stats.seconds)
+                timings.add("total", perf_counter() - start)
+                MutableHeaders(scope=message)["Server-Timing"] = (
+                    timings.header())
+
+                # unmatched requests have no route to aggregate under
+                route = scope.get("route")
+                if route is not None:
+                    timing_stats.record(f"{scope['method']} {route.path}",
+                                        timings)
+            await send(message)
+
+        token = request_timings.set(timings)
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            request_timings.reset(token)
@@ -0,0 +1,23 @@
+from typing import Dict, Generic, List, TypeVar
+
+from pydantic import BaseModel, Field
+
+# a generic type parameter for Batch results
+T = TypeVar('T')
+
+# most IDs resolved by a single batch request
+MAX_BATCH_IDS = 500
+
+
+class BatchRequest(BaseModel):
+    ids: List[str] = Field(
+        min_length=1,
+        max_length=MAX_BATCH_IDS,
+        description=(f"IDs to look up, at most {MAX_BATCH_IDS}. Duplicates "
+                     "are looked up once"))
+
+
+class BatchResponse(BaseModel, Generic[T]):
+    results: Dict[str, T] = Field(description="The found items keyed by ID")
+    missing: List[str] = Field(
+        description="Requested IDs without an item, in request order")
@@ -0,0 +1,72 @@
+from datetime import datetime
+from enum import Enum
+from typing import List
+
+from pydantic import BaseModel, Field
+
+from app.schemas.stop import ScheduledTrip
+from app.schemas.trip import ScheduledStop
+
+
+class LegMode(str, Enum):
+    """
+    transit legs ride a trip, walk legs transfer between stations.
+    """
+    TRANSIT = "transit"
+    WALK = "walk"
+
+
+class JourneyLeg(BaseModel):
+    mode: LegMode = Field(description="How the leg is travelled")
+    origin: ScheduledStop = Field(description="Stop the leg starts at")
+    destination: ScheduledStop = Field(description="Stop the leg ends at")
+    departs_at: datetime = Field(
+        description="Departure date and time in the transit agency timezone")
+    arrives_at: datetime = Field(
+        description="Arrival date and time in the transit agency timezone")
+    trip: ScheduledTrip | None = Field(
+        default=None,
+        description="Trip ridden on transit legs")
+
+
+class Journey(BaseModel):
+    departs_at: datetime = Field(
+        description="Departure date and time in the transit agency timezone")
+    arrives_at: datetime = Field(
+        description="Arrival date and time in the transit agency timezone")
+    duration: int = Field(
+        description="Seconds from the requested departure time to arrival")
+    transfers: int = Field(description="Number of changes between trips")
+    legs: List[JourneyLeg] = Field(description="Legs in travel order")
+
+
+class JourneysResponse(BaseModel):
+    origin: ScheduledStop = Field(description="Station the journeys start at")
+    destination: ScheduledStop = Field(
+        description="Station the journeys end at")
+    depart_at: datetime = Field(
+        description="Earliest departure date and time of the journeys")
+    journeys: List[Journey] = Field(
+        description=("Pareto-optimal journeys ordered by number of "
+                     "transfers. Every journey arrives earlier than the "
+                     "journeys with fewer transfers"))
+
+
+class ReachableStop(BaseModel):
+    stop: ScheduledStop = Field(description="Station reached")
+    arrives_at: datetime = Field(
+        description=("Earliest arrival date and time in the transit agency "
+                     "timezone"))
+    duration: int = Field(
+        description="Seconds from the departure time to arrival")
+
+
+class ReachabilityResponse(BaseModel):
+    origin: ScheduledStop = Field(description="Station departed from")
+    depart_at: datetime = Field(
+        description=("Departure date and time, rounded down to the start of "
+                     "its time bucket"))
+    max_minutes: int | None = Field(
+        description="Maximum travel time in minutes, null for no limit")
+    stops: List[ReachableStop] = Field(
+        description="Reachable stations in arrival order")
@@ -0,0 +1,53 @@
+from typing import Dict
+
+from pydantic import BaseModel, Field
+
+
+class CacheStatsResponse(BaseModel):
+    dataset_version: str | None = Field(
+        description="Version stamp of the dataset the cache serves")
+    size: int = Field(description="Number of cached responses")
+    maxsize: int = Field(description="Maximum number of cached responses")
+    hits: int = Field(description="Number of requests served from the cache")
+    misses: int = Field(
+        description="Number of requests that missed the cache")
+    evictions: int = Field(
+        description="Number of least recently used responses evicted")
+    expirations: int = Field(
+        description="Number of responses dropped after their TTL expired")
+    hit_ratio: float = Field(description="Ratio of hits to all lookups")
+
+
+class PoolStatsResponse(BaseModel):
+    engine: str = Field(description="Name of the database engine")
+    size: int = Field(description="Number of persistent connections")
+    max_overflow: int = Field(
+        description="Maximum number of connections beyond the pool size")
+    checked_in: int = Field(description="Number of idle pooled connections")
+    checked_out: int = Field(description="Number of connections in use")
+    overflow: int = Field(
+        description="Number of connections currently beyond the pool size")
+    checkouts: int = Field(description="Number of connection checkouts")
+    timeouts: int = Field(
+        description="Number of checkouts that timed out waiting")
+    wait_time_ms: float = Field(
+        description="Total time checkouts waited for a connection")
+    max_wait_time_ms: float = Field(
+        description="Longest time a checkout waited for a connection")
+
+
+class PhaseTimingResponse(BaseModel):
+    route: str = Field(description="Method and path of the API route")
+    phase: str = Field(description="Name of the timed request phase")
+    count: int = Field(description="Number of sampled requests timed")
+    mean_ms: float = Field(description="Mean time spent in the phase")
+    p50_ms: float = Field(
+        description="Median time, as the upper bound of its bucket")
+    p95_ms: float = Field(
+        description="95th percentile, as the upper bound of its bucket")
+    p99_ms: float = Field(
+        description="99th percentile, as the upper bound of its bucket")
+    max_ms: float = Field(description="Longest time spent in the phase")
+    buckets: Dict[str, int] = Field(
+        description=("Number of timings per histogram bucket, keyed by the "
+                     "bucket's upper bound in milliseconds"))
@@ -13,6 +13,18 @@ class PaginatedResponse(BaseModel, Generic[T]):
     results: List[T] = Field(description="The current page of items")
 
 
+class CursorPaginatedResponse(BaseModel, Generic[T]):
+    total: int | None = Field(
+        description=("Total number of items across all pages, null when "
+                     "not requested"))
+    offset: int = Field(description="Number of items skipped")
+    limit: int = Field(description="Maximum number of items per page")
+    next_cursor: str | None = Field(
+        description=("Cursor to request the next page with, null on the "
+                     "last page"))
+    results: List[T] = Field(description="The current page of items")
+
+
 class ListResponse(BaseModel, Generic[T]):
     total: int = Field(description="Total number of items across all pages")
     results: List[T] = Field(description="The current page of items")
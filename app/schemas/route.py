@@ -1,5 +1,9 @@
+from typing import List
+
 from pydantic import BaseModel, Field
 
+from app.schemas.trip import DirectionID, ScheduledStop
+
 
 class RouteResponse(BaseModel):
     id: str = Field(description="Unique identifier for the route")
@@ -11,3 +15,24 @@ class RouteResponse(BaseModel):
         default=None, description="Color of the route in hexadecimal")
     text_color: str | None = Field(
         default=None, description="Text color of the route in hexadecimal")
+
+
+class RouteStopPattern(BaseModel):
+    stop_ids: List[str] = Field(description="Stop IDs in travel order")
+    trips: int = Field(description="Number of trips serving this pattern")
+
+
+class RouteDirectionStops(BaseModel):
+    direction_id: DirectionID = Field(
+        description="Direction of travel (1=inbound, 0=outbound)")
+    stops: List[ScheduledStop] = Field(
+        description="Every stop served in this direction in travel order")
+    patterns: List[RouteStopPattern] = Field(
+        description=("Distinct stop sequences of the route's trips, most "
+                     "trips first"))
+
+
+class RouteStopsResponse(BaseModel):
+    id: str = Field(description="Unique identifier for the route")
+    directions: List[RouteDirectionStops] = Field(
+        description="Stops of the route per direction")
@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+
+
+class ShapeResponse(BaseModel):
+    id: str = Field(description="Unique identifier for the shape")
+    zoom: int | None = Field(
+        description=("Map zoom level the shape was simplified for, null at "
+                     "full resolution"))
+    points: int = Field(description="Number of points in the polyline")
+    polyline: str = Field(
+        description=("Shape points encoded with Google's encoded polyline "
+                     "algorithm format"))
@@ -1,15 +1,14 @@
+from datetime import date, datetime
 from typing import List
 
 from pydantic import BaseModel, Field
 
-from app.schemas.trip import ServiceID
-
 
 class ScheduledTrip(BaseModel):
     id: str = Field(description="Unique identifier for the trip")
     headsign: str = Field(description="Text that appears on head signage")
     route_id: str = Field(description="Route ID the trip takes")
-    service_id: ServiceID = Field(
+    service_id: str = Field(
         description="Service ID referencing the calendar")
 
 
@@ -27,6 +26,15 @@ class StopResponse(BaseModel):
     longitude: float = Field(description="Longitude value of the stop")
 
 
+class NearbyStopResponse(BaseModel):
+    id: str = Field(description="Unique identifier for the stop")
+    name: str = Field(description="Name of the stop")
+    latitude: float = Field(description="Latitude value of the stop")
+    longitude: float = Field(description="Longitude value of the stop")
+    distance: float = Field(
+        description="Great-circle distance to the stop in meters")
+
+
 class StopDetailedResponse(BaseModel):
     id: str = Field(description="Unique identifier for the stop")
     name: str = Field(description="Name of the stop")
@@ -34,3 +42,24 @@ class StopDetailedResponse(BaseModel):
     longitude: float = Field(description="Longitude value of the stop")
     stop_times: List[StopSchedule] = Field(
         description="Scheduled stop times on this stop")
+
+
+class Departure(BaseModel):
+    trip: ScheduledTrip = Field(description="Trip departing from the stop")
+    stop_id: str = Field(description="Stop ID the trip departs from")
+    service_date: date = Field(
+        description="Service day the trip's schedule belongs to")
+    departure_time: str = Field(
+        description=("Departure time relative to the service day. Hours past "
+                     "23 are after midnight (e.g., 25:10:00)"))
+    departs_at: datetime = Field(
+        description="Departure date and time in the transit agency timezone")
+
+
+class StopDeparturesResponse(BaseModel):
+    id: str = Field(description="Unique identifier for the stop")
+    name: str = Field(description="Name of the stop")
+    latitude: float = Field(description="Latitude value of the stop")
+    longitude: float = Field(description="Longitude value of the stop")
+    departures: List[Departure] = Field(
+        description="Next scheduled departures in departure order")
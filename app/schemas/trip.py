@@ -13,12 +13,6 @@ class DirectionID(int, Enum):
     OUTBOUND = 0
 
 
-class ServiceID(str, Enum):
-    SATURDAY = "Saturday"
-    SUNDAY = "Sunday"
-    WEEKDAY = "Weekday"
-
-
 class ScheduledStop(BaseModel):
     id: str = Field(description="Unique identifier for the stop")
     name: str = Field(description="Name of the stop")
@@ -29,15 +23,19 @@ class ScheduledStop(BaseModel):
 class TripSchedule(BaseModel):
     stop: ScheduledStop = Field(description="Stop of this stop time")
     stop_sequence: int = Field(description="Order of stops in the trip")
-    arrival_time: str = Field(description="Arrival time at the stop")
-    departure_time: str = Field(description="Departure time from the stop")
+    arrival_time: str = Field(
+        description=("Arrival time at the stop, empty if the stop has no "
+                     "time"))
+    departure_time: str = Field(
+        description=("Departure time from the stop, empty if the stop has no "
+                     "time"))
 
 
 class TripResponse(BaseModel):
     id: str = Field(description="Unique identifier for the trip")
     headsign: str = Field(description="Text that appears on head signage")
     route_id: str = Field(description="Route ID the trip takes")
-    service_id: ServiceID = Field(
+    service_id: str = Field(
         description="Service ID referencing the calendar")
     direction_id: DirectionID = Field(
         description="Direction of travel (1=inbound, 0=outbound)")
@@ -47,7 +45,7 @@ class TripDetailedResponse(BaseModel):
     id: str = Field(description="Unique identifier for the trip")
     headsign: str = Field(description="Text that appears on head signage")
     route_id: str = Field(description="Route ID the trip takes")
-    service_id: ServiceID = Field(
+    service_id: str = Field(
         description="Service ID referencing the calendar")
     direction_id: DirectionID = Field(
         description="Direction of travel (1=inbound, 0=outbound)")
@@ -0,0 +1,77 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, FrozenSet, Set
+
+from app.db.memory.source import StaticSource
+from app.utils.logger import logger
+
+# calendar_dates exception types
+SERVICE_ADDED = 1
+SERVICE_REMOVED = 2
+
+
+class CalendarService:
+    """
+    CalendarService object that resolves which service IDs are active on a
+    given date. Every date in the feed's validity window is precomputed from
+    the calendar and calendar_dates tables so a lookup is a single dictionary
+    access instead of a join per request.
+    """
+
+    def __init__(self):
+        self._active_services: Dict[date, FrozenSet[str]] = {}
+
+    def load(self, source: StaticSource) -> None:
+        """
+        (Re)build the per-date active service ID sets. The new sets replace
+        the previous ones in a single assignment so concurrent lookups never
+        see a partially built calendar.
+
+        Args:
+            source (StaticSource): Database or snapshot to read the calendars
+                                   from
+        """
+        active_services: Dict[date, Set[str]] = {}
+
+        for calendar in source.calendars():
+            weekdays = (calendar.monday, calendar.tuesday, calendar.wednesday,
+                        calendar.thursday, calendar.friday, calendar.saturday,
+                        calendar.sunday)
+            day = self._parse_date(calendar.start_date)
+            end = self._parse_date(calendar.end_date)
+            while day <= end:
+                if weekdays[day.weekday()]:
+                    active_services.setdefault(day, set()).add(
+                        calendar.service_id)
+                day += timedelta(days=1)
+
+        for calendar_date in source.calendar_dates():
+            day = self._parse_date(calendar_date.date)
+            services = active_services.setdefault(day, set())
+            if calendar_date.exception_type == SERVICE_ADDED:
+                services.add(calendar_date.service_id)
+            elif calendar_date.exception_type == SERVICE_REMOVED:
+                services.discard(calendar_date.service_id)
+
+        self._active_services = {day: frozenset(services)
+                                 for day, services in active_services.items()}
+        logger.info(f"Loaded active services for "
+                    f"{len(self._active_services)} service dates")
+
+    def get_active_service_ids(self, service_date: date) -> FrozenSet[str]:
+        """
+        Get the service IDs running on the given service date.
+
+        Args:
+            service_date (date): Service date to resolve
+
+        Returns:
+            FrozenSet[str]: Active service IDs, empty if the date is outside
+            of the feed's validity window.
+        """
+        return self._active_services.get(service_date, frozenset())
+
+    def _parse_date(self, value: str) -> date:
+        return datetime.strptime(value, "%Y%m%d").date()
+
+
+calendar_service = CalendarService()
@@ -0,0 +1,112 @@
+from typing import List
+
+from sqlmodel import Session
+
+from app.db.memory.route_stops import RouteStopStore, route_stop_store
+from app.db.memory.shapes import ShapeStore, shape_store
+from app.db.memory.source import (DatabaseSource, SnapshotSource,
+                                  StaticSource)
+from app.db.memory.spatial import StopSpatialIndex, stop_spatial_index
+from app.db.memory.store import StaticStore, static_store
+from app.db.memory.timetable import TimetableStore, timetable_store
+from app.db.replicas import ReplicaSet, read_replicas
+from app.db.repositories.dataset_version import DatasetVersionRepository
+from app.db.snapshot import Snapshot
+from app.services.calendar import CalendarService, calendar_service
+from app.services.journey import reachability_cache
+from app.services.response_cache import response_cache
+from app.services.trip import trip_total_cache
+from app.settings import settings
+from app.utils.cache import VersionedCache
+from app.utils.logger import logger
+
+
+class DatasetService:
+    """
+    DatasetService object that follows the version stamp written with every
+    GTFS static dataset change. When the stamp changes, the in-process copies
+    of the static data are reloaded, the read replicas that haven't
+    replicated the new version are taken out of rotation and the versioned
+    caches are invalidated. Any change reloads, so rolling back to the
+    previous dataset is followed like a new one.
+    """
+
+    def __init__(self,
+                 calendar: CalendarService,
+                 store: StaticStore,
+                 timetable: TimetableStore,
+                 spatial_index: StopSpatialIndex,
+                 shapes: ShapeStore,
+                 route_stops: RouteStopStore,
+                 replicas: ReplicaSet,
+                 caches: List[VersionedCache]):
+        self.calendar = calendar
+        self.store = store
+        self.timetable = timetable
+        self.spatial_index = spatial_index
+        self.shapes = shapes
+        self.route_stops = route_stops
+        self.replicas = replicas
+        self.caches = caches
+        self.loaded = False
+        self.version: str | None = None
+
+    def refresh(self, session: Session) -> bool:
+        """
+        Reload the static data if the dataset version changed since the last
+        load.
+
+        Args:
+            session (Session): Database session to read the dataset with,
+                               on the primary so the stamp never goes back
+                               to a version a lagging replica still holds
+
+        Returns:
+            bool: True if the dataset was reloaded, False otherwise
+        """
+        stamp = DatasetVersionRepository(session).get()
+        version = stamp.version if stamp is not None else None
+        if self.loaded and version == self.version:
+            return False
+
+        logger.info(f"Loading GTFS static dataset version '{version}'")
+        source = self._source(session, version)
+        self.calendar.load(source)
+        if settings.static_backend == "memory":
+            self.store.load(source)
+        self.timetable.load(source)
+        self.route_stops.load(source, self.timetable.timetable)
+        self.spatial_index.load(source)
+        self.shapes.load(source)
+        # switch the replicas, then the caches last so nothing cached under
+        # the new version is built from data of the previous one
+        self.replicas.version = version
+        for cache in self.caches:
+            cache.set_version(version)
+        self.version = version
+        self.loaded = True
+        return True
+
+    def _source(self, session: Session, version: str | None) -> StaticSource:
+        """
+        Read the dataset from the columnar snapshot when it holds the same
+        version, from the database otherwise.
+        """
+        if settings.snapshot_path is not None:
+            snapshot = Snapshot.open(settings.snapshot_path, version)
+            if snapshot is not None:
+                logger.info(f"Reading snapshot '{snapshot.directory}'")
+                return SnapshotSource(snapshot)
+        return DatabaseSource(session)
+
+
+dataset_service = DatasetService(calendar_service,
+                                 static_store,
+                                 timetable_store,
+                                 stop_spatial_index,
+                                 shape_store,
+                                 route_stop_store,
+                                 read_replicas,
+                                 [response_cache,
+                                  trip_total_cache,
+                                  reachability_cache])
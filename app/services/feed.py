@@ -1,19 +1,25 @@
 import json
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Tuple
 
 import requests
 from fastapi import status
 from google.protobuf.json_format import MessageToDict
 from google.transit import gtfs_realtime_pb2
+from pydantic import TypeAdapter
 
 from app.exceptions.feed import (FeedEndpointNotFoundError, FeedFetchError,
                                  FeedProcessingError, FeedServiceError,
                                  FeedTimeoutError)
 from app.schemas.feed import (AlertEntity, Entity, EntityType, FeedResponse,
-                              TripUpdateEntity, VehicleEntity)
+                              FeedResponseHeader, TripUpdateEntity,
+                              VehicleEntity)
 from app.settings import settings
 from app.utils.logger import logger
+from app.utils.timing import phase
+
+_entity_adapter = TypeAdapter(Entity)
 
 
 class FeedService:
@@ -44,36 +50,17 @@ class FeedService:
         Returns:
             FeedResponse: Parsed GTFS-RT message for a specific feed.
         """
-        mta_endpoint: str = self._get_endpoint_url(feed=feed)
-        if not mta_endpoint:
-            logger.error(f"No endpoint configuration found for feed: '{feed}'")
-            raise FeedEndpointNotFoundError(
-                f"No endpoint configuration found for feed: '{feed}'")
-
-        logger.info(f"Fetching GTFS-RT feed from endpoint: '{mta_endpoint}'")
-        feed_message = gtfs_realtime_pb2.FeedMessage()
+        feed_message = self._fetch_feed_message(feed)
 
         try:
-            res = requests.get(mta_endpoint, timeout=10)
-            if res.status_code != status.HTTP_200_OK:
-                err_msg = f"[{res.status_code}]: Error fetching GTFS-RT feed"
-                logger.error(err_msg)
-                raise FeedFetchError(err_msg)
-
-            logger.info("Parsing GTFS-RT feed")
-            feed_message.ParseFromString(res.content)
             logger.info("Converting protobuf message to dictionary")
-            feed_dict = MessageToDict(
-                feed_message, preserving_proto_field_name=True)
+            with phase("convert"):
+                feed_dict = MessageToDict(
+                    feed_message, preserving_proto_field_name=True)
+            with phase("validate"):
+                feed_res = FeedResponse(**feed_dict)
             logger.info("Successfully processed GTFS-RT feed")
-            return FeedResponse(**feed_dict)
-
-        except requests.exceptions.Timeout:
-            logger.error("Timeout while fetching GTFS-RT feed")
-            raise FeedTimeoutError("Timeout while fetching GTFS-RT feed")
-
-        except FeedServiceError:
-            raise
+            return feed_res
 
         except Exception as e:
             logger.exception(f"Error processing GTFS-RT feed: {e}")
@@ -92,10 +79,12 @@ class FeedService:
         """
         feed_res: FeedResponse = self.get_feed(feed)
 
-        filtered_entities: List[AlertEntity] = []
-        for entity in feed_res.entity:
-            if self._include_entity(entity=entity, filter_by=EntityType.ALERT):
-                filtered_entities.append(entity)
+        with phase("filter"):
+            filtered_entities: List[AlertEntity] = []
+            for entity in feed_res.entity:
+                if self._include_entity(entity=entity,
+                                        filter_by=EntityType.ALERT):
+                    filtered_entities.append(entity)
         entity_count = len(filtered_entities)
         return (FeedResponse(header=feed_res.header,
                              entity=filtered_entities), entity_count)
@@ -122,14 +111,15 @@ class FeedService:
         """
         feed_res: FeedResponse = self.get_feed(feed)
 
-        filtered_entities: List[TripUpdateEntity] = []
-        for entity in feed_res.entity:
-            if self._include_entity(entity=entity,
-                                    route_id=route_id,
-                                    stop_id=stop_id,
-                                    trip_id=trip_id,
-                                    filter_by=EntityType.TRIP_UPDATE):
-                filtered_entities.append(entity)
+        with phase("filter"):
+            filtered_entities: List[TripUpdateEntity] = []
+            for entity in feed_res.entity:
+                if self._include_entity(entity=entity,
+                                        route_id=route_id,
+                                        stop_id=stop_id,
+                                        trip_id=trip_id,
+                                        filter_by=EntityType.TRIP_UPDATE):
+                    filtered_entities.append(entity)
         entity_count = len(filtered_entities)
         return (FeedResponse(header=feed_res.header,
                              entity=filtered_entities), entity_count)
@@ -156,14 +146,15 @@ class FeedService:
         """
         feed_res: FeedResponse = self.get_feed(feed)
 
-        filtered_entities: List[VehicleEntity] = []
-        for entity in feed_res.entity:
-            if self._include_entity(entity=entity,
-                                    route_id=route_id,
-                                    stop_id=stop_id,
-                                    trip_id=trip_id,
-                                    filter_by=EntityType.VEHICLE):
-                filtered_entities.append(entity)
+        with phase("filter"):
+            filtered_entities: List[VehicleEntity] = []
+            for entity in feed_res.entity:
+                if self._include_entity(entity=entity,
+                                        route_id=route_id,
+                                        stop_id=stop_id,
+                                        trip_id=trip_id,
+                                        filter_by=EntityType.VEHICLE):
+                    filtered_entities.append(entity)
         entity_count = len(filtered_entities)
         return (FeedResponse(header=feed_res.header,
                              entity=filtered_entities), entity_count)
@@ -194,14 +185,15 @@ class FeedService:
         """
         feed_res: FeedResponse = self.get_feed(feed)
 
-        filtered_entities: List[Entity] = []
-        for entity in feed_res.entity:
-            if self._include_entity(entity=entity,
-                                    route_id=route_id,
-                                    stop_id=stop_id,
-                                    trip_id=trip_id,
-                                    filter_by=entity_type):
-                filtered_entities.append(entity)
+        with phase("filter"):
+            filtered_entities: List[Entity] = []
+            for entity in feed_res.entity:
+                if self._include_entity(entity=entity,
+                                        route_id=route_id,
+                                        stop_id=stop_id,
+                                        trip_id=trip_id,
+                                        filter_by=entity_type):
+                    filtered_entities.append(entity)
 
         # apply pagination to filtered_entities
         entity_count = len(filtered_entities)
@@ -211,6 +203,112 @@ class FeedService:
                                     entity=filtered_entities)
         return filtered_res, entity_count
 
+    def stream_all_feed(
+            self,
+            feed: str,
+            entity_type: EntityType | None = None,
+            route_id: str | None = None,
+            stop_id: str | None = None,
+            trip_id: str | None = None,
+            offset: int = 0,
+            limit: int = 1000) -> Tuple[FeedResponseHeader, Iterator[Entity]]:
+        """
+        Get real-time paginated data from MTA's GTFS-RT API for the specified
+        feed without converting the whole feed up front. The feed is fetched
+        and parsed right away; its entities are converted and filtered one at
+        a time as the returned iterator is consumed.
+
+        Args:
+            feed (str): Feed identifier
+            entity_type (EntityType | None): Entity type to filter by
+            route_id (str | None): Route ID to filter by
+            stop_id (str | None): Stop ID to filter by
+            trip_id (str | None): Trip ID to filter by
+            offset (int): Number of items to skip
+            limit (int): Maximum number of items to return
+
+        Raises:
+            FeedEndpointNotFoundError: Feed endpoint configuration is missing
+            FeedFetchError: Error fetching feed from MTA API
+            FeedTimeoutError: Request to MTA API timed out
+            FeedProcessingError: Error processing the feed data
+
+        Returns:
+            Tuple[FeedResponseHeader, Iterator[Entity]]: Tuple of the feed
+            header and an iterator of the page of filtered entities
+        """
+        feed_message = self._fetch_feed_message(feed)
+
+        try:
+            header = FeedResponseHeader(**MessageToDict(
+                feed_message.header, preserving_proto_field_name=True))
+        except Exception as e:
+            logger.exception(f"Error processing GTFS-RT feed: {e}")
+            raise FeedProcessingError(f"Error processing GTFS-RT feed: {e}")
+
+        def entities() -> Iterator[Entity]:
+            for entity_message in feed_message.entity:
+                entity = _entity_adapter.validate_python(MessageToDict(
+                    entity_message, preserving_proto_field_name=True))
+                if self._include_entity(entity=entity,
+                                        route_id=route_id,
+                                        stop_id=stop_id,
+                                        trip_id=trip_id,
+                                        filter_by=entity_type):
+                    yield entity
+
+        return header, islice(entities(), offset, offset + limit)
+
+    def _fetch_feed_message(
+            self, feed: str) -> gtfs_realtime_pb2.FeedMessage:
+        """
+        Fetch and parse the protobuf message of a feed from MTA's GTFS-RT API.
+
+        Args:
+            feed (str): MTA real time service to request
+
+        Raises:
+            FeedEndpointNotFoundError: Feed endpoint configuration is missing
+            FeedFetchError: Error fetching feed from MTA API
+            FeedTimeoutError: Request to MTA API timed out
+            FeedProcessingError: Error parsing the feed data
+
+        Returns:
+            gtfs_realtime_pb2.FeedMessage: The parsed feed message
+        """
+        mta_endpoint: str = self._get_endpoint_url(feed=feed)
+        if not mta_endpoint:
+            logger.error(f"No endpoint configuration found for feed: '{feed}'")
+            raise FeedEndpointNotFoundError(
+                f"No endpoint configuration found for feed: '{feed}'")
+
+        logger.info(f"Fetching GTFS-RT feed from endpoint: '{mta_endpoint}'")
+        feed_message = gtfs_realtime_pb2.FeedMessage()
+
+        try:
+            with phase("fetch"):
+                res = requests.get(mta_endpoint, timeout=10)
+            if res.status_code != status.HTTP_200_OK:
+                err_msg = f"[{res.status_code}]: Error fetching GTFS-RT feed"
+                logger.error(err_msg)
+                raise FeedFetchError(err_msg)
+
+            logger.info("Parsing GTFS-RT feed")
+            with phase("parse"):
+                feed_message.ParseFromString(res.content)
+            return feed_message
+
+        except requests.exceptions.Timeout:
+            logger.error("Timeout while fetching GTFS-RT feed")
+            raise FeedTimeoutError("Timeout while fetching GTFS-RT feed")
+
+        except FeedServiceError:
+            raise
+
+        except Exception as e:
+            logger.exception(f"Error processing GTFS-RT feed: {e}")
+            raise FeedProcessingError(f"Error processing GTFS-RT feed: {e}")
+
     def _include_entity(
             self,
             entity: Entity,
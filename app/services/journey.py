@@ -0,0 +1,554 @@
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, FrozenSet, List, Tuple
+from zoneinfo import ZoneInfo
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.db.memory.timetable import Timetable, TimetableStore
+from app.db.models.gtfs import Stop
+from app.exceptions.base import QueryInvalidError, ResourceNotFoundError
+from app.schemas.journey import (Journey, JourneyLeg, JourneysResponse,
+                                 LegMode, ReachabilityResponse,
+                                 ReachableStop)
+from app.schemas.stop import ScheduledTrip
+from app.schemas.trip import ScheduledStop
+from app.services.calendar import CalendarService
+from app.services.stop import SECONDS_PER_DAY
+from app.settings import settings
+from app.utils.cache import VersionedCache
+from app.utils.helpers import localize
+
+# arrival and boarding time of stations not reached yet
+UNREACHED = float("inf")
+
+
+@dataclass(frozen=True)
+class PlannedLeg:
+    mode: LegMode
+    origin_stop_id: str
+    destination_stop_id: str
+    # seconds relative to the service day the search started on
+    departure: int
+    arrival: int
+    trip_id: str | None = None
+
+
+@dataclass(frozen=True)
+class PlannedJourney:
+    legs: Tuple[PlannedLeg, ...]
+
+    @property
+    def departure(self) -> int:
+        return self.legs[0].departure
+
+    @property
+    def arrival(self) -> int:
+        return self.legs[-1].arrival
+
+    @property
+    def transfers(self) -> int:
+        rides = sum(leg.mode == LegMode.TRANSIT for leg in self.legs)
+        return max(rides - 1, 0)
+
+
+def _earliest_trip(departures: array,
+                   board: int,
+                   runs_today: bool,
+                   runs_yesterday: bool) -> Tuple[int, int]:
+    """
+    Earliest trip of a pattern departing a stop at or after board, as the
+    trip index and the offset of its service day in seconds. Trips of the
+    previous service day run 24 hours earlier. Returns (-1, 0) if there is
+    none.
+    """
+    trip, offset = -1, 0
+    if runs_today:
+        i = bisect_left(departures, board)
+        if i < len(departures):
+            trip = i
+    if runs_yesterday:
+        i = bisect_left(departures, board + SECONDS_PER_DAY)
+        if i < len(departures) and (
+                trip < 0
+                or departures[i] - SECONDS_PER_DAY < departures[trip]):
+            trip, offset = i, -SECONDS_PER_DAY
+    return trip, offset
+
+
+class _RaptorSearch:
+    """
+    Labels of a RAPTOR search from one origin. Every round rides one more
+    trip from the stations improved in the previous round, then changes
+    trains within stations and walks to other stations.
+    """
+
+    def __init__(self,
+                 timetable: Timetable,
+                 today: FrozenSet[str],
+                 yesterday: FrozenSet[str],
+                 origin: int,
+                 seconds: int):
+        self.timetable = timetable
+        self.today = today
+        self.yesterday = yesterday
+
+        stations = len(timetable.stations)
+        # earliest arrival by trip at each station over all rounds. Walking
+        # arrivals are kept out: footpaths aren't chained, so a later trip
+        # arrival can still be the only way to walk on to another station
+        self.best = [UNREACHED] * stations
+        # earliest time a trip can be boarded at each station and the round
+        # it was reached in
+        self.boarding = [UNREACHED] * stations
+        self.boarding_round = [0] * stations
+        # per round, station -> how its boarding time was reached: None
+        # after riding a trip there (or at the origin), (station, seconds)
+        # after walking from another station
+        self.sources: List[Dict[int, Tuple[int, int] | None]] = [
+            {origin: None}]
+        # per round, station -> trip ridden there as (pattern, trip, day
+        # offset, boarding position, alighting position, boarding round)
+        self.rides: List[Dict[int, Tuple[int, int, int, int, int, int]]] = [
+            {}]
+
+        self.boarding[origin] = seconds
+        self.marked = {origin}
+        for station, walk in timetable.footpaths[origin]:
+            if seconds + walk < self.boarding[station]:
+                self.boarding[station] = seconds + walk
+                self.sources[0][station] = (origin, walk)
+                self.marked.add(station)
+
+    @property
+    def round(self) -> int:
+        return len(self.rides) - 1
+
+    def arrival(self, k: int, station: int) -> int:
+        """
+        Arrival time of the trip ridden to a station in round k.
+        """
+        p, trip, offset, _, position, _ = self.rides[k][station]
+        return self.timetable.patterns[p].arrivals[position][trip] + offset
+
+    def scan(self, bound: float) -> Dict[int, tuple]:
+        """
+        Run the next round's pattern scan, keeping only arrivals earlier than
+        bound.
+
+        Returns:
+            Dict[int, tuple]: Stations reached earlier than before by trip,
+            and the ride reaching them
+        """
+        patterns = self.timetable.patterns
+        best = self.best
+        boarding = self.boarding
+
+        # earliest marked stop position of every pattern to scan
+        queue: Dict[int, int] = {}
+        for station in self.marked:
+            for p, position in self.timetable.station_patterns[station]:
+                start = queue.get(p)
+                if start is None or position < start:
+                    queue[p] = position
+
+        ride: Dict[int, Tuple[int, int, int, int, int, int]] = {}
+        for p, start in queue.items():
+            pattern = patterns[p]
+            runs_today = pattern.service_id in self.today
+            runs_yesterday = pattern.service_id in self.yesterday
+            if not runs_today and not runs_yesterday:
+                continue
+
+            stations = pattern.stations
+            arrivals = pattern.arrivals
+            departures = pattern.departures
+            trip, offset, board_position, board_round = -1, 0, 0, 0
+            for position in range(start, len(stations)):
+                station = stations[position]
+                if trip >= 0:
+                    arrival = arrivals[position][trip] + offset
+                    if arrival < best[station] and arrival < bound:
+                        best[station] = arrival
+                        ride[station] = (p, trip, offset, board_position,
+                                         position, board_round)
+
+                # catch an earlier trip if this stop was reached in time
+                board = boarding[station]
+                if board >= bound or (
+                        trip >= 0
+                        and departures[position][trip] + offset < board):
+                    continue
+                candidate, candidate_offset = _earliest_trip(
+                    departures[position], board, runs_today, runs_yesterday)
+                if candidate >= 0 and (
+                        trip < 0
+                        or departures[position][candidate] + candidate_offset
+                        < departures[position][trip] + offset):
+                    trip, offset = candidate, candidate_offset
+                    board_position = position
+                    board_round = self.boarding_round[station]
+
+        self.rides.append(ride)
+        return ride
+
+    def transfer(self) -> None:
+        """
+        Change trains within the stations reached in this round and walk to
+        other stations, marking the stations to scan from next round.
+        """
+        k = self.round
+        ride = self.rides[k]
+        boarding = self.boarding
+        source: Dict[int, Tuple[int, int] | None] = {}
+        self.sources.append(source)
+        self.marked = set()
+        for station in ride:
+            board = self.arrival(k, station) + self.timetable.change_seconds[
+                station]
+            if board < boarding[station]:
+                boarding[station] = board
+                self.boarding_round[station] = k
+                source[station] = None
+                self.marked.add(station)
+        for station in ride:
+            arrival = self.arrival(k, station)
+            for other, walk in self.timetable.footpaths[station]:
+                if arrival + walk < boarding[other]:
+                    boarding[other] = arrival + walk
+                    self.boarding_round[other] = k
+                    source[other] = (station, walk)
+                    self.marked.add(other)
+
+
+class JourneyService:
+    """
+    JourneyService object that plans journeys between two stations with the
+    RAPTOR algorithm (Round-bAsed Public Transit Optimized Router) over the
+    in-memory timetable. Round k finds the earliest arrivals using k trips,
+    so the journeys found in every round form the Pareto set of arrival time
+    and number of transfers.
+    """
+
+    def __init__(self,
+                 store: TimetableStore,
+                 calendar: CalendarService,
+                 reachability_cache: VersionedCache):
+        self.store = store
+        self.calendar = calendar
+        self.reachability_cache = reachability_cache
+
+    async def plan(self,
+                   from_stop_id: str,
+                   to_stop_id: str,
+                   depart_at: datetime | None = None,
+                   max_transfers: int = 3) -> JourneysResponse:
+        timetable = self.store.timetable
+        origin = timetable.station_of(from_stop_id)
+        if origin is None:
+            raise ResourceNotFoundError(
+                f"Stop with ID '{from_stop_id}' not found")
+        target = timetable.station_of(to_stop_id)
+        if target is None:
+            raise ResourceNotFoundError(
+                f"Stop with ID '{to_stop_id}' not found")
+        if origin == target:
+            raise QueryInvalidError(
+                "Origin and destination must be different stations")
+
+        timezone = ZoneInfo(settings.gtfs_timezone)
+        depart_at = localize(depart_at, timezone)
+        service_date = depart_at.date()
+        seconds = (depart_at.hour * 3600 + depart_at.minute * 60
+                   + depart_at.second)
+
+        # the search is CPU bound; run it off the event loop serving the
+        # other requests
+        journeys = await run_in_threadpool(self.search,
+                                           origin,
+                                           target,
+                                           service_date,
+                                           seconds,
+                                           max_transfers)
+
+        midnight = datetime.combine(service_date, time(), tzinfo=timezone)
+
+        def at(seconds: int) -> datetime:
+            return midnight + timedelta(seconds=seconds)
+
+        results = []
+        for journey in journeys:
+            legs = []
+            for leg in journey.legs:
+                trip_res = None
+                if leg.trip_id is not None:
+                    trip = timetable.trips_by_id[leg.trip_id]
+                    trip_res = ScheduledTrip(id=trip.trip_id,
+                                             headsign=trip.trip_headsign,
+                                             route_id=trip.route_id,
+                                             service_id=trip.service_id)
+                legs.append(JourneyLeg(
+                    mode=leg.mode,
+                    origin=self._responsify(
+                        timetable.stops_by_id[leg.origin_stop_id]),
+                    destination=self._responsify(
+                        timetable.stops_by_id[leg.destination_stop_id]),
+                    departs_at=at(leg.departure),
+                    arrives_at=at(leg.arrival),
+                    trip=trip_res))
+            results.append(Journey(departs_at=at(journey.departure),
+                                   arrives_at=at(journey.arrival),
+                                   duration=journey.arrival - seconds,
+                                   transfers=journey.transfers,
+                                   legs=legs))
+
+        return JourneysResponse(
+            origin=self._responsify(timetable.stations[origin]),
+            destination=self._responsify(timetable.stations[target]),
+            depart_at=depart_at,
+            journeys=results)
+
+    async def get_reachable(
+            self,
+            from_stop_id: str,
+            depart_at: datetime | None = None,
+            max_minutes: int | None = None,
+            max_transfers: int = 3) -> ReachabilityResponse:
+        timetable = self.store.timetable
+        origin = timetable.station_of(from_stop_id)
+        if origin is None:
+            raise ResourceNotFoundError(
+                f"Stop with ID '{from_stop_id}' not found")
+
+        # departures are rounded down to the start of their time bucket so
+        # nearby departure times share a cached search
+        timezone = ZoneInfo(settings.gtfs_timezone)
+        depart_at = localize(depart_at, timezone)
+        service_date = depart_at.date()
+        seconds = (depart_at.hour * 3600 + depart_at.minute * 60
+                   + depart_at.second)
+        bucket = settings.reachability_bucket_seconds
+        seconds -= seconds % bucket
+
+        version = self.reachability_cache.version
+        key = (origin, service_date, seconds, max_minutes, max_transfers)
+        arrivals = self.reachability_cache.get(key, version)
+        if arrivals is None:
+            # CPU bound like the journey search; keep it off the event loop
+            arrivals = await run_in_threadpool(
+                self.reachable,
+                origin,
+                service_date,
+                seconds,
+                max_minutes * 60 if max_minutes is not None else None,
+                max_transfers)
+            self.reachability_cache.set(key, arrivals, version)
+
+        midnight = datetime.combine(service_date, time(), tzinfo=timezone)
+        stops = [ReachableStop(
+                     stop=self._responsify(timetable.stations[station]),
+                     arrives_at=midnight + timedelta(seconds=arrival),
+                     duration=arrival - seconds)
+                 for station, arrival in arrivals]
+
+        return ReachabilityResponse(
+            origin=self._responsify(timetable.stations[origin]),
+            depart_at=midnight + timedelta(seconds=seconds),
+            max_minutes=max_minutes,
+            stops=stops)
+
+    def search(self,
+               origin: int,
+               target: int,
+               service_date: date,
+               seconds: int,
+               max_transfers: int) -> List[PlannedJourney]:
+        """
+        Find the Pareto-optimal journeys between two stations departing at or
+        after the given time, using at most max_transfers + 1 trips.
+
+        Args:
+            origin (int): Station index to depart from
+            target (int): Station index to arrive at
+            service_date (date): Service day the departure time belongs to
+            seconds (int): Departure time in seconds since the start of the
+                service day
+            max_transfers (int): Maximum number of changes between trips
+
+        Returns:
+            List[PlannedJourney]: Journeys ordered by number of transfers, each
+            arriving earlier than the ones before it
+        """
+        raptor = self._raptor(origin, service_date, seconds)
+        footpaths = raptor.timetable.footpaths
+
+        journeys: List[PlannedJourney] = []
+        best_target = UNREACHED
+        if target in raptor.sources[0]:
+            best_target = raptor.boarding[target]
+            journeys.append(self._journey(raptor, 0, target, None, seconds))
+            raptor.marked.discard(target)
+
+        for k in range(1, max_transfers + 2):
+            if not raptor.marked:
+                break
+
+            ride = raptor.scan(best_target)
+            target_walk = None
+            reached_target = target in ride
+            if reached_target:
+                best_target = raptor.best[target]
+            for station in ride:
+                arrival = raptor.arrival(k, station)
+                for other, walk in footpaths[station]:
+                    if other == target and arrival + walk < best_target:
+                        best_target = arrival + walk
+                        target_walk = (station, walk)
+                        reached_target = True
+            raptor.transfer()
+
+            if reached_target:
+                journeys.append(
+                    self._journey(raptor, k, target, target_walk, seconds))
+            raptor.marked.discard(target)
+
+        # a later round can reach the target with fewer trips than it allows;
+        # keep only journeys no other journey beats on both criteria
+        pareto: List[PlannedJourney] = []
+        for journey in sorted(journeys,
+                              key=lambda journey: (journey.transfers,
+                                                   journey.arrival)):
+            if not pareto or journey.arrival < pareto[-1].arrival:
+                pareto.append(journey)
+        return pareto
+
+    def reachable(self,
+                  origin: int,
+                  service_date: date,
+                  seconds: int,
+                  max_duration: int | None,
+                  max_transfers: int) -> Tuple[Tuple[int, int], ...]:
+        """
+        Find the earliest arrival at every station reachable from a station
+        in a single one-to-all search.
+
+        Args:
+            origin (int): Station index to depart from
+            service_date (date): Service day the departure time belongs to
+            seconds (int): Departure time in seconds since the start of the
+                service day
+            max_duration (int | None): Maximum travel time in seconds, None
+                for no limit
+            max_transfers (int): Maximum number of changes between trips
+
+        Returns:
+            Tuple[Tuple[int, int], ...]: (station index, arrival seconds)
+            pairs in arrival order, starting with the origin
+        """
+        raptor = self._raptor(origin, service_date, seconds)
+        footpaths = raptor.timetable.footpaths
+        limit = UNREACHED if max_duration is None else seconds + max_duration
+
+        arrivals = {station: raptor.boarding[station]
+                    for station in raptor.sources[0]}
+        for k in range(1, max_transfers + 2):
+            if not raptor.marked:
+                break
+
+            ride = raptor.scan(limit + 1)
+            for station in ride:
+                arrival = raptor.arrival(k, station)
+                if arrival < arrivals.get(station, UNREACHED):
+                    arrivals[station] = arrival
+                for other, walk in footpaths[station]:
+                    if arrival + walk < arrivals.get(other, UNREACHED):
+                        arrivals[other] = arrival + walk
+            raptor.transfer()
+
+        return tuple(sorted(((station, arrival)
+                             for station, arrival in arrivals.items()
+                             if arrival <= limit),
+                            key=lambda item: (item[1], item[0])))
+
+    def _raptor(self,
+                origin: int,
+                service_date: date,
+                seconds: int) -> _RaptorSearch:
+        return _RaptorSearch(
+            self.store.timetable,
+            self.calendar.get_active_service_ids(service_date),
+            self.calendar.get_active_service_ids(
+                service_date - timedelta(days=1)),
+            origin,
+            seconds)
+
+    def _journey(self,
+                 raptor: _RaptorSearch,
+                 k: int,
+                 target: int,
+                 target_walk: Tuple[int, int] | None,
+                 seconds: int) -> PlannedJourney:
+        """
+        Trace the journey reaching the target in round k back to the origin.
+        """
+        timetable = raptor.timetable
+
+        def walk_leg(k: int, origin: int, destination: int,
+                     walk: int) -> PlannedLeg:
+            departure = seconds if k == 0 else raptor.arrival(k, origin)
+            return PlannedLeg(
+                mode=LegMode.WALK,
+                origin_stop_id=timetable.stations[origin].stop_id,
+                destination_stop_id=timetable.stations[destination].stop_id,
+                departure=departure,
+                arrival=departure + walk)
+
+        legs = []
+        station = target
+        if k == 0:
+            origin, walk = raptor.sources[0][target]
+            legs.append(walk_leg(0, origin, target, walk))
+            return PlannedJourney(tuple(legs))
+        if target_walk is not None:
+            station, walk = target_walk
+            legs.append(walk_leg(k, station, target, walk))
+
+        while True:
+            p, trip, offset, board_position, alight_position, board_round = (
+                raptor.rides[k][station])
+            pattern = timetable.patterns[p]
+            legs.append(PlannedLeg(
+                mode=LegMode.TRANSIT,
+                origin_stop_id=pattern.stop_ids[board_position],
+                destination_stop_id=pattern.stop_ids[alight_position],
+                departure=pattern.departures[board_position][trip] + offset,
+                arrival=pattern.arrivals[alight_position][trip] + offset,
+                trip_id=pattern.trip_ids[trip]))
+
+            k = board_round
+            station = pattern.stations[board_position]
+            source = raptor.sources[k][station]
+            if source is not None:
+                walked_from, walk = source
+                legs.append(walk_leg(k, walked_from, station, walk))
+                station = walked_from
+            if k == 0:
+                break
+
+        legs.reverse()
+        return PlannedJourney(tuple(legs))
+
+    def _responsify(self, stop: Stop) -> ScheduledStop:
+        return ScheduledStop(id=stop.stop_id,
+                             name=stop.stop_name,
+                             latitude=stop.stop_lat,
+                             longitude=stop.stop_lon)
+
+
+# one-to-all searches per origin, departure time bucket and service date,
+# kept until the dataset version changes
+reachability_cache = VersionedCache(
+    maxsize=settings.reachability_cache_size,
+    ttl=float("inf"))
@@ -0,0 +1,64 @@
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from app.settings import settings
+from app.utils.cache import VersionedCache
+from app.utils.timing import phase
+
+
+@lru_cache
+def _adapter(response_model: Any) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+
+class ResponseCache(VersionedCache):
+    """
+    ResponseCache object that keeps serialized JSON bodies of static GTFS
+    responses. Entries are keyed by the dataset version, the endpoint path and
+    the sorted query parameters, so setting a new dataset version invalidates
+    every cached response at once.
+    """
+
+    async def respond(self,
+                      request: Request,
+                      response_model: Any,
+                      produce: Callable[[], Awaitable[Any]],
+                      headers: Dict[str, str] | None = None) -> Response:
+        """
+        Serve the cached response of a request, producing, serializing and
+        caching it on a miss. Errors raised by produce are not cached.
+
+        Args:
+            request (Request): The incoming request
+            response_model (Any): Response model type to serialize with
+            produce (Callable[[], Awaitable[Any]]): Builds the response
+                                                    content
+            headers (Dict[str, str] | None): Extra response headers
+
+        Returns:
+            Response: JSON response with the serialized body
+        """
+        version = self.version
+        key = (request.url.path,
+               tuple(sorted(request.query_params.multi_items())))
+        body = self.get(key, version)
+        cache_status = "HIT"
+        if body is None:
+            content = await produce()
+            with phase("encode"):
+                body = _adapter(response_model).dump_json(content,
+                                                          by_alias=True)
+            self.set(key, body, version)
+            cache_status = "MISS"
+
+        return Response(content=body,
+                        media_type="application/json",
+                        headers={"X-Cache": cache_status,
+                                 **(headers or {})})
+
+
+response_cache = ResponseCache(maxsize=settings.response_cache_size,
+                               ttl=settings.response_cache_ttl)
@@ -1,31 +1,77 @@
-from typing import List
-
-from sqlmodel import Session
+from typing import AsyncIterator, List
 
+from app.db.memory.route_stops import RouteStopStore
+from app.db.memory.timetable import TimetableStore
 from app.db.models.gtfs import Route
-from app.db.repositories.route import RouteRepository
+from app.db.repositories.route import AsyncRouteRepository
 from app.exceptions.base import ResourceNotFoundError
-from app.schemas.route import RouteResponse
+from app.schemas.batch import BatchResponse
+from app.schemas.route import (RouteDirectionStops, RouteResponse,
+                               RouteStopPattern, RouteStopsResponse)
+from app.schemas.trip import ScheduledStop
 
 
 class RouteService:
-    def __init__(self, session: Session):
-        self.session = session
-        self.repository = RouteRepository(session)
+    def __init__(self,
+                 repository: AsyncRouteRepository,
+                 route_stops: RouteStopStore,
+                 timetable: TimetableStore):
+        self.repository = repository
+        self.route_stops = route_stops
+        self.timetable = timetable
 
-    def get_by_id(self, route_id: str) -> RouteResponse:
-        route = self.repository.get_by_id(route_id)
+    async def get_by_id(self, route_id: str) -> RouteResponse:
+        route = await self.repository.get_by_id(route_id)
         if not route:
             raise ResourceNotFoundError(
                 f"Route with ID '{route_id}' not found")
 
         return self._responsify(route)
 
-    def get_all(self) -> List[RouteResponse]:
-        routes = self.repository.get_all()
+    async def get_all(self) -> List[RouteResponse]:
+        routes = await self.repository.get_all()
         results = [self._responsify(route) for route in routes]
         return results
 
+    async def stream_all(self) -> AsyncIterator[RouteResponse]:
+        async for route in self.repository.stream_all():
+            yield self._responsify(route)
+
+    async def get_many(self,
+                       route_ids: List[str]) -> BatchResponse[RouteResponse]:
+        # duplicates are looked up once; results keep the request order
+        route_ids = list(dict.fromkeys(route_ids))
+        routes = {route.route_id: route
+                  for route in await self.repository.get_all_by_ids(route_ids)}
+        return BatchResponse[RouteResponse](
+            results={route_id: self._responsify(routes[route_id])
+                     for route_id in route_ids if route_id in routes},
+            missing=[route_id for route_id in route_ids
+                     if route_id not in routes])
+
+    async def get_stops(self, route_id: str) -> RouteStopsResponse:
+        directions = self.route_stops.stop_lists.routes.get(route_id)
+        if directions is None:
+            raise ResourceNotFoundError(
+                f"Route with ID '{route_id}' not found")
+
+        stops_by_id = self.timetable.timetable.stops_by_id
+        results = []
+        for direction in directions:
+            stops = [stops_by_id[stop_id] for stop_id in direction.stop_ids]
+            results.append(RouteDirectionStops(
+                direction_id=direction.direction_id,
+                stops=[ScheduledStop(id=stop.stop_id,
+                                     name=stop.stop_name,
+                                     latitude=stop.stop_lat,
+                                     longitude=stop.stop_lon)
+                       for stop in stops],
+                patterns=[RouteStopPattern(stop_ids=list(pattern.stop_ids),
+                                           trips=pattern.trips)
+                          for pattern in direction.patterns]))
+
+        return RouteStopsResponse(id=route_id, directions=results)
+
     def _responsify(self, route: Route) -> RouteResponse:
         return RouteResponse(id=route.route_id,
                              short_name=route.route_short_name,
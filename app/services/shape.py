@@ -0,0 +1,43 @@
+from typing import List
+
+from app.db.memory.shapes import EncodedShape, ShapeStore
+from app.exceptions.base import ResourceNotFoundError
+from app.schemas.shape import ShapeResponse
+
+
+class ShapeService:
+    def __init__(self, store: ShapeStore):
+        self.store = store
+
+    async def get_by_route_id(self,
+                              route_id: str,
+                              zoom: int | None = None) -> List[ShapeResponse]:
+        shapes = self.store.shapes
+        shape_ids = shapes.route_shapes.get(route_id)
+        if shape_ids is None:
+            raise ResourceNotFoundError(
+                f"Route with ID '{route_id}' not found")
+
+        return [self._responsify(shapes.get(shape_id, zoom))
+                for shape_id in shape_ids]
+
+    async def get_by_trip_id(self,
+                             trip_id: str,
+                             zoom: int | None = None) -> ShapeResponse:
+        shapes = self.store.shapes
+        if trip_id not in shapes.trip_shapes:
+            raise ResourceNotFoundError(f"Trip with ID '{trip_id}' not found")
+
+        shape_id = shapes.trip_shapes[trip_id]
+        shape = shapes.get(shape_id, zoom) if shape_id is not None else None
+        if shape is None:
+            raise ResourceNotFoundError(
+                f"Trip with ID '{trip_id}' has no shape")
+
+        return self._responsify(shape)
+
+    def _responsify(self, shape: EncodedShape) -> ShapeResponse:
+        return ShapeResponse(id=shape.shape_id,
+                             zoom=shape.zoom,
+                             points=shape.points,
+                             polyline=shape.polyline)
@@ -1,30 +1,45 @@
-from typing import List
+from datetime import date, datetime, time, timedelta
+from typing import AsyncIterator, List
+from zoneinfo import ZoneInfo
 
-from sqlmodel import Session
-
-from app.db.models.gtfs import Stop
-from app.db.repositories.stop import StopRepository
-from app.db.repositories.stop_time import StopTimeRepository
+from app.db.memory.spatial import StopSpatialIndex
+from app.db.models.gtfs import Stop, StopTime
+from app.db.repositories.stop import AsyncStopRepository
+from app.db.repositories.stop_schedule import AsyncStopScheduleRepository
+from app.db.repositories.stop_time import AsyncStopTimeRepository
 from app.exceptions.base import QueryInvalidError, ResourceNotFoundError
-from app.schemas.stop import (ScheduledTrip, StopDetailedResponse,
+from app.schemas.batch import BatchResponse
+from app.schemas.stop import (Departure, NearbyStopResponse, ScheduledTrip,
+                              StopDeparturesResponse, StopDetailedResponse,
                               StopResponse, StopSchedule)
-from app.schemas.trip import ServiceID
-from app.utils.helpers import valid_time_format
+from app.services.calendar import CalendarService
+from app.settings import settings
+from app.utils.helpers import (localize, seconds_to_time, time_to_seconds,
+                               valid_time_format)
+
+SECONDS_PER_DAY = 24 * 3600
 
 
 class StopService:
-    def __init__(self, session: Session):
-        self.session = session
-        self.stop_repo = StopRepository(session)
-        self.stop_time_repo = StopTimeRepository(session)
-
-    def get_by_id(self,
-                  stop_id: str,
-                  route_id: str | None = None,
-                  service_id: str | None = None,
-                  arrival_time: str | None = None,
-                  departure_time: str | None = None) -> StopResponse:
-        stop = self.stop_repo.get_by_id(stop_id)
+    def __init__(self,
+                 stop_repo: AsyncStopRepository,
+                 stop_time_repo: AsyncStopTimeRepository,
+                 stop_schedule_repo: AsyncStopScheduleRepository,
+                 calendar: CalendarService,
+                 spatial_index: StopSpatialIndex):
+        self.stop_repo = stop_repo
+        self.stop_time_repo = stop_time_repo
+        self.stop_schedule_repo = stop_schedule_repo
+        self.calendar = calendar
+        self.spatial_index = spatial_index
+
+    async def get_by_id(self,
+                        stop_id: str,
+                        route_id: str | None = None,
+                        service_date: date | None = None,
+                        arrival_time: str | None = None,
+                        departure_time: str | None = None) -> StopResponse:
+        stop = await self.stop_repo.get_by_id(stop_id)
         if not stop:
             raise ResourceNotFoundError(f"Stop with ID '{stop_id}' not found")
 
@@ -38,47 +53,147 @@ class StopService:
             raise QueryInvalidError(
                 "departure_time must be in HH:MM:SS format (e.g., 13:22:15)")
 
-        return self._detailed_responsify(stop,
-                                         route_id,
-                                         service_id,
-                                         arrival_time,
-                                         departure_time)
+        return await self._detailed_responsify(stop,
+                                               route_id,
+                                               service_date,
+                                               arrival_time,
+                                               departure_time)
 
-    def get_all(self, direction_id: int | None = None) -> List[StopResponse]:
-        stops = self.stop_repo.get_all(direction_id=direction_id)
+    async def get_all(self,
+                      direction_id: int | None = None) -> List[StopResponse]:
+        stops = await self.stop_repo.get_all(direction_id=direction_id)
         return [self._responsify(stop) for stop in stops]
 
+    async def stream_all(
+            self,
+            direction_id: int | None = None) -> AsyncIterator[StopResponse]:
+        async for stop in self.stop_repo.stream_all(direction_id=direction_id):
+            yield self._responsify(stop)
+
+    async def get_many(self,
+                       stop_ids: List[str]) -> BatchResponse[StopResponse]:
+        # duplicates are looked up once; results keep the request order
+        stop_ids = list(dict.fromkeys(stop_ids))
+        stops = {stop.stop_id: stop
+                 for stop in await self.stop_repo.get_all_by_ids(stop_ids)}
+        return BatchResponse[StopResponse](
+            results={stop_id: self._responsify(stops[stop_id])
+                     for stop_id in stop_ids if stop_id in stops},
+            missing=[stop_id for stop_id in stop_ids
+                     if stop_id not in stops])
+
+    async def get_nearby(self,
+                         lat: float,
+                         lon: float,
+                         radius: float = 500,
+                         limit: int = 20,
+                         stations: bool = False) -> List[NearbyStopResponse]:
+        nearby = self.spatial_index.nearby(lat, lon, radius, limit, stations)
+        return [NearbyStopResponse(id=stop.stop_id,
+                                   name=stop.stop_name,
+                                   latitude=stop.stop_lat,
+                                   longitude=stop.stop_lon,
+                                   distance=round(distance, 1))
+                for stop, distance in nearby]
+
+    async def get_departures(self,
+                             stop_id: str,
+                             route_id: str | None = None,
+                             at: datetime | None = None,
+                             limit: int = 5) -> StopDeparturesResponse:
+        stop = await self.stop_repo.get_by_id(stop_id)
+        if not stop:
+            raise ResourceNotFoundError(f"Stop with ID '{stop_id}' not found")
+
+        # a station departs from all of its stops
+        stop_ids = [stop.stop_id]
+        if stop.parent_station is None:
+            children = await self.stop_repo.get_all_by_parent_station(
+                stop.stop_id)
+            stop_ids = [child.stop_id for child in children] or stop_ids
+
+        timezone = ZoneInfo(settings.gtfs_timezone)
+        at = localize(at, timezone)
+        today = at.date()
+        seconds = at.hour * 3600 + at.minute * 60 + at.second
+
+        # trips of the previous service day still running after midnight
+        # have departure times past 24:00:00
+        departures = []
+        for service_date, departure_seconds in (
+                (today - timedelta(days=1), seconds + SECONDS_PER_DAY),
+                (today, seconds)):
+            service_ids = self.calendar.get_active_service_ids(service_date)
+            if not service_ids:
+                continue
+            for departure_stop_id in stop_ids:
+                stop_times = await self.stop_time_repo.get_departures(
+                    departure_stop_id,
+                    route_id,
+                    service_ids,
+                    departure_seconds,
+                    limit)
+                departures.extend((service_date, stop_time, trip)
+                                  for stop_time, trip in stop_times)
+
+        def departs_at(service_date: date, stop_time: StopTime) -> datetime:
+            return (datetime.combine(service_date, time(), tzinfo=timezone)
+                    + timedelta(seconds=stop_time.departure_seconds))
+
+        departures.sort(key=lambda departure: departs_at(departure[0],
+                                                         departure[1]))
+        results = [
+            Departure(trip=ScheduledTrip(id=trip.trip_id,
+                                         headsign=trip.trip_headsign,
+                                         route_id=trip.route_id,
+                                         service_id=trip.service_id),
+                      stop_id=stop_time.stop_id,
+                      service_date=service_date,
+                      departure_time=seconds_to_time(
+                          stop_time.departure_seconds),
+                      departs_at=departs_at(service_date, stop_time))
+            for service_date, stop_time, trip in departures[:limit]]
+
+        return StopDeparturesResponse(id=stop.stop_id,
+                                      name=stop.stop_name,
+                                      latitude=stop.stop_lat,
+                                      longitude=stop.stop_lon,
+                                      departures=results)
+
     def _responsify(self, stop: Stop) -> StopResponse:
         return StopResponse(id=stop.stop_id,
                             name=stop.stop_name,
                             latitude=stop.stop_lat,
                             longitude=stop.stop_lon)
 
-    def _detailed_responsify(
+    async def _detailed_responsify(
             self,
             stop: Stop,
             route_id: str | None,
-            service_id: str | None,
+            service_date: date | None,
             arrival_time: str | None,
             departure_time: str | None) -> StopDetailedResponse:
-        stop_times = self.stop_time_repo.get_all_by_stop_id(
+        schedule = await self.stop_schedule_repo.get_all_by_stop_id(
             stop_id=stop.stop_id,
             route_id=route_id,
-            service_id=service_id,
-            arrival_time=arrival_time,
-            departure_time=departure_time)
+            service_ids=(self.calendar.get_active_service_ids(service_date)
+                         if service_date is not None else None),
+            arrival_seconds=(time_to_seconds(arrival_time)
+                             if arrival_time is not None else None),
+            departure_seconds=(time_to_seconds(departure_time)
+                               if departure_time is not None else None))
 
         results = []
-        for stop_time, trip in stop_times:
-            trip_res = ScheduledTrip(id=trip.trip_id,
-                                     headsign=trip.trip_headsign,
-                                     route_id=trip.route_id,
-                                     service_id=ServiceID(trip.service_id))
+        for row in schedule:
+            trip_res = ScheduledTrip(id=row.trip_id,
+                                     headsign=row.trip_headsign,
+                                     route_id=row.route_id,
+                                     service_id=row.service_id)
 
             stop_time_res = StopSchedule(
                 trip=trip_res,
-                arrival_time=stop_time.arrival_time,
-                departure_time=stop_time.departure_time)
+                arrival_time=seconds_to_time(row.arrival_seconds),
+                departure_time=seconds_to_time(row.departure_seconds))
             results.append(stop_time_res)
 
         return StopDetailedResponse(id=stop.stop_id,
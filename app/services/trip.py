@@ -1,26 +1,38 @@
-from sqlmodel import Session
+from datetime import date
+from typing import AsyncIterator, FrozenSet, List
 
 from app.db.models.gtfs import Trip
-from app.db.repositories.stop_time import StopTimeRepository
-from app.db.repositories.trip import TripRepository
+from app.db.repositories.stop_time import AsyncStopTimeRepository
+from app.db.repositories.trip import AsyncTripRepository
 from app.exceptions.base import QueryInvalidError, ResourceNotFoundError
-from app.schemas.pagination import PaginatedResponse
+from app.schemas.batch import BatchResponse
+from app.schemas.pagination import CursorPaginatedResponse
 from app.schemas.trip import (ScheduledStop, TripDetailedResponse,
                               TripResponse, TripSchedule)
-from app.utils.helpers import valid_time_format
+from app.services.calendar import CalendarService
+from app.settings import settings
+from app.utils.cache import VersionedCache
+from app.utils.helpers import (decode_cursor, encode_cursor, seconds_to_time,
+                               time_to_seconds, valid_time_format)
 
 
 class TripService:
-    def __init__(self, session: Session):
-        self.session = session
-        self.stop_time_repo = StopTimeRepository(session)
-        self.trip_repo = TripRepository(session)
-
-    def get_by_id(self,
-                  trip_id: str,
-                  arrival_time: str | None = None,
-                  departure_time: str | None = None) -> TripDetailedResponse:
-        trip = self.trip_repo.get_by_id(trip_id)
+    def __init__(self,
+                 trip_repo: AsyncTripRepository,
+                 stop_time_repo: AsyncStopTimeRepository,
+                 calendar: CalendarService,
+                 total_cache: VersionedCache):
+        self.trip_repo = trip_repo
+        self.stop_time_repo = stop_time_repo
+        self.calendar = calendar
+        self.total_cache = total_cache
+
+    async def get_by_id(
+            self,
+            trip_id: str,
+            arrival_time: str | None = None,
+            departure_time: str | None = None) -> TripDetailedResponse:
+        trip = await self.trip_repo.get_by_id(trip_id)
         if not trip:
             raise ResourceNotFoundError(f"Trip with ID '{trip_id}' not found")
 
@@ -34,25 +46,91 @@ class TripService:
             raise QueryInvalidError(
                 "departure_time must be in HH:MM:SS format (e.g., 13:22:15)")
 
-        return self._detailed_responsify(trip, arrival_time, departure_time)
-
-    def get_all(self,
-                route_id: str | None = None,
-                service_id: str | None = None,
-                direction_id: int | None = None,
-                offset: int = 0,
-                limit: int = 100) -> PaginatedResponse[TripResponse]:
-        trips, total = self.trip_repo.get_all(route_id,
-                                              service_id,
-                                              direction_id,
-                                              offset,
-                                              limit)
+        return await self._detailed_responsify(trip,
+                                               arrival_time,
+                                               departure_time)
+
+    async def get_many(self,
+                       trip_ids: List[str]) -> BatchResponse[TripResponse]:
+        # duplicates are looked up once; results keep the request order
+        trip_ids = list(dict.fromkeys(trip_ids))
+        trips = {trip.trip_id: trip
+                 for trip in await self.trip_repo.get_all_by_ids(trip_ids)}
+        return BatchResponse[TripResponse](
+            results={trip_id: self._responsify(trips[trip_id])
+                     for trip_id in trip_ids if trip_id in trips},
+            missing=[trip_id for trip_id in trip_ids
+                     if trip_id not in trips])
+
+    async def get_all(
+            self,
+            route_id: str | None = None,
+            service_date: date | None = None,
+            direction_id: int | None = None,
+            cursor: str | None = None,
+            offset: int = 0,
+            limit: int = 100,
+            include_total: bool = True
+    ) -> CursorPaginatedResponse[TripResponse]:
+        after_trip_id = None
+        if cursor is not None:
+            try:
+                after_trip_id = decode_cursor(cursor)
+            except ValueError as e:
+                raise QueryInvalidError(str(e)) from e
+
+        service_ids = (self.calendar.get_active_service_ids(service_date)
+                       if service_date is not None else None)
+        # one extra trip tells whether there is a next page
+        trips = await self.trip_repo.get_all(route_id,
+                                             service_ids,
+                                             direction_id,
+                                             after_trip_id,
+                                             offset,
+                                             limit + 1)
+        next_cursor = None
+        if len(trips) > limit:
+            trips = trips[:limit]
+            next_cursor = encode_cursor(trips[-1].trip_id)
+
+        total = None
+        if include_total:
+            total = await self._count(route_id, service_ids, direction_id)
+
         results = [self._responsify(trip) for trip in trips]
+        return CursorPaginatedResponse[TripResponse](total=total,
+                                                     offset=offset,
+                                                     limit=limit,
+                                                     next_cursor=next_cursor,
+                                                     results=results)
+
+    async def stream_all(
+            self,
+            route_id: str | None = None,
+            service_date: date | None = None,
+            direction_id: int | None = None) -> AsyncIterator[TripResponse]:
+        service_ids = (self.calendar.get_active_service_ids(service_date)
+                       if service_date is not None else None)
+        async for trip in self.trip_repo.stream_all(route_id,
+                                                    service_ids,
+                                                    direction_id):
+            yield self._responsify(trip)
 
-        return PaginatedResponse[TripResponse](total=total,
-                                               offset=offset,
-                                               limit=limit,
-                                               results=results)
+    async def _count(self,
+                     route_id: str | None,
+                     service_ids: FrozenSet[str] | None,
+                     direction_id: int | None) -> int:
+        # totals only change with the dataset, so they are cached per filter
+        # until the dataset version changes
+        version = self.total_cache.version
+        key = (route_id, service_ids, direction_id)
+        total = self.total_cache.get(key, version)
+        if total is None:
+            total = await self.trip_repo.count(route_id,
+                                               service_ids,
+                                               direction_id)
+            self.total_cache.set(key, total, version)
+        return total
 
     def _responsify(self, trip: Trip) -> TripResponse:
         return TripResponse(id=trip.trip_id,
@@ -61,15 +139,17 @@ class TripService:
                             service_id=trip.service_id,
                             direction_id=trip.direction_id)
 
-    def _detailed_responsify(
+    async def _detailed_responsify(
             self,
             trip: Trip,
             arrival_time: str | None,
             departure_time: str | None) -> TripDetailedResponse:
-        stop_times = self.stop_time_repo.get_all_by_trip_id(
+        stop_times = await self.stop_time_repo.get_all_by_trip_id(
             trip_id=trip.trip_id,
-            arrival_time=arrival_time,
-            departure_time=departure_time)
+            arrival_seconds=(time_to_seconds(arrival_time)
+                             if arrival_time is not None else None),
+            departure_seconds=(time_to_seconds(departure_time)
+                               if departure_time is not None else None))
 
         results = []
         for stop_time, stop in stop_times:
@@ -81,8 +161,8 @@ class TripService:
             stop_time_res = TripSchedule(
                 stop=stop_res,
                 stop_sequence=stop_time.stop_sequence,
-                arrival_time=stop_time.arrival_time,
-                departure_time=stop_time.departure_time)
+                arrival_time=seconds_to_time(stop_time.arrival_seconds),
+                departure_time=seconds_to_time(stop_time.departure_seconds))
             results.append(stop_time_res)
 
         return TripDetailedResponse(id=trip.trip_id,
@@ -91,3 +171,8 @@ class TripService:
                                     service_id=trip.service_id,
                                     direction_id=trip.direction_id,
                                     stop_times=results)
+
+
+# filtered trip totals per dataset version; they never expire on their own
+trip_total_cache = VersionedCache(maxsize=settings.trip_total_cache_size,
+                                  ttl=float("inf"))
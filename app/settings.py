@@ -1,5 +1,6 @@
-from typing import List
+from typing import List, Literal
 
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -29,16 +30,97 @@ class Settings(BaseSettings):
     # Debug mode
     debug: bool = True
 
-    # .env database variables
-    db_user: str
-    db_password: str
-    db_name: str
-    db_host: str
-    db_port: str
+    # Database backend: a "postgresql" server or an embedded "sqlite" file
+    db_backend: Literal["postgresql", "sqlite"] = "postgresql"
+
+    # .env database variables, required by the postgresql backend
+    db_user: str | None = None
+    db_password: str | None = None
+    db_name: str | None = None
+    db_host: str | None = None
+    db_port: str | None = None
+    # schema serving the GTFS static data; refreshes are built in shadow
+    # schemas next to it and swapped in
+    db_schema: str = "gtfs"
+    # connection pool of each engine: persistent connections, extra
+    # connections allowed under load and seconds to wait for a free one
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    # milliseconds before the database cancels an API query, 0 disables it
+    db_statement_timeout: int = 5000
+    # requests issuing more queries than this are logged as warnings to
+    # catch N+1 query patterns
+    db_query_count_warning: int = 20
+    # SQLite database file of the sqlite backend. A read-only file is opened
+    # as immutable, e.g. a prebuilt schedule shipped with the API container
+    db_sqlite_path: str = "mta_static.db"
+    db_sqlite_read_only: bool = False
+    # SQLite page cache per connection in KiB and bytes of the file memory
+    # mapped per connection
+    db_sqlite_cache_kib: int = 65536
+    db_sqlite_mmap_bytes: int = 1 << 30
+    # postgresql:// URLs of read replicas serving the API's static GTFS
+    # queries round robin; the db scripts always use the primary
+    db_replica_urls: List[str] = []
+    # seconds between replica health checks and before a check fails
+    db_replica_check_interval: float = 10
+    db_replica_check_timeout: float = 2
+
+    # Static GTFS backend serving stops, trips and routes: "database" queries
+    # the database per request, "memory" serves them from an in-memory copy
+    # loaded at startup
+    static_backend: Literal["database", "memory"] = "database"
+    # Rows fetched per round trip by the server-side cursors of streamed
+    # (application/x-ndjson) responses
+    stream_batch_size: int = 1000
+
+    # Serialized static GTFS responses cached per dataset version; entries
+    # also expire after the TTL in seconds
+    response_cache_size: int = 4096
+    response_cache_ttl: float = 3600
+    # Filtered /trips totals cached per dataset version
+    trip_total_cache_size: int = 1024
+    # One-to-all reachability searches cached per dataset version, with
+    # departure times rounded down to buckets of this many seconds
+    reachability_cache_size: int = 1024
+    reachability_bucket_seconds: int = 300
+    # Directory of the columnar snapshots of the static GTFS dataset. The db
+    # scripts write one after every change and API processes build their
+    # in-memory data from it when it holds the current dataset version
+    snapshot_path: str | None = None
+    # Seconds between checks of the dataset version stamp written by the
+    # seeding and sync scripts
+    dataset_poll_interval: float = 30
+
+    # Fraction of requests whose phases are timed, from 0 (off) to 1 (every
+    # request). Sampled responses carry a Server-Timing header and feed the
+    # per-route phase histograms of /metrics/timings
+    server_timing_sample_rate: float = 0.0
+
+    # Approximate cell size in meters of the spatial grid of stops
+    spatial_cell_meters: float = 250
+
+    # Map zoom levels shapes are simplified for, next to full resolution
+    shape_zoom_levels: List[int] = [10, 13, 16]
+
+    # Timezone the GTFS static schedules are expressed in
+    gtfs_timezone: str = "America/New_York"
 
     # .env configs variables
     gtfs_dir_path: str
     mta_feed_urls_path: str
 
+    @model_validator(mode="after")
+    def check_postgresql_settings(self) -> "Settings":
+        if self.db_backend == "postgresql":
+            missing = [name for name in ("db_user", "db_password", "db_name",
+                                         "db_host", "db_port")
+                       if getattr(self, name) is None]
+            if missing:
+                raise ValueError("The postgresql backend requires "
+                                 f"{', '.join(missing)}")
+        return self
+
 
 settings = Settings()
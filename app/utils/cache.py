@@ -0,0 +1,143 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Hashable, Tuple
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache whose entries also expire after a time to live.
+    Once the cache is full, the least recently used entry is evicted.
+
+    Args:
+        maxsize (int): Maximum number of entries
+        ttl (float): Seconds an entry stays valid after it is set
+        clock (Callable[[], float]): Monotonic time source
+    """
+
+    def __init__(self,
+                 maxsize: int,
+                 ttl: float,
+                 clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = Lock()
+        # key -> (expiry time, value), least recently used first
+        self._entries: OrderedDict[Hashable, Tuple[float, Any]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        """
+        Get a cached value and mark it as most recently used.
+
+        Args:
+            key (Hashable): Cache key
+
+        Returns:
+            Any | None: The cached value, None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Cache a value, evicting the least recently used entry if full.
+
+        Args:
+            key (Hashable): Cache key
+            value (Any): Value to cache
+        """
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """
+        Drop every cached entry. Statistics are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(size=len(self._entries),
+                              maxsize=self.maxsize,
+                              hits=self._hits,
+                              misses=self._misses,
+                              evictions=self._evictions,
+                              expirations=self._expirations)
+
+
+class VersionedCache:
+    """
+    LRU and TTL cache whose entries belong to a dataset version. Setting a new
+    version invalidates every entry at once. Callers pass the version they
+    read before computing a value so a value computed from a previous
+    dataset is never stored under the new version.
+
+    Args:
+        maxsize (int): Maximum number of entries
+        ttl (float): Seconds an entry stays valid after it is set
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = LRUCache(maxsize, ttl)
+        self.version: str | None = None
+
+    def set_version(self, version: str | None) -> None:
+        """
+        Switch to a new dataset version and drop the entries cached for the
+        previous one.
+
+        Args:
+            version (str | None): Version stamp of the loaded dataset
+        """
+        if version != self.version:
+            self.version = version
+            self._cache.clear()
+
+    def get(self, key: Hashable, version: str | None) -> Any | None:
+        return self._cache.get((version, key))
+
+    def set(self, key: Hashable, value: Any, version: str | None) -> None:
+        self._cache.set((version, key), value)
+
+    def stats(self) -> CacheStats:
+        return self._cache.stats()
@@ -0,0 +1,86 @@
+import math
+from typing import List, Sequence, Tuple
+
+Point = Tuple[float, float]
+
+
+def _segment_distance(point: Point,
+                      start: Point,
+                      end: Point,
+                      lon_scale: float) -> float:
+    # planar distance in degrees of latitude, longitudes scaled to match
+    y, x = point[0], point[1] * lon_scale
+    y1, x1 = start[0], start[1] * lon_scale
+    y2, x2 = end[0], end[1] * lon_scale
+    dy, dx = y2 - y1, x2 - x1
+    if dx == 0 and dy == 0:
+        return math.hypot(y - y1, x - x1)
+    t = max(0.0, min(1.0, ((y - y1) * dy + (x - x1) * dx) / (dy * dy
+                                                             + dx * dx)))
+    return math.hypot(y - (y1 + t * dy), x - (x1 + t * dx))
+
+
+def simplify(points: Sequence[Point], tolerance: float) -> List[Point]:
+    """
+    Simplify a line with the Douglas-Peucker algorithm. Points closer than
+    tolerance to the simplified line are dropped; the first and last points
+    are always kept.
+
+    Args:
+        points (Sequence[Point]): (latitude, longitude) points of the line.
+        tolerance (float): Maximum deviation in degrees of latitude.
+
+    Returns:
+        (List[Point]): The kept points in their original order.
+    """
+    if len(points) < 3:
+        return list(points)
+
+    lon_scale = math.cos(math.radians(points[0][0]))
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    # iterative so long shapes don't hit the recursion limit
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        max_distance, index = 0.0, start
+        for i in range(start + 1, end):
+            distance = _segment_distance(points[i], points[start],
+                                         points[end], lon_scale)
+            if distance > max_distance:
+                max_distance, index = distance, i
+        if max_distance > tolerance:
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def encode_polyline(points: Sequence[Point], precision: int = 5) -> str:
+    """
+    Encode points with Google's encoded polyline algorithm format.
+
+    E.g. [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)] maps to
+    _p~iF~ps|U_ulLnnqC_mqNvxq`@
+
+    Args:
+        points (Sequence[Point]): (latitude, longitude) points to encode.
+        precision (int): Number of decimal places kept.
+
+    Returns:
+        (str): The encoded polyline.
+    """
+    factor = 10 ** precision
+    chunks = []
+    previous_lat, previous_lon = 0, 0
+    for lat, lon in points:
+        lat, lon = round(lat * factor), round(lon * factor)
+        for delta in (lat - previous_lat, lon - previous_lon):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                chunks.append(chr((0x20 | (value & 0x1f)) + 63))
+                value >>= 5
+            chunks.append(chr(value + 63))
+        previous_lat, previous_lon = lat, lon
+    return "".join(chunks)
@@ -1,9 +1,19 @@
+import base64
+import binascii
+import math
 import re
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+# mean earth radius in meters
+EARTH_RADIUS = 6371008.8
 
 
 def valid_time_format(time_str: str) -> bool:
     """
-    Validate that a time string matches HH:MM:SS format.
+    Validate that a time string matches HH:MM:SS format. GTFS times are
+    relative to the start of the service day, so hours past 23 are valid for
+    trips running after midnight (e.g. 25:10:00).
 
     Args:
         time_str (str): The input string in HH:MM:SS format.
@@ -11,9 +21,138 @@ def valid_time_format(time_str: str) -> bool:
     Returns:
         (bool): True if match, False otherwise.
     """
-    time_pattern = re.compile(
-        r'^([0-1][0-9]|2[0-3]):([0-5][0-9]):([0-5][0-9])$')
+    time_pattern = re.compile(r'^([0-9]{2}):([0-5][0-9]):([0-5][0-9])$')
     if not time_pattern.match(time_str):
         return False
 
     return True
+
+
+def time_to_seconds(time_str: str) -> int:
+    """
+    Convert a GTFS H:MM:SS or HH:MM:SS time to seconds since the start of the
+    service day.
+
+    E.g. 25:10:00 maps to 90600
+
+    Args:
+        time_str (str): The input string in HH:MM:SS format.
+
+    Returns:
+        (int): Seconds since the start of the service day.
+    """
+    hours, minutes, seconds = time_str.strip().split(":")
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
+
+def seconds_to_time(total_seconds: int | None) -> str:
+    """
+    Format seconds since the start of the service day as a GTFS HH:MM:SS
+    time. A missing time is formatted empty, as GTFS leaves it.
+
+    E.g. 90600 maps to 25:10:00
+
+    Args:
+        total_seconds (int | None): Seconds since the start of the service
+                                    day.
+
+    Returns:
+        (str): The time in HH:MM:SS format, empty if there is none.
+    """
+    if total_seconds is None:
+        return ""
+    hours, remainder = divmod(total_seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def localize(value: datetime | None, timezone: ZoneInfo) -> datetime:
+    """
+    Express a date and time in the given timezone. Values without a UTC
+    offset are taken to be in that timezone already.
+
+    Args:
+        value (datetime | None): The date and time, None for now.
+        timezone (ZoneInfo): The timezone to express it in.
+
+    Returns:
+        (datetime): The timezone aware date and time.
+    """
+    if value is None:
+        return datetime.now(timezone)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone)
+    return value.astimezone(timezone)
+
+
+def stop_direction_id(stop_id: str) -> int | None:
+    """
+    Derive the direction ID of a stop from its stop ID suffix.
+
+    E.g. stop_id: 101N maps to 1 and 101S maps to 0
+
+    Args:
+        stop_id (str): The stop ID to derive the direction from.
+
+    Returns:
+        (int | None): 1 for N stops, 0 for S stops, None otherwise.
+    """
+    if stop_id.endswith("N"):
+        return 1
+    if stop_id.endswith("S"):
+        return 0
+    return None
+
+
+def encode_cursor(value: str) -> str:
+    """
+    Encode the sort key of the last item of a page as an opaque pagination
+    cursor.
+
+    Args:
+        value (str): The sort key to resume after.
+
+    Returns:
+        (str): URL safe cursor.
+    """
+    return base64.urlsafe_b64encode(value.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    """
+    Decode a pagination cursor created by encode_cursor.
+
+    Args:
+        cursor (str): The cursor to decode.
+
+    Returns:
+        (str): The sort key to resume after.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        return base64.urlsafe_b64decode(cursor + padding).decode()
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor '{cursor}'") from e
+
+
+def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Great-circle distance between two coordinates.
+
+    Args:
+        lat1 (float): Latitude of the first coordinate in degrees.
+        lon1 (float): Longitude of the first coordinate in degrees.
+        lat2 (float): Latitude of the second coordinate in degrees.
+        lon2 (float): Longitude of the second coordinate in degrees.
+
+    Returns:
+        (float): The distance in meters.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2)
+         * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS * math.asin(math.sqrt(a))
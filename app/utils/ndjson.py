@@ -0,0 +1,58 @@
+from functools import lru_cache
+from typing import Any, AsyncIterable, Dict, Iterable
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# list endpoints answer with JSON or NDJSON depending on the Accept header,
+# so caches must keep both representations apart
+VARY_ACCEPT = {"Vary": "Accept"}
+
+
+@lru_cache
+def _adapter(model: Any) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+def accepts_ndjson(request: Request) -> bool:
+    """
+    Whether a request opted into a streamed newline delimited JSON response
+    with its Accept header.
+    """
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def ndjson_response(model: Any,
+                    items: Iterable[Any] | AsyncIterable[Any],
+                    headers: Dict[str, str] | None = None
+                    ) -> StreamingResponse:
+    """
+    Stream items as newline delimited JSON, one object per line. Items are
+    serialized as they are produced, so only one is held at a time. Sync
+    iterables are iterated in the threadpool.
+
+    Args:
+        model (Any): Model type to serialize each item with
+        items (Iterable[Any] | AsyncIterable[Any]): The items to stream
+        headers (Dict[str, str] | None): Extra response headers
+
+    Returns:
+        StreamingResponse: The streamed response
+    """
+    adapter = _adapter(model)
+
+    if isinstance(items, AsyncIterable):
+        async def lines():
+            async for item in items:
+                yield adapter.dump_json(item, by_alias=True) + b"\n"
+    else:
+        def lines():
+            for item in items:
+                yield adapter.dump_json(item, by_alias=True) + b"\n"
+
+    return StreamingResponse(lines(),
+                             media_type=NDJSON_MEDIA_TYPE,
+                             headers={**VARY_ACCEPT, **(headers or {})})
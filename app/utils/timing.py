@@ -0,0 +1,282 @@
+import inspect
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache, wraps
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Tuple
+
+from fastapi import Response
+from fastapi.datastructures import Default, DefaultPlaceholder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+# upper bounds in milliseconds of the phase histogram buckets; slower
+# timings fall in a last, unbounded bucket
+BUCKET_BOUNDS_MS: Tuple[float, ...] = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25,
+                                       50, 100, 250, 500, 1000, 2500, 5000,
+                                       10000)
+
+
+@dataclass
+class RequestTimings:
+    # seconds spent in each phase, in the order the phases first ran
+    phases: Dict[str, float] = field(default_factory=dict)
+    # perf_counter() when the endpoint function returned
+    returned_at: float | None = None
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def header(self) -> str:
+        """
+        Format the phases as a Server-Timing header value.
+        """
+        return ", ".join(f"{name};dur={seconds * 1000:.2f}"
+                         for name, seconds in self.phases.items())
+
+
+# phase timings of the request being served; set by the
+# ServerTimingMiddleware for sampled requests only and left unset otherwise,
+# which turns every timer into a context variable lookup
+request_timings: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None)
+
+
+class phase:
+    """
+    Context manager timing a block of code as a phase of the request being
+    served. Time spent in the same phase several times adds up. A class
+    rather than a generator so unsampled requests skip it cheaply.
+
+    Args:
+        name (str): Phase name, reported in the Server-Timing header
+    """
+    __slots__ = ("name", "timings", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.timings = request_timings.get()
+        if self.timings is not None:
+            self.start = perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        if self.timings is not None:
+            self.timings.add(self.name, perf_counter() - self.start)
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    """
+    Decorate a sync or async function to time its calls as a phase of the
+    request being served.
+
+    Args:
+        name (str): Phase name, reported in the Server-Timing header
+
+    Returns:
+        Callable[[Callable], Callable]: The decorator
+    """
+    def decorate(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                timings = request_timings.get()
+                if timings is None:
+                    return await func(*args, **kwargs)
+                start = perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    timings.add(name, perf_counter() - start)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            timings = request_timings.get()
+            if timings is None:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings.add(name, perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def timed_methods(name: str) -> Callable[[type], type]:
+    """
+    Decorate a class to time calls to its public methods as one phase of the
+    request being served. Async generator methods are left alone, they run
+    while a streamed response is being sent.
+
+    Args:
+        name (str): Phase name, reported in the Server-Timing header
+
+    Returns:
+        Callable[[type], type]: The class decorator
+    """
+    def decorate(cls: type) -> type:
+        for attr, method in list(vars(cls).items()):
+            if (attr.startswith("_")
+                    or not inspect.isfunction(method)
+                    or inspect.isasyncgenfunction(method)):
+                continue
+            setattr(cls, attr, timed(name)(method))
+        return cls
+    return decorate
+
+
+def _mark_return(endpoint: Callable) -> Callable:
+    # records when the endpoint returned so its response class can time the
+    # encoding that follows
+    def mark() -> None:
+        timings = request_timings.get()
+        if timings is not None:
+            timings.returned_at = perf_counter()
+
+    # included routers copy their routes with the already wrapped endpoint
+    if getattr(endpoint, "_timed", False):
+        return endpoint
+
+    if inspect.iscoroutinefunction(endpoint):
+        @wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                mark()
+        async_wrapper._timed = True
+        return async_wrapper
+
+    @wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            mark()
+    wrapper._timed = True
+    return wrapper
+
+
+@lru_cache
+def _encoded_response_class(
+        response_class: type[Response]) -> type[Response]:
+    # FastAPI builds the response class from the validated and serialized
+    # return value of the endpoint, so building it ends the encoding
+    if getattr(response_class, "_timed", False):
+        return response_class
+
+    class EncodedResponse(response_class):
+        _timed = True
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            timings = request_timings.get()
+            if timings is not None and timings.returned_at is not None:
+                timings.add("encode", perf_counter() - timings.returned_at)
+
+    return EncodedResponse
+
+
+class TimedRoute(APIRoute):
+    """
+    API route timing the validation and serialization of the endpoint's
+    return value into the response as the "encode" phase of sampled
+    requests. Responses returned by the endpoint itself are not encoded by
+    the route and not timed.
+    """
+
+    def __init__(self,
+                 path: str,
+                 endpoint: Callable[..., Any],
+                 *,
+                 response_class: type[Response] | DefaultPlaceholder = Default(
+                     JSONResponse),
+                 **kwargs):
+        if isinstance(response_class, DefaultPlaceholder):
+            response_class = Default(
+                _encoded_response_class(response_class.value))
+        else:
+            response_class = _encoded_response_class(response_class)
+        super().__init__(path,
+                         _mark_return(endpoint),
+                         response_class=response_class,
+                         **kwargs)
+
+
+@dataclass(frozen=True)
+class PhaseStats:
+    route: str
+    phase: str
+    count: int
+    total_ms: float
+    max_ms: float
+    # number of timings per bucket of BUCKET_BOUNDS_MS, then the slower ones
+    buckets: Tuple[int, ...]
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def quantile_ms(self, q: float) -> float:
+        """
+        Estimate a quantile as the upper bound of the bucket it falls in.
+        """
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(BUCKET_BOUNDS_MS, self.buckets):
+            cumulative += count
+            if cumulative >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+
+class TimingStats:
+    """
+    Thread-safe histograms of the phase timings of sampled requests, per
+    route and phase.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        # (route, phase) -> [count, total ms, max ms, bucket counts]
+        self._histograms: Dict[Tuple[str, str], List[Any]] = {}
+
+    def record(self, route: str, timings: RequestTimings) -> None:
+        """
+        Add the phase timings of a request to the histograms of its route.
+
+        Args:
+            route (str): Method and path template of the matched route
+            timings (RequestTimings): Phase timings of the request
+        """
+        with self._lock:
+            for name, seconds in timings.phases.items():
+                ms = seconds * 1000
+                histogram = self._histograms.get((route, name))
+                if histogram is None:
+                    histogram = [0, 0.0, 0.0,
+                                 [0] * (len(BUCKET_BOUNDS_MS) + 1)]
+                    self._histograms[(route, name)] = histogram
+                histogram[0] += 1
+                histogram[1] += ms
+                histogram[2] = max(histogram[2], ms)
+                histogram[3][bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+
+    def stats(self) -> List[PhaseStats]:
+        with self._lock:
+            return [PhaseStats(route=route,
+                               phase=name,
+                               count=count,
+                               total_ms=total_ms,
+                               max_ms=max_ms,
+                               buckets=tuple(buckets))
+                    for (route, name), (count, total_ms, max_ms, buckets)
+                    in sorted(self._histograms.items())]
+
+
+timing_stats = TimingStats()
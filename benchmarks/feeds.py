@@ -0,0 +1,132 @@
+# Micro-benchmarks of the GTFS-RT feed pipeline on the recorded fixtures:
+# parsing the protobuf message, converting it to the response models,
+# filtering its entities and serializing the response, each timed on its own
+# so a change to one phase shows up in that phase's numbers.
+#
+# python3 -m benchmarks.feeds --iterations 50
+
+import argparse
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, List
+
+from google.protobuf.json_format import MessageToDict
+from google.transit import gtfs_realtime_pb2
+from pydantic import TypeAdapter
+
+from app.schemas.feed import Entity, EntityType, FeedResponse
+from app.schemas.pagination import PaginatedResponse
+from app.services.feed import feed_service
+from app.utils.logger import logger
+from benchmarks.fixtures import FIXTURES_DIR, load_fixtures
+from benchmarks.results import save_results, summarize
+
+_response_adapter = TypeAdapter(PaginatedResponse[Entity])
+
+
+def _time(run: Callable[[], Any], iterations: int) -> List[float]:
+    timings = []
+    for _ in range(iterations):
+        start = perf_counter()
+        run()
+        timings.append((perf_counter() - start) * 1000)
+    return timings
+
+
+def _filters(response: FeedResponse) -> Dict[str, str]:
+    # route and stop of the first trip update with stops, so the filter
+    # takes its most expensive path of scanning stop time updates
+    for entity in response.entity:
+        if (entity.entity_type == EntityType.TRIP_UPDATE
+                and entity.trip_update.stop_time_update):
+            trip_update = entity.trip_update
+            return {"route_id": trip_update.trip.route_id,
+                    "stop_id": trip_update.stop_time_update[0].stop_id}
+    return {}
+
+
+def benchmark_feed(content: bytes,
+                   iterations: int) -> Dict[str, Dict[str, float]]:
+    """
+    Time every phase of serving a feed message.
+
+    Args:
+        content (bytes): Raw protobuf message of the feed
+        iterations (int): Number of times each phase runs
+
+    Returns:
+        Dict[str, Dict[str, float]]: Timing statistics of each phase
+    """
+    def parse() -> gtfs_realtime_pb2.FeedMessage:
+        message = gtfs_realtime_pb2.FeedMessage()
+        message.ParseFromString(content)
+        return message
+
+    message = parse()
+
+    def convert() -> FeedResponse:
+        return FeedResponse(**MessageToDict(
+            message, preserving_proto_field_name=True))
+
+    response = convert()
+    filters = _filters(response)
+
+    def filter_entities() -> List[Entity]:
+        return [entity for entity in response.entity
+                if feed_service._include_entity(entity=entity, **filters)]
+
+    page = PaginatedResponse[Entity](total=len(response.entity),
+                                     offset=0,
+                                     limit=len(response.entity),
+                                     results=response.entity)
+
+    def serialize() -> bytes:
+        return _response_adapter.dump_json(page, by_alias=True)
+
+    return {"parse": summarize(_time(parse, iterations)),
+            "convert": summarize(_time(convert, iterations)),
+            "filter": summarize(_time(filter_entities, iterations)),
+            "serialize": summarize(_time(serialize, iterations))}
+
+
+def benchmark_feeds(iterations: int,
+                    fixtures_dir: Path = FIXTURES_DIR,
+                    output: Path | None = None) -> Dict[str, Dict]:
+    """
+    Run the feed micro-benchmarks on every recorded fixture and save the
+    results.
+
+    Args:
+        iterations (int): Number of times each phase runs per fixture
+        fixtures_dir (Path): Directory holding the fixtures
+        output (Path | None): Results file to write
+
+    Returns:
+        Dict[str, Dict]: Timing statistics keyed by <feed>.<phase>
+    """
+    results = {}
+    for feed, content in load_fixtures(fixtures_dir).items():
+        for phase, stats in benchmark_feed(content, iterations).items():
+            results[f"{feed}.{phase}"] = stats
+            logger.info(f"{feed} {phase}: "
+                        f"p50 {stats['p50_ms']:.3f} ms, "
+                        f"p95 {stats['p95_ms']:.3f} ms, "
+                        f"p99 {stats['p99_ms']:.3f} ms")
+
+    save_results("feeds",
+                 {"iterations": iterations,
+                  "fixtures_dir": str(fixtures_dir)},
+                 results,
+                 output)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark parsing, converting, filtering and "
+                    "serializing the recorded GTFS-RT feeds")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+    benchmark_feeds(args.iterations, args.fixtures, args.output)
@@ -0,0 +1,66 @@
+# Recorded GTFS-RT feed fixtures for the feed benchmarks and the fake MTA
+# upstream of the load generator. Recording fetches every feed configured in
+# mta_feed_urls.json once and saves the raw protobuf bodies to
+# benchmarks/fixtures/<feed>.pb, so later runs measure the same messages.
+#
+# python3 -m benchmarks.fixtures
+
+from pathlib import Path
+from typing import Dict
+
+import requests
+from fastapi import status
+
+from app.services.feed import feed_service
+from app.utils.logger import logger
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def record_fixtures(fixtures_dir: Path = FIXTURES_DIR) -> Dict[str, int]:
+    """
+    Record the current message of every configured feed.
+
+    Args:
+        fixtures_dir (Path): Directory to save the fixtures to
+
+    Returns:
+        Dict[str, int]: Size in bytes of each recorded feed
+    """
+    fixtures_dir.mkdir(exist_ok=True)
+    sizes = {}
+    for feed, url in feed_service.mta_endpoints.items():
+        res = requests.get(url, timeout=10)
+        if res.status_code != status.HTTP_200_OK:
+            logger.error(f"[{res.status_code}]: Error recording feed '{feed}'")
+            continue
+        (fixtures_dir / f"{feed}.pb").write_bytes(res.content)
+        sizes[feed] = len(res.content)
+        logger.info(f"Recorded feed '{feed}' ({len(res.content)} bytes)")
+    return sizes
+
+
+def load_fixtures(fixtures_dir: Path = FIXTURES_DIR) -> Dict[str, bytes]:
+    """
+    Load the recorded feed fixtures.
+
+    Args:
+        fixtures_dir (Path): Directory holding the fixtures
+
+    Raises:
+        FileNotFoundError: No fixture has been recorded
+
+    Returns:
+        Dict[str, bytes]: Raw protobuf message of each recorded feed
+    """
+    fixtures = {path.stem: path.read_bytes()
+                for path in sorted(fixtures_dir.glob("*.pb"))}
+    if not fixtures:
+        raise FileNotFoundError(
+            f"No feed fixtures in '{fixtures_dir}'; record them with "
+            "'python3 -m benchmarks.fixtures'")
+    return fixtures
+
+
+if __name__ == "__main__":
+    record_fixtures()
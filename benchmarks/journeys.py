@@ -0,0 +1,123 @@
+# Benchmark of the journey planner over random origin/destination station
+# pairs. The timetable and calendar are built from the seeded database, then
+# every pair is planned from a random departure time of the service date,
+# and a one-to-all reachability search is run from the pair's origin.
+#
+# python3 -m benchmarks.journeys --pairs 1000 --date 2025-05-26
+
+import argparse
+import random
+from datetime import date, datetime
+from time import perf_counter
+from typing import Dict
+from zoneinfo import ZoneInfo
+
+from sqlmodel import Session
+
+from app.db.database import get_db_engine
+from app.db.memory.source import DatabaseSource
+from app.db.memory.timetable import timetable_store
+from app.services.calendar import calendar_service
+from app.services.journey import JourneyService, reachability_cache
+from app.settings import settings
+from app.utils.logger import logger
+from benchmarks.results import save_results, summarize
+
+
+def benchmark_journeys(pairs: int,
+                       service_date: date,
+                       max_transfers: int = 3,
+                       seed: int = 0) -> Dict[str, Dict[str, float]]:
+    """
+    Time journey searches between random pairs of served stations.
+
+    Args:
+        pairs (int): Number of origin/destination pairs to plan
+        service_date (date): Service date of the departures
+        max_transfers (int): Maximum number of changes between trips
+        seed (int): Seed of the random pairs and departure times
+
+    Returns:
+        Dict[str, Dict[str, float]]: Journey and reachability search time
+        statistics in milliseconds, and the share of pairs with at least one
+        journey
+    """
+    engine = None
+    try:
+        engine = get_db_engine()
+        with Session(engine) as session:
+            source = DatabaseSource(session)
+            calendar_service.load(source)
+            timetable_store.load(source)
+    finally:
+        if engine:
+            engine.dispose()
+
+    timetable = timetable_store.timetable
+    service = JourneyService(timetable_store,
+                             calendar_service,
+                             reachability_cache)
+    served = sorted({station
+                     for pattern in timetable.patterns
+                     for station in pattern.stations})
+
+    rng = random.Random(seed)
+    timings = []
+    reachable_timings = []
+    found = 0
+    for _ in range(pairs):
+        origin, target = rng.sample(served, 2)
+        seconds = rng.randrange(5 * 3600, 23 * 3600)
+        start = perf_counter()
+        journeys = service.search(origin,
+                                  target,
+                                  service_date,
+                                  seconds,
+                                  max_transfers)
+        timings.append((perf_counter() - start) * 1000)
+        found += bool(journeys)
+
+        # uncached, as on a reachability cache miss
+        start = perf_counter()
+        service.reachable(origin, service_date, seconds, None, max_transfers)
+        reachable_timings.append((perf_counter() - start) * 1000)
+
+    search = {**summarize(timings), "found_ratio": found / pairs}
+    reachable = summarize(reachable_timings)
+    logger.info(f"Planned {pairs} journeys on {service_date}: "
+                f"mean {search['mean_ms']:.2f} ms, "
+                f"p50 {search['p50_ms']:.2f} ms, "
+                f"p95 {search['p95_ms']:.2f} ms, "
+                f"p99 {search['p99_ms']:.2f} ms, "
+                f"max {search['max_ms']:.2f} ms, "
+                f"{search['found_ratio']:.0%} with a journey")
+    logger.info(f"Searched {pairs} reachable station sets: "
+                f"mean {reachable['mean_ms']:.2f} ms, "
+                f"p50 {reachable['p50_ms']:.2f} ms, "
+                f"p95 {reachable['p95_ms']:.2f} ms, "
+                f"p99 {reachable['p99_ms']:.2f} ms, "
+                f"max {reachable['max_ms']:.2f} ms")
+    return {"search": search, "reachable": reachable}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark journey planning between random stations")
+    parser.add_argument("--pairs", type=int, default=1000)
+    parser.add_argument("--date",
+                        type=date.fromisoformat,
+                        default=datetime.now(
+                            ZoneInfo(settings.gtfs_timezone)).date())
+    parser.add_argument("--max-transfers", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    results = benchmark_journeys(args.pairs,
+                                 args.date,
+                                 args.max_transfers,
+                                 args.seed)
+    save_results("journeys",
+                 {"pairs": args.pairs,
+                  "date": args.date.isoformat(),
+                  "max_transfers": args.max_transfers,
+                  "seed": args.seed},
+                 results)
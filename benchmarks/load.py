@@ -0,0 +1,197 @@
+# Load generator running the API in process against a local fake MTA
+# upstream serving the recorded feed fixtures and the locally seeded database
+# configured in .env. Every endpoint is requested by concurrent clients with
+# random IDs read from the API, and its throughput and p50/p95/p99 latencies
+# are reported and saved.
+#
+# python3 -m benchmarks.load --requests 500 --concurrency 10
+
+import argparse
+import asyncio
+import random
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List
+
+import httpx
+
+from app.main import app
+from app.services.feed import feed_service
+from app.settings import settings
+from app.utils.logger import logger
+from benchmarks.fixtures import FIXTURES_DIR, load_fixtures
+from benchmarks.results import save_results, summarize
+
+# builds the path of the next request from the random generator
+PathFactory = Callable[[random.Random], str]
+
+
+@contextmanager
+def fake_upstream(fixtures: Dict[str, bytes]) -> Iterator[Dict[str, str]]:
+    """
+    Serve feed fixtures over HTTP on a local port, standing in for MTA's
+    GTFS-RT API.
+
+    Args:
+        fixtures (Dict[str, bytes]): Raw protobuf message of each feed
+
+    Yields:
+        Dict[str, str]: Local endpoint URL of each feed
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            content = fixtures.get(self.path.lstrip("/"))
+            if content is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-protobuf")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    try:
+        yield {feed: f"http://{host}:{port}/{feed}" for feed in fixtures}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+async def _cases(client: httpx.AsyncClient,
+                 feeds: List[str]) -> Dict[str, PathFactory]:
+    # IDs are read from the API so the requests hit existing rows
+    prefix = f"{settings.api_prefix}/v1"
+    route_ids = [route["id"] for route
+                 in (await client.get(f"{prefix}/routes/")).json()]
+    stop_ids = [stop["id"] for stop
+                in (await client.get(f"{prefix}/stops/")).json()]
+    trip_ids = [trip["id"] for trip in (await client.get(
+        f"{prefix}/trips/?limit=1000&include_total=false")).json()["results"]]
+
+    cases: Dict[str, PathFactory] = {}
+    if route_ids:
+        cases["routes"] = lambda rng: f"{prefix}/routes/"
+        cases["route"] = lambda rng: f"{prefix}/routes/{rng.choice(route_ids)}"
+    if stop_ids:
+        cases["stops"] = lambda rng: f"{prefix}/stops/"
+        cases["stop"] = lambda rng: f"{prefix}/stops/{rng.choice(stop_ids)}"
+        cases["stop_departures"] = (
+            lambda rng: f"{prefix}/stops/{rng.choice(stop_ids)}/departures")
+    if trip_ids:
+        cases["trips"] = lambda rng: f"{prefix}/trips/?limit=100"
+        cases["trip"] = lambda rng: f"{prefix}/trips/{rng.choice(trip_ids)}"
+    if feeds:
+        cases["feed"] = (
+            lambda rng: f"{prefix}/feeds/{rng.choice(feeds)}?limit=100")
+    return cases
+
+
+async def _run_case(client: httpx.AsyncClient,
+                    path: PathFactory,
+                    requests: int,
+                    concurrency: int,
+                    rng: random.Random) -> Dict[str, float]:
+    timings: List[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            url = path(rng)
+            start = perf_counter()
+            res = await client.get(url)
+            timings.append((perf_counter() - start) * 1000)
+            if res.status_code >= 400:
+                errors += 1
+
+    start = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = perf_counter() - start
+    return {**summarize(timings),
+            "throughput_rps": len(timings) / seconds,
+            "errors": errors}
+
+
+async def run_load(requests: int,
+                   concurrency: int,
+                   only: List[str] | None = None,
+                   seed: int = 0,
+                   fixtures_dir: Path = FIXTURES_DIR) -> Dict[str, Dict]:
+    """
+    Load test every endpoint case in turn.
+
+    Args:
+        requests (int): Number of requests per endpoint case
+        concurrency (int): Number of concurrent clients
+        only (List[str] | None): Endpoint cases to run, all by default
+        seed (int): Seed of the random IDs
+        fixtures_dir (Path): Directory holding the feed fixtures
+
+    Returns:
+        Dict[str, Dict]: Latency statistics, throughput and error count of
+        each endpoint case
+    """
+    try:
+        fixtures = load_fixtures(fixtures_dir)
+    except FileNotFoundError as e:
+        logger.warning(f"{e}; skipping the feed endpoints")
+        fixtures = {}
+
+    rng = random.Random(seed)
+    results = {}
+    with fake_upstream(fixtures) as endpoints:
+        feed_service.mta_endpoints = endpoints
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport,
+                                         base_url="http://benchmark") as c:
+                cases = await _cases(c, list(endpoints))
+                for name, path in cases.items():
+                    if only and name not in only:
+                        continue
+                    result = await _run_case(c, path, requests, concurrency,
+                                             rng)
+                    results[name] = result
+                    logger.info(f"{name}: "
+                                f"{result['throughput_rps']:.1f} req/s, "
+                                f"p50 {result['p50_ms']:.2f} ms, "
+                                f"p95 {result['p95_ms']:.2f} ms, "
+                                f"p99 {result['p99_ms']:.2f} ms, "
+                                f"{result['errors']} errors")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Load test the API against a fake MTA upstream and the "
+                    "local database")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--only", nargs="*", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    results = asyncio.run(run_load(args.requests,
+                                   args.concurrency,
+                                   args.only,
+                                   args.seed,
+                                   args.fixtures))
+    save_results("load",
+                 {"requests": args.requests,
+                  "concurrency": args.concurrency,
+                  "seed": args.seed},
+                 results,
+                 args.output)
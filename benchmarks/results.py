@@ -0,0 +1,133 @@
+# Timing statistics and JSON result files shared by the benchmarks, and a
+# comparison of two result files to catch regressions between runs. Exits
+# with status 1 if any p95 latency grew by more than the threshold.
+#
+# python3 -m benchmarks.results benchmarks/results/load-a.json \
+#     benchmarks/results/load-b.json --threshold 0.1
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+from app.settings import settings
+from app.utils.logger import logger
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    """
+    Summarize timings in milliseconds.
+
+    Args:
+        timings (List[float]): Timings in milliseconds, at least two
+
+    Returns:
+        Dict[str, float]: Count, mean, p50, p95, p99 and max of the timings
+    """
+    percentiles = statistics.quantiles(timings, n=100, method="inclusive")
+    return {"count": len(timings),
+            "mean_ms": statistics.fmean(timings),
+            "p50_ms": percentiles[49],
+            "p95_ms": percentiles[94],
+            "p99_ms": percentiles[98],
+            "max_ms": max(timings)}
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True,
+                              text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(kind: str,
+                 parameters: Dict[str, Any],
+                 results: Dict[str, Any],
+                 output: Path | None = None) -> Path:
+    """
+    Save benchmark results as JSON along with the commit and backend they
+    were measured on.
+
+    Args:
+        kind (str): Benchmark name, prefix of the default file name
+        parameters (Dict[str, Any]): Parameters of the run
+        results (Dict[str, Any]): Results keyed by benchmark case
+        output (Path | None): File to write, defaults to a timestamped file
+                              in benchmarks/results
+
+    Returns:
+        Path: The written file
+    """
+    created_at = datetime.now()
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        output = RESULTS_DIR / (f"{kind}-"
+                                f"{created_at.strftime('%Y%m%d-%H%M%S')}.json")
+
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"kind": kind,
+                   "created_at": created_at.isoformat(),
+                   "commit": _git_commit(),
+                   "python": sys.version.split()[0],
+                   "db_backend": settings.db_backend,
+                   "static_backend": settings.static_backend,
+                   "parameters": parameters,
+                   "results": results}, f, indent=2)
+    logger.info(f"Saved {kind} benchmark results to '{output}'")
+    return output
+
+
+def compare_results(baseline: Dict[str, Any],
+                    current: Dict[str, Any],
+                    threshold: float) -> List[str]:
+    """
+    Compare the p95 latency of every case present in both runs.
+
+    Args:
+        baseline (Dict[str, Any]): Results file contents of the earlier run
+        current (Dict[str, Any]): Results file contents of the later run
+        threshold (float): Relative p95 increase reported as a regression
+
+    Returns:
+        List[str]: Cases whose p95 latency regressed
+    """
+    regressions = []
+    for case, result in current["results"].items():
+        before = baseline["results"].get(case)
+        if before is None or "p95_ms" not in result:
+            continue
+        change = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"]
+        logger.info(f"{case}: p95 {before['p95_ms']:.3f} ms -> "
+                    f"{result['p95_ms']:.3f} ms ({change:+.1%})")
+        if change > threshold:
+            regressions.append(case)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the p95 latencies of two benchmark runs")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+
+    regressions = compare_results(baseline, current, args.threshold)
+    if regressions:
+        logger.error(f"p95 regressed by more than {args.threshold:.0%}: "
+                     f"{', '.join(regressions)}")
+        sys.exit(1)
@@ -0,0 +1,649 @@
+# Synthetic GTFS static and realtime dataset generator for scale testing. A
+# scale factor of 1 is about the size of the NYC subway (30 routes laid over
+# 496 stations, of which the ~390 the routes pass through are kept, ~22k
+# trips, ~650k stop times); every other scale multiplies the routes and
+# stations, and with them the trips, stop times and realtime feed entities.
+# The same scale and seed always generate the same dataset.
+#
+# The static files go to the output directory, ready to be seeded with
+# gtfs_dir_path pointing there. Realtime FeedMessage snapshots, every
+# --interval seconds from --start, go to realtime/<snapshot>/<feed>.pb so
+# each snapshot directory can be passed as --fixtures to the feed and load
+# benchmarks.
+#
+# python3 -m benchmarks.synthetic --scale 10 --seed 0 --output gtfs_x10
+#
+# gtfs_dir_path=gtfs_x10 python3 -m app.db.scripts.seed_db
+#
+# python3 -m benchmarks.load --fixtures gtfs_x10/realtime/000
+
+import argparse
+import csv
+import math
+import os
+import random
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Tuple
+from zoneinfo import ZoneInfo
+
+from google.transit import gtfs_realtime_pb2
+
+from app.schemas.feed import Feed
+from app.settings import settings
+from app.utils.helpers import seconds_to_time
+from app.utils.logger import logger
+
+# size of the NYC subway, generated at scale 1. Stations no route passes
+# through are dropped, leaving ~390 of them
+ROUTES_PER_SCALE = 30
+STATIONS_PER_SCALE = 496
+
+# service ID -> (days of the week it runs on, Monday first, and headway in
+# seconds between the trips of a route in each direction)
+SERVICES: Dict[str, Tuple[Tuple[int, ...], int]] = {
+    "Weekday": ((1, 1, 1, 1, 1, 0, 0), 8 * 60),
+    "Saturday": ((0, 0, 0, 0, 0, 1, 0), 10 * 60),
+    "Sunday": ((0, 0, 0, 0, 0, 0, 1), 12 * 60),
+}
+
+# first and last trip departures in seconds since the start of the service
+# day; trips starting late run past midnight
+FIRST_DEPARTURE = 5 * 3600
+LAST_DEPARTURE = 24 * 3600 + 30 * 60
+
+# area of the stations at scale 1 in meters, grown with the square root of
+# the scale so station density stays the same
+AREA_WIDTH = 25000
+AREA_HEIGHT = 40000
+CENTER_LAT = 40.73
+CENTER_LON = -73.93
+METERS_PER_DEGREE_LAT = 110540
+METERS_PER_DEGREE_LON = 111320 * math.cos(math.radians(CENTER_LAT))
+
+MIN_ROUTE_STATIONS = 15
+MAX_ROUTE_STATIONS = 45
+# average running speed between stations in meters per second, and the
+# seconds trains dwell at each intermediate station
+TRAIN_SPEED = 9
+DWELL_SECONDS = 30
+# stations closer than this many meters get walking transfers
+TRANSFER_METERS = 250
+WALKING_SPEED = 1.2
+CHANGE_SECONDS = 180
+# shape points per segment between consecutive stations
+SHAPE_POINTS_PER_SEGMENT = 4
+
+# colors of the routes, taken from the subway lines
+ROUTE_COLORS = ["EE352E", "00933C", "B933AD", "0039A6", "FF6319", "6CBE45",
+                "996633", "A7A9AC", "FCCC0A", "808183"]
+# feeds the routes are spread over, the feeds the API serves
+FEEDS = [feed.value for feed in Feed]
+
+
+@dataclass(frozen=True)
+class Station:
+    stop_id: str
+    name: str
+    x: float
+    y: float
+
+    @property
+    def lat(self) -> float:
+        return round(CENTER_LAT + self.y / METERS_PER_DEGREE_LAT, 6)
+
+    @property
+    def lon(self) -> float:
+        return round(CENTER_LON + self.x / METERS_PER_DEGREE_LON, 6)
+
+
+@dataclass(frozen=True)
+class Pattern:
+    """
+    Stops of a route in one direction and their arrival and departure
+    offsets in seconds from the start of a trip, shared by all its trips.
+    """
+    route_id: str
+    direction_id: int
+    shape_id: str
+    headsign: str
+    stations: Tuple[Station, ...]
+    stop_ids: Tuple[str, ...]
+    arrivals: Tuple[int, ...]
+    departures: Tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class SyntheticTrip:
+    trip_id: str
+    pattern: Pattern
+    service_id: str
+    start: int
+
+
+def _distance(a: Station, b: Station) -> float:
+    return math.hypot(a.x - b.x, a.y - b.y)
+
+
+class SyntheticNetwork:
+    """
+    Deterministic synthetic subway network. Stations are scattered over an
+    area growing with the scale; every route runs through the stations
+    closest to a random straight line, so crossing routes share stations,
+    and runs both ways with a constant headway per service.
+
+    Args:
+        scale (float): Size relative to the NYC subway
+        seed (int): Seed of the random network
+        start_date (date): First date of the service calendar
+    """
+
+    def __init__(self, scale: float, seed: int, start_date: date):
+        self.scale = scale
+        self.start_date = start_date
+        # the first Monday a week after the start is a holiday running the
+        # Sunday service
+        self.holiday = start_date + timedelta(
+            days=7 + (7 - start_date.weekday()) % 7)
+        rng = random.Random(seed)
+
+        width = AREA_WIDTH * math.sqrt(scale)
+        height = AREA_HEIGHT * math.sqrt(scale)
+        stations = [Station(stop_id=f"S{i:05d}",
+                            name=f"Station {i}",
+                            x=rng.uniform(-width / 2, width / 2),
+                            y=rng.uniform(-height / 2, height / 2))
+                    for i in range(max(2, round(STATIONS_PER_SCALE
+                                                * scale)))]
+        spacing = math.sqrt(width * height / len(stations))
+
+        self.routes: List[Tuple[str, List[Station]]] = []
+        for r in range(max(1, round(ROUTES_PER_SCALE * scale))):
+            length = min(len(stations),
+                         rng.randint(MIN_ROUTE_STATIONS, MAX_ROUTE_STATIONS))
+            self.routes.append((f"R{r}", self._line(rng,
+                                                    stations,
+                                                    length,
+                                                    spacing)))
+
+        served = {station.stop_id for _, line in self.routes
+                  for station in line}
+        self.stations = [station for station in stations
+                         if station.stop_id in served]
+
+        self.patterns: List[Pattern] = []
+        for route_id, line in self.routes:
+            for direction_id, suffix, ordered in ((1, "N", line),
+                                                  (0, "S", line[::-1])):
+                self.patterns.append(self._pattern(route_id,
+                                                   direction_id,
+                                                   suffix,
+                                                   ordered))
+
+        # (pattern index, service ID) -> trips ordered by start
+        self.trips: Dict[Tuple[int, str], List[SyntheticTrip]] = {}
+        for p, pattern in enumerate(self.patterns):
+            for service_id, (_, headway) in SERVICES.items():
+                start = FIRST_DEPARTURE + rng.randrange(headway)
+                trips = []
+                while start <= LAST_DEPARTURE:
+                    trips.append(SyntheticTrip(
+                        trip_id=(f"SYN-{service_id}-{start:06d}_"
+                                 f"{pattern.shape_id}"),
+                        pattern=pattern,
+                        service_id=service_id,
+                        start=start))
+                    start += headway
+                self.trips[(p, service_id)] = trips
+        self.trip_starts = {key: [trip.start for trip in trips]
+                            for key, trips in self.trips.items()}
+
+    @staticmethod
+    def _line(rng: random.Random,
+              stations: List[Station],
+              length: int,
+              spacing: float) -> List[Station]:
+        # stations closest to a line through a random station, within the
+        # stretch of the line a route of this length spans
+        center = rng.choice(stations)
+        angle = rng.uniform(0, math.pi)
+        dx, dy = math.cos(angle), math.sin(angle)
+        half_length = length * spacing / 2
+        candidates = []
+        for station in stations:
+            along = (station.x - center.x) * dx + (station.y - center.y) * dy
+            if abs(along) <= half_length:
+                across = abs((station.y - center.y) * dx
+                             - (station.x - center.x) * dy)
+                candidates.append((across, along, station))
+        candidates.sort(key=lambda candidate: candidate[0])
+        line = sorted(candidates[:length], key=lambda candidate: candidate[1])
+        return [station for _, _, station in line]
+
+    @staticmethod
+    def _pattern(route_id: str,
+                 direction_id: int,
+                 suffix: str,
+                 stations: List[Station]) -> Pattern:
+        arrivals, departures = [0], [0]
+        for previous, station in zip(stations, stations[1:]):
+            arrival = departures[-1] + max(
+                60, round(_distance(previous, station) / TRAIN_SPEED))
+            arrivals.append(arrival)
+            departures.append(arrival + DWELL_SECONDS)
+        # trains don't dwell at the terminal
+        departures[-1] = arrivals[-1]
+        return Pattern(route_id=route_id,
+                       direction_id=direction_id,
+                       shape_id=f"{route_id}..{suffix}",
+                       headsign=stations[-1].name,
+                       stations=tuple(stations),
+                       stop_ids=tuple(f"{station.stop_id}{suffix}"
+                                      for station in stations),
+                       arrivals=tuple(arrivals),
+                       departures=tuple(departures))
+
+    def service_ids(self, service_date: date) -> List[str]:
+        """
+        Service IDs running on a date.
+        """
+        if service_date == self.holiday:
+            return ["Sunday"]
+        weekday = service_date.weekday()
+        return [service_id for service_id, (days, _) in SERVICES.items()
+                if days[weekday]]
+
+    def running_trips(self,
+                      service_id: str,
+                      seconds: int) -> List[SyntheticTrip]:
+        """
+        Trips of a service running at a time of its service day.
+        """
+        running = []
+        for p, pattern in enumerate(self.patterns):
+            starts = self.trip_starts[(p, service_id)]
+            first = bisect_left(starts, seconds - pattern.arrivals[-1])
+            last = bisect_right(starts, seconds)
+            running.extend(self.trips[(p, service_id)][first:last])
+        return running
+
+    def feed_of(self, route_id: str) -> str:
+        """
+        Feed the realtime updates of a route are published in.
+        """
+        return FEEDS[int(route_id[1:]) % len(FEEDS)]
+
+
+def _write_csv(output: str,
+               name: str,
+               header: List[str],
+               rows) -> int:
+    path = os.path.join(output, name)
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    logger.info(f"Wrote {count} rows to '{path}'")
+    return count
+
+
+def write_static(network: SyntheticNetwork, output: str) -> Dict[str, int]:
+    """
+    Write the GTFS static files of a synthetic network.
+
+    Args:
+        network (SyntheticNetwork): The network to write
+        output (str): Directory to write the files to
+
+    Returns:
+        Dict[str, int]: Number of rows written per file
+    """
+    os.makedirs(output, exist_ok=True)
+    end_date = network.start_date + timedelta(days=90)
+    counts = {}
+
+    counts["agency.txt"] = _write_csv(
+        output, "agency.txt",
+        ["agency_id", "agency_name", "agency_url", "agency_timezone",
+         "agency_lang", "agency_phone"],
+        [["SYN", "Synthetic Transit", "http://example.com",
+          settings.gtfs_timezone, "en", ""]])
+
+    counts["routes.txt"] = _write_csv(
+        output, "routes.txt",
+        ["agency_id", "route_id", "route_short_name", "route_long_name",
+         "route_type", "route_desc", "route_url", "route_color",
+         "route_text_color"],
+        ([["SYN", route_id, route_id,
+           f"{line[0].name} - {line[-1].name}", 1,
+           f"Trains operate between {line[0].name} and {line[-1].name}",
+           "http://example.com",
+           ROUTE_COLORS[int(route_id[1:]) % len(ROUTE_COLORS)], ""]
+          for route_id, line in network.routes]))
+
+    def stops():
+        for station in network.stations:
+            yield [station.stop_id, station.name, station.lat, station.lon,
+                   1, ""]
+            for suffix in ("N", "S"):
+                yield [f"{station.stop_id}{suffix}", station.name,
+                       station.lat, station.lon, "", station.stop_id]
+
+    counts["stops.txt"] = _write_csv(
+        output, "stops.txt",
+        ["stop_id", "stop_name", "stop_lat", "stop_lon", "location_type",
+         "parent_station"],
+        stops())
+
+    counts["calendar.txt"] = _write_csv(
+        output, "calendar.txt",
+        ["service_id", "monday", "tuesday", "wednesday", "thursday",
+         "friday", "saturday", "sunday", "start_date", "end_date"],
+        [[service_id, *days, network.start_date.strftime("%Y%m%d"),
+          end_date.strftime("%Y%m%d")]
+         for service_id, (days, _) in SERVICES.items()])
+
+    holiday = network.holiday.strftime("%Y%m%d")
+    counts["calendar_dates.txt"] = _write_csv(
+        output, "calendar_dates.txt",
+        ["service_id", "date", "exception_type"],
+        [["Weekday", holiday, 2], ["Sunday", holiday, 1]])
+
+    def shape_points():
+        for pattern in network.patterns:
+            sequence = 0
+            stations = pattern.stations
+            for previous, station in zip(stations, stations[1:]):
+                for k in range(SHAPE_POINTS_PER_SEGMENT):
+                    t = k / SHAPE_POINTS_PER_SEGMENT
+                    lat = previous.lat + (station.lat - previous.lat) * t
+                    lon = previous.lon + (station.lon - previous.lon) * t
+                    yield [pattern.shape_id, sequence,
+                           round(lat, 6), round(lon, 6)]
+                    sequence += 1
+            yield [pattern.shape_id, sequence,
+                   stations[-1].lat, stations[-1].lon]
+
+    counts["shapes.txt"] = _write_csv(
+        output, "shapes.txt",
+        ["shape_id", "shape_pt_sequence", "shape_pt_lat", "shape_pt_lon"],
+        shape_points())
+
+    counts["trips.txt"] = _write_csv(
+        output, "trips.txt",
+        ["route_id", "trip_id", "service_id", "trip_headsign",
+         "direction_id", "shape_id"],
+        ([trip.pattern.route_id, trip.trip_id, trip.service_id,
+          trip.pattern.headsign, trip.pattern.direction_id,
+          trip.pattern.shape_id]
+         for trips in network.trips.values() for trip in trips))
+
+    def stop_times():
+        for trips in network.trips.values():
+            for trip in trips:
+                pattern = trip.pattern
+                for sequence, (stop_id, arrival, departure) in enumerate(
+                        zip(pattern.stop_ids,
+                            pattern.arrivals,
+                            pattern.departures), start=1):
+                    yield [trip.trip_id, stop_id,
+                           seconds_to_time(trip.start + arrival),
+                           seconds_to_time(trip.start + departure),
+                           sequence]
+
+    counts["stop_times.txt"] = _write_csv(
+        output, "stop_times.txt",
+        ["trip_id", "stop_id", "arrival_time", "departure_time",
+         "stop_sequence"],
+        stop_times())
+
+    def transfers():
+        # changes within every station, and walks between close stations
+        # found through a grid of TRANSFER_METERS cells
+        cells: Dict[Tuple[int, int], List[Station]] = {}
+        for station in network.stations:
+            cells.setdefault((int(station.x // TRANSFER_METERS),
+                              int(station.y // TRANSFER_METERS)),
+                             []).append(station)
+        for station in network.stations:
+            yield [station.stop_id, station.stop_id, 2, CHANGE_SECONDS]
+            cx = int(station.x // TRANSFER_METERS)
+            cy = int(station.y // TRANSFER_METERS)
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for other in cells.get((cx + dx, cy + dy), ()):
+                        distance = _distance(station, other)
+                        if other is not station and distance <= \
+                                TRANSFER_METERS:
+                            yield [station.stop_id, other.stop_id, 2,
+                                   CHANGE_SECONDS
+                                   + round(distance / WALKING_SPEED)]
+
+    counts["transfers.txt"] = _write_csv(
+        output, "transfers.txt",
+        ["from_stop_id", "to_stop_id", "transfer_type", "min_transfer_time"],
+        transfers())
+    return counts
+
+
+def build_feed_messages(
+        network: SyntheticNetwork,
+        at: datetime,
+        delays: Dict[str, int],
+        rng: random.Random,
+        alerts_per_feed: int = 2) -> Dict[str, gtfs_realtime_pb2.FeedMessage]:
+    """
+    Build the realtime feed messages of a synthetic network at a moment.
+    Every running trip gets a trip update with its remaining stops and a
+    vehicle position, delayed by a per-trip random walk kept in delays.
+
+    Args:
+        network (SyntheticNetwork): The network running the trips
+        at (datetime): Moment of the snapshot, timezone aware
+        delays (Dict[str, int]): Delay in seconds per trip ID, updated in
+                                 place so consecutive snapshots drift
+        rng (random.Random): Random generator of the delays and alerts
+        alerts_per_feed (int): Alerts on running trips added to each feed
+
+    Returns:
+        Dict[str, gtfs_realtime_pb2.FeedMessage]: Message per feed
+    """
+    timezone = ZoneInfo(settings.gtfs_timezone)
+    at = at.astimezone(timezone)
+    timestamp = int(at.timestamp())
+
+    messages: Dict[str, gtfs_realtime_pb2.FeedMessage] = {}
+    for feed in FEEDS:
+        message = gtfs_realtime_pb2.FeedMessage()
+        message.header.gtfs_realtime_version = "1.0"
+        message.header.timestamp = timestamp
+        messages[feed] = message
+
+    running: Dict[str, List[Tuple[SyntheticTrip, date]]] = {}
+    # trips of the previous service day still run after midnight
+    for service_date in (at.date() - timedelta(days=1), at.date()):
+        midnight = datetime.combine(service_date, time(), tzinfo=timezone)
+        seconds = int((at - midnight).total_seconds())
+        for service_id in network.service_ids(service_date):
+            for trip in network.running_trips(service_id, seconds):
+                pattern = trip.pattern
+                delay = max(-60, min(900, delays.get(trip.trip_id, 0)
+                                     + rng.randint(-30, 45)))
+                delays[trip.trip_id] = delay
+                elapsed = seconds - delay - trip.start
+                # the next stop the train arrives at or stands at
+                index = bisect_left(pattern.departures, elapsed)
+                if index >= len(pattern.stop_ids):
+                    continue
+
+                feed = network.feed_of(pattern.route_id)
+                message = messages[feed]
+                running.setdefault(feed, []).append((trip, service_date))
+                start_date = service_date.strftime("%Y%m%d")
+                start_time = seconds_to_time(trip.start)
+                trip_start = int(midnight.timestamp()) + trip.start + delay
+
+                entity = message.entity.add()
+                entity.id = str(len(message.entity))
+                trip_update = entity.trip_update
+                trip_update.trip.trip_id = trip.trip_id
+                trip_update.trip.route_id = pattern.route_id
+                trip_update.trip.start_time = start_time
+                trip_update.trip.start_date = start_date
+                for k in range(index, len(pattern.stop_ids)):
+                    update = trip_update.stop_time_update.add()
+                    update.stop_id = pattern.stop_ids[k]
+                    update.arrival.time = trip_start + pattern.arrivals[k]
+                    update.departure.time = trip_start + pattern.departures[k]
+
+                entity = message.entity.add()
+                entity.id = str(len(message.entity))
+                vehicle = entity.vehicle
+                vehicle.trip.trip_id = trip.trip_id
+                vehicle.trip.route_id = pattern.route_id
+                vehicle.trip.start_time = start_time
+                vehicle.trip.start_date = start_date
+                vehicle.stop_id = pattern.stop_ids[index]
+                vehicle.current_stop_sequence = index + 1
+                vehicle.timestamp = timestamp
+                vehicle.current_status = (
+                    gtfs_realtime_pb2.VehiclePosition.STOPPED_AT
+                    if elapsed >= pattern.arrivals[index]
+                    else gtfs_realtime_pb2.VehiclePosition.IN_TRANSIT_TO)
+
+    for feed, trips in running.items():
+        message = messages[feed]
+        for trip, service_date in rng.sample(trips,
+                                             min(alerts_per_feed,
+                                                 len(trips))):
+            entity = message.entity.add()
+            entity.id = str(len(message.entity))
+            alert = entity.alert
+            translation = alert.header_text.translation.add()
+            translation.text = (f"{trip.pattern.route_id} trains are "
+                                "running with delays")
+            translation.language = "en"
+            informed = alert.informed_entity.add()
+            informed.trip.trip_id = trip.trip_id
+            informed.trip.route_id = trip.pattern.route_id
+            informed.trip.start_date = service_date.strftime("%Y%m%d")
+    return messages
+
+
+def write_realtime(network: SyntheticNetwork,
+                   output: str,
+                   start: datetime,
+                   snapshots: int,
+                   interval: int,
+                   seed: int) -> int:
+    """
+    Write consecutive realtime snapshots of every feed as serialized
+    FeedMessages to realtime/<snapshot>/<feed>.pb. Feeds without running
+    trips are not written.
+
+    Args:
+        network (SyntheticNetwork): The network running the trips
+        output (str): Directory of the generated dataset
+        start (datetime): Moment of the first snapshot, timezone aware
+        snapshots (int): Number of snapshots
+        interval (int): Seconds between snapshots
+        seed (int): Seed of the delays and alerts
+
+    Returns:
+        int: Number of feed entities written across all snapshots
+    """
+    rng = random.Random(seed)
+    delays: Dict[str, int] = {}
+    entities = 0
+    for snapshot in range(snapshots):
+        directory = os.path.join(output, "realtime", f"{snapshot:03d}")
+        os.makedirs(directory, exist_ok=True)
+        at = start + timedelta(seconds=snapshot * interval)
+        messages = build_feed_messages(network, at, delays, rng)
+        for feed, message in messages.items():
+            # feeds without running trips are left out like a missing feed,
+            # MTA never publishes a message without entities
+            if not message.entity:
+                continue
+            with open(os.path.join(directory, f"{feed}.pb"), "wb") as f:
+                f.write(message.SerializeToString())
+        count = sum(len(message.entity) for message in messages.values())
+        entities += count
+        logger.info(f"Wrote realtime snapshot '{directory}' at "
+                    f"{at.isoformat()} with {count} entities")
+    return entities
+
+
+def generate_dataset(scale: float,
+                     seed: int,
+                     output: str,
+                     start_date: date,
+                     start: datetime,
+                     snapshots: int,
+                     interval: int) -> Dict[str, int]:
+    """
+    Generate a synthetic GTFS static dataset and its realtime snapshots.
+
+    Args:
+        scale (float): Size relative to the NYC subway
+        seed (int): Seed of the network, delays and alerts
+        output (str): Directory to write the dataset to
+        start_date (date): First date of the service calendar
+        start (datetime): Moment of the first realtime snapshot
+        snapshots (int): Number of realtime snapshots
+        interval (int): Seconds between realtime snapshots
+
+    Returns:
+        Dict[str, int]: Number of rows written per static file, and of
+        realtime entities
+    """
+    start_time = datetime.now()
+    network = SyntheticNetwork(scale, seed, start_date)
+    counts = write_static(network, output)
+    counts["realtime entities"] = write_realtime(network,
+                                                 output,
+                                                 start,
+                                                 snapshots,
+                                                 interval,
+                                                 seed)
+    duration = datetime.now() - start_time
+    logger.info(f"Generated scale {scale} dataset in '{output}' in "
+                f"{duration}")
+    return counts
+
+
+if __name__ == "__main__":
+    timezone = ZoneInfo(settings.gtfs_timezone)
+    today = datetime.now(timezone).date()
+
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic GTFS static and realtime dataset")
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--start-date",
+                        type=date.fromisoformat,
+                        default=today)
+    parser.add_argument("--start",
+                        type=datetime.fromisoformat,
+                        default=None,
+                        help=("Moment of the first realtime snapshot, 08:00 "
+                              "on the start date by default"))
+    parser.add_argument("--snapshots", type=int, default=10)
+    parser.add_argument("--interval", type=int, default=30)
+    args = parser.parse_args()
+
+    start = args.start or datetime.combine(args.start_date, time(8))
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone)
+    generate_dataset(args.scale,
+                     args.seed,
+                     args.output,
+                     args.start_date,
+                     start,
+                     args.snapshots,
+                     args.interval)
@@ -0,0 +1,11 @@
+import os
+from pathlib import Path
+
+# the settings are read on import of the app; the tests build their data in
+# memory and never connect to the database or the feeds
+ROOT = Path(__file__).resolve().parent.parent
+os.environ.setdefault("db_backend", "sqlite")
+os.environ.setdefault("db_sqlite_path", ":memory:")
+os.environ.setdefault("gtfs_dir_path", str(ROOT / "app/db/gtfs_subway"))
+os.environ.setdefault("mta_feed_urls_path",
+                      str(ROOT / "app/services/mta_feed_urls.json"))
@@ -0,0 +1,171 @@
+import asyncio
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.db.memory.timetable import TimetableStore
+from app.db.models.gtfs import Calendar, Stop, Transfer, Trip
+from app.schemas.journey import LegMode
+from app.services.calendar import CalendarService
+from app.services.journey import JourneyService
+from app.settings import settings
+from app.utils.cache import VersionedCache
+
+WEEKDAY = "Weekday"
+
+
+def at(hour: int, minute: int, day: int = 3) -> datetime:
+    return datetime(2025, 6, day, hour, minute,
+                    tzinfo=ZoneInfo(settings.gtfs_timezone))
+
+
+def seconds(time: str) -> int:
+    hours, minutes = time.split(":")
+    return int(hours) * 3600 + int(minutes) * 60
+
+
+class FixedSource:
+    """
+    Static source of a small fixed timetable, 2025-06-03 being a Tuesday:
+
+    - route 1 runs from station A to B, where route 2 continues to C after a
+      three minute change
+    - station D is a two minute walk from C
+    - route 3 leaves E at 24:30 on weekday nights, after midnight on the
+      next service day
+    """
+
+    STOP_TIMES = {
+        # trip_id: (route_id, [(stop_id, arrival, departure), ...])
+        "R1-0800": ("1", [("A1", "08:00", "08:00"), ("B1", "08:10", "08:10")]),
+        # leaves before the change at B can be made
+        "R2-0811": ("2", [("B2", "08:11", "08:11"), ("C2", "08:20", "08:20")]),
+        "R2-0815": ("2", [("B2", "08:15", "08:15"), ("C2", "08:30", "08:30")]),
+        "R3-2430": ("3", [("E3", "24:30", "24:30"), ("A3", "24:50", "24:50")]),
+    }
+
+    def stops(self):
+        stations = [Stop(stop_id=station,
+                         stop_name=f"Station {station}",
+                         stop_lat=40.7,
+                         stop_lon=-74.0)
+                    for station in "ABCDE"]
+        children = [Stop(stop_id=stop_id,
+                         stop_name=f"Station {stop_id[0]}",
+                         stop_lat=40.7,
+                         stop_lon=-74.0,
+                         parent_station=stop_id[0])
+                    for stop_id in ("A1", "A3", "B1", "B2", "C2", "E3")]
+        return stations + children
+
+    def trips(self):
+        return [Trip(trip_id=trip_id,
+                     route_id=route_id,
+                     service_id=WEEKDAY,
+                     trip_headsign=rows[-1][0],
+                     direction_id=0)
+                for trip_id, (route_id, rows) in self.STOP_TIMES.items()]
+
+    def transfers(self):
+        return [Transfer(from_stop_id="B",
+                         to_stop_id="B",
+                         transfer_type=2,
+                         min_transfer_time=180),
+                Transfer(from_stop_id="C",
+                         to_stop_id="D",
+                         transfer_type=2,
+                         min_transfer_time=120)]
+
+    def calendars(self):
+        return [Calendar(service_id=WEEKDAY,
+                         monday=True,
+                         tuesday=True,
+                         wednesday=True,
+                         thursday=True,
+                         friday=True,
+                         saturday=False,
+                         sunday=False,
+                         start_date="20250101",
+                         end_date="20251231")]
+
+    def calendar_dates(self):
+        return []
+
+    def stop_time_rows(self):
+        for trip_id, (_, rows) in sorted(self.STOP_TIMES.items()):
+            for sequence, (stop_id, arrival, departure) in enumerate(rows):
+                yield (trip_id, sequence, stop_id, seconds(arrival),
+                       seconds(departure))
+
+
+@pytest.fixture
+def service() -> JourneyService:
+    source = FixedSource()
+    calendar = CalendarService()
+    calendar.load(source)
+    store = TimetableStore()
+    store.load(source)
+    return JourneyService(store,
+                          calendar,
+                          VersionedCache(maxsize=16, ttl=float("inf")))
+
+
+def plan(service: JourneyService, *args, **kwargs):
+    return asyncio.run(service.plan(*args, **kwargs))
+
+
+def test_plan_transfer_waits_for_change_time(service):
+    res = plan(service, "A1", "C2", at(7, 55))
+
+    assert len(res.journeys) == 1
+    journey = res.journeys[0]
+    assert journey.transfers == 1
+    assert [(leg.mode, leg.trip.id) for leg in journey.legs] == [
+        (LegMode.TRANSIT, "R1-0800"),
+        (LegMode.TRANSIT, "R2-0815")]
+    assert journey.legs[1].origin.id == "B2"
+    assert journey.legs[1].departs_at == at(8, 15)
+    assert journey.arrives_at == at(8, 30)
+    assert journey.duration == 35 * 60
+
+
+def test_plan_walks_footpath_to_destination(service):
+    res = plan(service, "A", "D", at(7, 55))
+
+    assert len(res.journeys) == 1
+    journey = res.journeys[0]
+    assert [leg.mode for leg in journey.legs] == [
+        LegMode.TRANSIT, LegMode.TRANSIT, LegMode.WALK]
+    walk = journey.legs[-1]
+    assert (walk.origin.id, walk.destination.id) == ("C", "D")
+    assert walk.departs_at == at(8, 30)
+    assert journey.arrives_at == at(8, 32)
+
+
+def test_plan_boards_trip_of_previous_service_day(service):
+    # Monday night's trip runs after midnight on Tuesday
+    res = plan(service, "E", "A", at(0, 20))
+
+    assert len(res.journeys) == 1
+    leg = res.journeys[0].legs[0]
+    assert leg.trip.id == "R3-2430"
+    assert leg.departs_at == at(0, 30)
+    assert leg.arrives_at == at(0, 50)
+
+    # no service ran on Sunday night, so early on Monday the next trip is
+    # the one of Monday night
+    res = plan(service, "E", "A", at(0, 20, day=2))
+
+    assert len(res.journeys) == 1
+    assert res.journeys[0].departs_at == at(0, 30, day=3)
+
+
+def test_get_reachable_arrivals(service):
+    res = asyncio.run(service.get_reachable("A", at(7, 55)))
+
+    assert [(stop.stop.id, stop.arrives_at) for stop in res.stops] == [
+        ("A", at(7, 55)),
+        ("B", at(8, 10)),
+        ("C", at(8, 30)),
+        ("D", at(8, 32))]
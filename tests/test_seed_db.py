@@ -0,0 +1,17 @@
+from app.db.models.gtfs import StopTime
+from app.db.scripts.seed_db import add_derived_fields
+
+
+def test_add_derived_fields_stop_time_without_times():
+    data = [{"trip_id": "T1", "stop_id": "A1", "stop_sequence": 1,
+             "arrival_time": "25:10:00", "departure_time": "25:10:30"},
+            # stops that aren't timepoints may leave their times empty
+            {"trip_id": "T1", "stop_id": "B1", "stop_sequence": 2,
+             "arrival_time": "", "departure_time": ""}]
+
+    add_derived_fields(data, StopTime)
+
+    assert (data[0]["arrival_seconds"], data[0]["departure_seconds"]) == (
+        90600, 90630)
+    assert (data[1]["arrival_seconds"], data[1]["departure_seconds"]) == (
+        None, None)